@@ -0,0 +1,301 @@
+# algo_pay/archive.py
+
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from .audit import AUDIT_HEADER, AuditBackend, AuditLogWriter, FlushPolicy
+from .history import HistoryQueries, TimeBound, _timestamp
+
+SEGMENTS_DIR = "segments"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_FLOAT_COLUMNS = ("amount_ALGO", "employer_balance_before", "employer_balance_after")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "The history archive requires pyarrow: pip install 'algopay[archive]'"
+        ) from e
+    return pa, pa_csv, pq
+
+
+def partition_dir(directory: str, department: str, date: str) -> str:
+    """Hive-style ``department=<d>/date=<YYYY-MM-DD>`` partition under ``directory``."""
+    return os.path.join(
+        directory, f"department={quote(department, safe='')}", f"date={date}"
+    )
+
+
+class HistoryArchive(AuditBackend, HistoryQueries):
+    """
+    Payroll history as a rotating CSV segment plus a compressed Parquet archive.
+
+    Rows are appended to a small CSV segment under ``directory/segments``.
+    At a flush, the segment is closed once it passes ``max_bytes`` or, with
+    ``rotate_daily``, once the UTC day has changed. A closed segment is
+    compacted into ``compression``-compressed Parquet files, one per
+    department and day (``department=<d>/date=<YYYY-MM-DD>/part-<segment>.parquet``),
+    and then deleted. A run is never split across segments.
+    Queries (``HistoryQueries``, ``read``) scan only the partitions that
+    their department and time range touch, plus the open segment.
+
+    Each archive directory should have one writer process; ``close``
+    compacts the open segment, and segments left behind by a crash are
+    compacted when the archive is next opened. Needs ``pyarrow``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_daily: bool = True,
+        flush: FlushPolicy = "run",
+        fsync: bool = False,
+        compression: str = "zstd",
+        max_buffered_rows: int = 10_000,
+    ):
+        _pyarrow()
+        super().__init__(directory, flush=flush, max_buffered_rows=max_buffered_rows)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.fsync = fsync
+        self.compression = compression
+        self._segments_dir = os.path.join(directory, SEGMENTS_DIR)
+        os.makedirs(self._segments_dir, exist_ok=True)
+        self._segment: Optional[AuditLogWriter] = None
+        self._segment_day: Optional[str] = None
+        # Segments from an earlier writer that never got compacted
+        for path in _segment_files(self._segments_dir):
+            self._compact(path)
+
+    # ----------------------
+    # Writing
+    # ----------------------
+    def rotate(self) -> None:
+        """Close and compact the open segment now (e.g. before a month-end report)."""
+        with self._lock:
+            self._flush_locked()
+            self._rotate()
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        if self._segment is not None and (
+            (self.rotate_daily and today != self._segment_day)
+            or os.path.getsize(self._segment.filename) >= self.max_bytes
+        ):
+            self._rotate()
+        if self._segment is None:
+            name = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + ".csv"
+            self._segment = AuditLogWriter(
+                os.path.join(self._segments_dir, name), fsync=self.fsync
+            )
+            self._segment_day = today
+        for row in rows:
+            self._segment.write_row(row)
+        self._segment.flush()
+
+    def _rotate(self) -> None:
+        if self._segment is None:
+            return
+        path = self._segment.filename
+        self._segment.close()
+        self._segment = None
+        self._compact(path)
+
+    def _compact(self, path: str) -> None:
+        pa, _, pq = _pyarrow()
+        frame = _read_segment(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if not frame.empty:
+            dates = frame["timestamp"].str.slice(0, 10)
+            for (department, date), group in frame.groupby(
+                [frame["department"], dates], sort=False
+            ):
+                target = partition_dir(self.directory, department, date)
+                os.makedirs(target, exist_ok=True)
+                # pandas schema metadata would cost a few KB in every part
+                table = pa.Table.from_pandas(
+                    group, preserve_index=False
+                ).replace_schema_metadata(None)
+                # Write-then-rename: a crash leaves the segment to recompact,
+                # never a truncated part (part names are per segment, so a
+                # recompaction overwrites rather than duplicates)
+                fd, tmp = tempfile.mkstemp(dir=target, suffix=".tmp")
+                os.close(fd)
+                pq.write_table(table, tmp, compression=self.compression)
+                os.replace(tmp, os.path.join(target, f"part-{stem}.parquet"))
+        os.remove(path)
+
+    def _close(self) -> None:
+        self._rotate()
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    def read(self, **filters) -> pd.DataFrame:
+        """``read_archive`` over this archive, including rows not yet flushed."""
+        with self._lock:
+            self._flush_locked()
+            return read_archive(self.directory, **filters)
+
+    def query(
+        self,
+        payroll_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        employee_address: Optional[str] = None,
+        txid: Optional[str] = None,
+        department: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Rows matching every filter given, in the order they were logged."""
+        frame = self.read(
+            payroll_id=payroll_id,
+            job_id=job_id,
+            employee_address=employee_address,
+            txid=txid,
+            department=department,
+            start=start,
+            end=end,
+        )
+        if limit is not None:
+            frame = frame.head(limit)
+        return frame.to_dict("records")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_archive(
+    directory: str,
+    department: Optional[str] = None,
+    start: TimeBound = None,
+    end: TimeBound = None,
+    columns: Optional[Sequence[str]] = None,
+    **equals: Optional[str],
+) -> pd.DataFrame:
+    """
+    Ledger rows from a ``HistoryArchive`` directory as a DataFrame.
+
+    Only partitions for ``department`` (all by default) and for days that
+    overlap ``[start, end)`` are opened; ``equals`` (e.g. ``job_id="Weekly"``)
+    is pushed down into the Parquet reader. Rows are in logged order and
+    ``columns`` selects a subset of the ledger columns.
+    """
+    _, _, pq = _pyarrow()
+    unknown = set(equals) - set(AUDIT_HEADER)
+    if unknown:
+        raise TypeError(f"Unknown history columns: {', '.join(sorted(unknown))}")
+    start = None if start is None else _timestamp(start)
+    end = None if end is None else _timestamp(end)
+
+    filters = [(c, "==", v) for c, v in equals.items() if v is not None]
+    if department is not None:
+        filters.append(("department", "==", department))
+    if start is not None:
+        filters.append(("timestamp", ">=", start))
+    if end is not None:
+        filters.append(("timestamp", "<", end))
+
+    columns = list(columns or AUDIT_HEADER)
+    # Only the requested columns are decoded (timestamp too, for ordering)
+    read_columns = list(dict.fromkeys(columns + ["timestamp"]))
+    frames = [
+        pq.read_table(path, columns=read_columns, filters=filters or None).to_pandas()
+        for path in _partition_files(directory, department, start, end)
+    ]
+    segments_dir = os.path.join(directory, SEGMENTS_DIR)
+    for path in _segment_files(segments_dir):
+        frame = _read_segment(path)
+        for column, op, value in filters:
+            if op == "==":
+                frame = frame[frame[column] == value]
+            elif op == ">=":
+                frame = frame[frame[column] >= value]
+            else:
+                frame = frame[frame[column] < value]
+        frames.append(frame[read_columns])
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    frame = pd.concat(frames, ignore_index=True)
+    # Partitions are read department by department; restore logged order
+    frame = frame.sort_values("timestamp", kind="stable", ignore_index=True)
+    return frame[columns]
+
+
+def _partition_files(
+    directory: str,
+    department: Optional[str],
+    start: Optional[str],
+    end: Optional[str],
+) -> Iterator[str]:
+    first_day = start[:10] if start else None
+    for department_dir in sorted(_subdirs(directory, "department=")):
+        name = unquote(department_dir[len("department=") :])
+        if department is not None and name != department:
+            continue
+        department_path = os.path.join(directory, department_dir)
+        for date_dir in sorted(_subdirs(department_path, "date=")):
+            day = date_dir[len("date=") :]
+            # end is exclusive: a day whose first instant is not before it is out
+            if (first_day and day < first_day) or (end and f"{day}T00:00:00" >= end):
+                continue
+            date_path = os.path.join(department_path, date_dir)
+            for part in sorted(os.listdir(date_path)):
+                if part.endswith(".parquet"):
+                    yield os.path.join(date_path, part)
+
+
+def _subdirs(path: str, prefix: str) -> List[str]:
+    try:
+        return [
+            entry.name
+            for entry in os.scandir(path)
+            if entry.is_dir() and entry.name.startswith(prefix)
+        ]
+    except FileNotFoundError:
+        return []
+
+
+def _segment_files(segments_dir: str) -> List[str]:
+    try:
+        names = sorted(os.listdir(segments_dir))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(segments_dir, n) for n in names if n.endswith(".csv")]
+
+
+def _read_segment(path: str) -> pd.DataFrame:
+    pa, pa_csv, _ = _pyarrow()
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=AUDIT_HEADER)
+    table = pa_csv.read_csv(
+        path,
+        # A row torn by a crash mid-write is dropped rather than failing
+        parse_options=pa_csv.ParseOptions(
+            newlines_in_values=True, invalid_row_handler=lambda row: "skip"
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={
+                c: pa.float64() if c in _FLOAT_COLUMNS else pa.string()
+                for c in AUDIT_HEADER
+            }
+        ),
+    )
+    return table.to_pandas()
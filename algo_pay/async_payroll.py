@@ -0,0 +1,449 @@
+# algo_pay/async_payroll.py
+
+import asyncio
+import base64
+import json
+import uuid
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+from algosdk import account, encoding, error, mnemonic, transaction
+
+from . import transactions
+from .audit import AuditBackend, FlushPolicy, get_audit_writer
+from .paycalc import compute_pay_microalgos, microalgos_to_algos
+from .payroll import log_transaction, resolve_network
+from .roster import Roster
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None
+
+
+# One semaphore per endpoint per event loop, shared by every client on it.
+# The first client to touch an endpoint on a loop sets its limit.
+_endpoint_limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _endpoint_semaphore(address: str, limit: int) -> asyncio.Semaphore:
+    limits = _endpoint_limits.setdefault(asyncio.get_running_loop(), {})
+    if address not in limits:
+        limits[address] = asyncio.Semaphore(limit)
+    return limits[address]
+
+
+class AsyncAlgodClient:
+    """
+    Minimal asyncio algod v2 client built on aiohttp.
+
+    Covers the endpoints payroll needs (params, account info, raw submit,
+    pending info, status and status-after-block). At most
+    ``max_concurrency`` requests are in flight per endpoint, across every
+    client on the same event loop; ``status_after_block`` long-polls are
+    not counted, so waiting for a block never holds up submissions. Errors
+    are raised as ``algosdk.error.AlgodHTTPError`` like the synchronous
+    client.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        max_concurrency: int = 8,
+        session: Optional["aiohttp.ClientSession"] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncAlgodClient requires aiohttp: pip install 'algopay[async]'"
+            )
+        self.algod_token = algod_token
+        self.algod_address = algod_address.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[bytes] = None,
+        limited: bool = True,
+    ) -> Dict[str, Any]:
+        if not limited:
+            return await self._send_request(method, path, data)
+        async with _endpoint_semaphore(self.algod_address, self.max_concurrency):
+            return await self._send_request(method, path, data)
+
+    async def _send_request(
+        self, method: str, path: str, data: Optional[bytes]
+    ) -> Dict[str, Any]:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        headers = {"X-Algo-API-Token": self.algod_token}
+        if data is not None:
+            headers["Content-Type"] = "application/x-binary"
+        async with self._session.request(
+            method, f"{self.algod_address}/v2{path}", data=data, headers=headers
+        ) as resp:
+            if resp.status != 200:
+                # Proxies and load balancers may answer in plain text
+                text = await resp.text()
+                try:
+                    message = json.loads(text).get("message")
+                except (ValueError, AttributeError):
+                    message = None
+                raise error.AlgodHTTPError(
+                    message or text.strip() or resp.reason, resp.status
+                )
+            body = await resp.json(content_type=None)
+            return body or {}
+
+    async def account_info(self, address: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/accounts/{address}")
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        res = await self._request("GET", "/transactions/params")
+        return transaction.SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"],
+        )
+
+    async def send_transactions(self, signed_txns: list) -> str:
+        """Submit signed transactions (one payment or an atomic group)."""
+        blob = b"".join(
+            base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signed_txns
+        )
+        res = await self._request("POST", "/transactions", data=blob)
+        return res["txId"]
+
+    async def pending_transaction_info(self, txid: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/transactions/pending/{txid}")
+
+    async def status(self) -> Dict[str, Any]:
+        return await self._request("GET", "/status")
+
+    async def status_after_block(self, block_num: int) -> Dict[str, Any]:
+        # A long-poll: kept outside the endpoint's concurrency limit
+        return await self._request(
+            "GET", f"/status/wait-for-block-after/{block_num}", limited=False
+        )
+
+
+async def wait_for_confirmation(
+    client: AsyncAlgodClient, txid: str, wait_rounds: int = 4
+) -> Dict[str, Any]:
+    """Await confirmation of ``txid`` without blocking the event loop."""
+    start_round = current_round = (await client.status())["last-round"]
+    while current_round <= start_round + wait_rounds:
+        try:
+            info = await client.pending_transaction_info(txid)
+        except error.AlgodHTTPError:
+            # May 404 behind a load balancer; try again next round
+            info = {}
+        if info.get("pool-error"):
+            raise error.TransactionRejectedError(
+                "Transaction rejected: " + info["pool-error"]
+            )
+        if info.get("confirmed-round"):
+            return info
+        current_round = (await client.status_after_block(current_round))["last-round"]
+    raise error.ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out")
+
+
+async def confirm_transactions(
+    client: AsyncAlgodClient, txids: List[str], wait_rounds: int = 10
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Await confirmation of many txids at once, like ``PaymentPipeline``.
+
+    Every outstanding txid is checked once per round, then a single
+    ``status_after_block`` waits for the next block on behalf of all of
+    them. Returns the pending info of each txid that was confirmed or
+    rejected (``pool-error``); txids still unresolved after ``wait_rounds``
+    rounds are left out.
+    """
+    resolved: Dict[str, Dict[str, Any]] = {}
+    outstanding = list(dict.fromkeys(txids))
+    start_round = current_round = (await client.status())["last-round"]
+    while outstanding:
+        infos = await asyncio.gather(
+            *(client.pending_transaction_info(txid) for txid in outstanding),
+            return_exceptions=True,
+        )
+        still_pending = []
+        for txid, info in zip(outstanding, infos):
+            # May 404 behind a load balancer; try again next round
+            if isinstance(info, dict) and (
+                info.get("confirmed-round") or info.get("pool-error")
+            ):
+                resolved[txid] = info
+            else:
+                still_pending.append(txid)
+        outstanding = still_pending
+        if not outstanding or current_round > start_round + wait_rounds:
+            break
+        current_round = (await client.status_after_block(current_round))["last-round"]
+    return resolved
+
+
+class AsyncPayroll:
+    """
+    asyncio counterpart to ``algo_pay.payroll.Payroll``.
+
+    Roster management, the CSV audit log and the notifier payload behave like
+    the threaded class, but balance lookups, sends and confirmation polling
+    are coroutines, so a single event loop can drive many departments.
+    Requests to one algod endpoint are capped at ``max_concurrency`` across
+    all ``AsyncPayroll`` instances on the loop.
+
+    Pass ``algod_address``/``algod_token`` to target a specific node (for
+    instance a local fake algod) instead of a named ``network``.
+    """
+
+    def __init__(
+        self,
+        employer_mnemonic: str,
+        department: str,
+        network: str = "localnet",
+        history_file: Union[str, AuditBackend] = "payroll_history.csv",
+        notifier: Optional[object] = None,
+        max_concurrency: int = 8,
+        algod_address: Optional[str] = None,
+        algod_token: Optional[str] = None,
+        audit_flush: FlushPolicy = "run",
+        audit_writer: Optional[AuditBackend] = None,
+        quiet: bool = False,
+    ):
+        if algod_address is None:
+            algod_address, default_token = resolve_network(network)
+            algod_token = default_token if algod_token is None else algod_token
+
+        self.client = AsyncAlgodClient(
+            algod_token or "", algod_address, max_concurrency=max_concurrency
+        )
+
+        self.employer_private_key = mnemonic.to_private_key(employer_mnemonic)
+        self.employer_address = account.address_from_private_key(
+            self.employer_private_key
+        )
+
+        self.department = department
+        self.employees = Roster()
+        self.quiet = quiet
+
+        if isinstance(history_file, AuditBackend):
+            audit_writer = audit_writer or history_file
+        self.audit_writer = audit_writer or get_audit_writer(
+            history_file, flush=audit_flush
+        )
+        self.history_file = self.audit_writer.filename
+
+        self.notifier = notifier
+        self._balance_units: Optional[int] = None
+
+        print(f"[{self.department}] Connected as {self.employer_address}")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    # ----------------------
+    # Account Utilities
+    # ----------------------
+    async def get_balance(self, address: str = None) -> float:
+        if not address:
+            address = self.employer_address
+        info = await self.client.account_info(address)
+        return info["amount"] / 1e6
+
+    async def get_asset_balance(self, address: str, asset_id: int) -> float:
+        info = await self.client.account_info(address)
+        for holding in info.get("assets", []):
+            if holding["asset-id"] == asset_id:
+                return holding["amount"]
+        return 0
+
+    # ----------------------
+    # Payroll Management
+    # ----------------------
+    def add_employee(self, address: str, hourly_rate: float, name: str = None):
+        self.employees.add(address, hourly_rate, name)
+        if not self.quiet:
+            print(
+                f"[{self.department}] Added employee {name or address} at {hourly_rate} ALGO/hr"
+            )
+
+    def remove_employee(self, address: str):
+        removed = self.employees.remove(address)
+        if removed is not None and not self.quiet:
+            print(f"[{self.department}] Removed employee {removed}")
+
+    # ----------------------
+    # Transactions
+    # ----------------------
+    async def send_payment(
+        self,
+        to: str,
+        amount: float,
+        note: str = "",
+        params: Optional[transaction.SuggestedParams] = None,
+    ) -> tuple:
+        """Send one payment; returns ``(txid, balance_before, balance_after, status)``."""
+        if self._balance_units is None:
+            self._balance_units = (
+                await self.client.account_info(self.employer_address)
+            )["amount"]
+        balance = self._balance_units / 1e6
+        try:
+            signed = await self._send(to, amount, note, params)
+            await wait_for_confirmation(self.client, signed.get_txid(), 4)
+        except error.ConfirmationTimeoutError:
+            # Sent but not seen confirmed yet; it may still land
+            print(f"[{self.department}] Payment to {to} is pending")
+            return signed.get_txid(), balance, balance, "PENDING"
+        except Exception as e:
+            print(f"[{self.department}] Payment to {to} failed: {e}")
+            return "FAILED", balance, balance, "FAILED"
+        before = balance
+        self._balance_units -= signed.transaction.amt + signed.transaction.fee
+        return signed.get_txid(), before, self._balance_units / 1e6, "SUCCESS"
+
+    async def _send(self, to, amount, note, params, microalgos=False):
+        params = params or await self.client.suggested_params()
+        txn = transactions.build_payment_txn(
+            None,
+            self.employer_address,
+            to,
+            amount,
+            note,
+            params=params,
+            microalgos=microalgos,
+        )
+        signed = transactions.sign_transaction(txn, self.employer_private_key)
+        await self.client.send_transactions([signed])
+        return signed
+
+    async def run_payroll(
+        self,
+        hours: float,
+        note: str = "Payroll Run",
+        job_id: str = "DefaultJob",
+    ) -> List[str]:
+        print(f"[{self.department}] Running payroll for {hours} hours...")
+        payroll_id = f"Payroll_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+        roster = self.employees.snapshot()
+        amounts = compute_pay_microalgos(roster.rates, hours)
+
+        rows = []
+        for emp_addr, name, rate, amount in zip(
+            roster.addresses, roster.names, roster.rates.tolist(), amounts
+        ):
+            amount = int(amount)
+            if not self.quiet:
+                print(
+                    f"[{self.department}] Paying {name}: {hours}h * {rate} = "
+                    f"{microalgos_to_algos(amount)} ALGO"
+                )
+            rows.append((emp_addr, name, amount, f"{note}: {hours}h @ {rate} ALGO/hr"))
+
+        info, params = await asyncio.gather(
+            self.client.account_info(self.employer_address),
+            self.client.suggested_params(),
+        )
+        self._balance_units = info["amount"]
+
+        # Every payment is submitted at once; the endpoint semaphore bounds
+        # how many actually hit algod concurrently
+        outcomes = await asyncio.gather(
+            *(
+                self._send(emp_addr, amount, row_note, params, microalgos=True)
+                for emp_addr, _, amount, row_note in rows
+            ),
+            return_exceptions=True,
+        )
+        # Then confirmed together, with one block wait per round for all
+        confirmed = await confirm_transactions(
+            self.client,
+            [o.get_txid() for o in outcomes if not isinstance(o, BaseException)],
+        )
+
+        txids = []
+        for (emp_addr, name, amount, _), outcome in zip(rows, outcomes):
+            before = after = self._balance_units / 1e6
+            if isinstance(outcome, BaseException):
+                print(f"[{self.department}] Payment to {emp_addr} failed: {outcome}")
+                txid, status = "FAILED", "FAILED"
+            else:
+                txid = outcome.get_txid()
+                info = confirmed.get(txid, {})
+                if info.get("confirmed-round"):
+                    self._balance_units -= (
+                        outcome.transaction.amt + outcome.transaction.fee
+                    )
+                    after, status = self._balance_units / 1e6, "SUCCESS"
+                    txids.append(txid)
+                elif info.get("pool-error"):
+                    print(
+                        f"[{self.department}] Payment to {emp_addr} failed: "
+                        f"Transaction rejected: {info['pool-error']}"
+                    )
+                    txid, status = "FAILED", "FAILED"
+                else:
+                    # Sent but not seen confirmed yet; it may still land
+                    print(f"[{self.department}] Payment to {emp_addr} is pending")
+                    status = "PENDING"
+
+            log_transaction(
+                self.history_file,
+                self.department,
+                job_id,
+                payroll_id,
+                name,
+                emp_addr,
+                microalgos_to_algos(amount),
+                txid,
+                self.employer_address,
+                before,
+                after,
+                status,
+                writer=self.audit_writer,
+            )
+        self.audit_writer.end_run()
+
+        print(f"[{self.department}] Payroll complete. ID: {payroll_id}")
+
+        if self.notifier:
+            payload = {
+                "job_id": job_id,
+                "payroll_id": payroll_id,
+                "department": self.department,
+                "employees": list(roster.names),
+                "txids": txids,
+                "status": "SUCCESS" if txids else "FAILED",
+            }
+            # Notifiers may do blocking I/O (SMTP); keep it off the loop
+            try:
+                await asyncio.to_thread(self.notifier.notify, payload)
+            except Exception as e:
+                print(f"[{self.department}] Notification for {payroll_id} failed: {e}")
+
+        return txids
@@ -0,0 +1,204 @@
+# algo_pay/audit.py
+
+import atexit
+import csv
+import os
+import threading
+from typing import Dict, List, Sequence, Union
+
+AUDIT_HEADER = [
+    "timestamp",
+    "department",
+    "job_id",
+    "payroll_id",
+    "employer",
+    "employee_name",
+    "employee_address",
+    "amount_ALGO",
+    "txid",
+    "employer_balance_before",
+    "employer_balance_after",
+    "status",
+]
+
+FlushPolicy = Union[str, int]
+
+
+class AuditBackend:
+    """
+    Buffered, thread-safe sink for audit rows.
+
+    Rows are buffered in memory and handed to ``_write_rows`` according to
+    ``flush``:
+
+    - ``"row"``: write after every row
+    - ``"run"``: write when ``end_run`` is called (once per payroll run)
+    - an int ``N``: write every ``N`` rows (and at ``end_run``)
+
+    Subclasses implement ``_write_rows`` (and ``_close`` if they hold
+    resources); ``AuditLogWriter`` writes CSV and
+    ``algo_pay.sqlite_history.SQLiteHistory`` a SQLite database. One backend
+    can be shared by any number of ``Payroll`` instances and threads; use
+    ``get_audit_writer`` to get the shared backend for a path.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        flush: FlushPolicy = "run",
+        max_buffered_rows: int = 10_000,
+    ):
+        if not (flush in ("row", "run") or (isinstance(flush, int) and flush > 0)):
+            raise ValueError('flush must be "row", "run" or a positive row count')
+        self.filename = filename
+        self.flush_policy = flush
+        self.max_buffered_rows = max_buffered_rows
+        self._buffer: List[Sequence] = []
+        self._lock = threading.Lock()
+
+    def write_row(self, row: Sequence) -> None:
+        """Buffer one audit row (without header), flushing per the policy."""
+        with self._lock:
+            self._buffer.append(row)
+            if (
+                self.flush_policy == "row"
+                or (
+                    isinstance(self.flush_policy, int)
+                    and len(self._buffer) >= self.flush_policy
+                )
+                or len(self._buffer) >= self.max_buffered_rows
+            ):
+                self._flush_locked()
+
+    def end_run(self) -> None:
+        """Mark the end of a payroll run; flushes any buffered rows."""
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._close()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        self._write_rows(self._buffer)
+        self._buffer.clear()
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        pass
+
+
+class AuditLogWriter(AuditBackend):
+    """
+    Buffered, thread-safe CSV audit log.
+
+    Keeps a single append handle open and writes buffered rows per the
+    ``flush`` policy (see ``AuditBackend``). With ``fsync=True`` each flush
+    is also forced to disk. With ``index=True`` the ``algo_pay.history``
+    sidecar index is caught up after every flush, so history queries never
+    have rows to catch up on. The header is written once when the file is
+    new or empty.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        flush: FlushPolicy = "run",
+        fsync: bool = False,
+        max_buffered_rows: int = 10_000,
+        index: bool = False,
+    ):
+        super().__init__(filename, flush=flush, max_buffered_rows=max_buffered_rows)
+        self.fsync = fsync
+        self._file = None
+        self._writer = None
+        self._index = None
+        if index:
+            # Imported here: history depends on this module for the header
+            from .history import HistoryIndex
+
+            self._index = HistoryIndex(filename)
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        if self._index is not None:
+            self._index.catch_up()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _open(self) -> None:
+        self._file = open(self.filename, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(AUDIT_HEADER)
+
+
+# History files with these extensions are SQLite databases, not CSV
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def is_sqlite_path(filename: str) -> bool:
+    return filename.lower().endswith(SQLITE_SUFFIXES)
+
+
+_writers: Dict[str, AuditBackend] = {}
+_writers_lock = threading.Lock()
+
+
+def get_audit_writer(
+    filename: str, flush: FlushPolicy = "run", fsync: bool = False, index: bool = False
+) -> AuditBackend:
+    """
+    Return the process-wide writer for ``filename``, creating it if needed.
+
+    ``.db``/``.sqlite``/``.sqlite3`` paths get a ``SQLiteHistory``; anything
+    else a CSV ``AuditLogWriter``. The flush policy, ``fsync`` and ``index``
+    only apply when the writer is first created; later callers share the
+    existing writer and its settings. ``index`` is CSV-only (SQLite is
+    indexed already).
+    """
+    key = os.path.abspath(filename)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            if is_sqlite_path(filename):
+                # Imported here: sqlite_history depends on this module
+                from .sqlite_history import SQLiteHistory
+
+                writer = SQLiteHistory(filename, flush=flush, fsync=fsync)
+            else:
+                writer = AuditLogWriter(filename, flush=flush, fsync=fsync, index=index)
+            _writers[key] = writer
+        return writer
+
+
+def close_audit_writers() -> None:
+    """Flush and close every shared writer (also run at interpreter exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_audit_writers)
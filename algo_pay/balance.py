@@ -0,0 +1,89 @@
+# algo_pay/balance.py
+
+import threading
+from typing import Optional
+
+from algosdk.v2client import algod
+
+
+class BalanceTracker:
+    """
+    Locally tracked account balance for audit logging.
+
+    The balance is read from ``account_info`` once (``refresh``) and then
+    walked forward from the amounts and fees of confirmed payments, so a
+    payroll run does not need two ``account_info`` calls per payment.
+    ``reconcile`` compares the local figure with the chain at the end of a run
+    and reports any drift (incoming payments, payments that landed after a
+    confirmation timeout, fees paid elsewhere).
+
+    Balances are held in base units: microAlgos, or asset units when
+    ``asset_id`` is given. For ASA balances fees are ignored since they are
+    paid in ALGO.
+    """
+
+    def __init__(
+        self,
+        client: algod.AlgodClient,
+        address: str,
+        asset_id: Optional[int] = None,
+    ):
+        self.client = client
+        self.address = address
+        self.asset_id = asset_id
+        self._units: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def units(self) -> int:
+        """Current tracked balance in base units, reading the chain if needed."""
+        with self._lock:
+            return self._loaded_units()
+
+    @property
+    def balance(self) -> float:
+        """Current tracked balance in ALGOs (or asset units for an ASA)."""
+        return self._to_display(self.units)
+
+    def refresh(self) -> float:
+        """Re-read the balance from the chain and return it."""
+        with self._lock:
+            self._units = self._read_chain()
+            return self._to_display(self._units)
+
+    def debit(self, amount: int, fee: int = 0) -> float:
+        """Subtract a confirmed payment (base units) and return the new balance."""
+        with self._lock:
+            spent = amount if self.asset_id is not None else amount + fee
+            self._units = self._loaded_units() - spent
+            return self._to_display(self._units)
+
+    def reconcile(self) -> float:
+        """
+        Compare the tracked balance with the chain and adopt the chain value.
+
+        Returns the drift (chain minus tracked) in ALGOs or asset units; 0
+        means the local bookkeeping matched exactly.
+        """
+        with self._lock:
+            chain = self._read_chain()
+            drift = 0 if self._units is None else chain - self._units
+            self._units = chain
+            return self._to_display(drift)
+
+    def _loaded_units(self) -> int:
+        if self._units is None:
+            self._units = self._read_chain()
+        return self._units
+
+    def _read_chain(self) -> int:
+        info = self.client.account_info(self.address)
+        if self.asset_id is None:
+            return int(info["amount"])
+        for holding in info.get("assets", []):
+            if holding["asset-id"] == self.asset_id:
+                return int(holding["amount"])
+        return 0
+
+    def _to_display(self, units: int) -> float:
+        return units if self.asset_id is not None else units / 1e6
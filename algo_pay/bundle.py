@@ -0,0 +1,264 @@
+# algo_pay/bundle.py
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import msgpack
+from algosdk.v2client import algod
+
+from .audit import get_audit_writer
+from .balance import BalanceTracker
+from .clients import get_algod_client, resolve_network
+from .params_cache import SuggestedParamsCache, default_params_cache
+from .paycalc import microalgos_to_algos
+from .pipeline import PaymentPipeline, RawUnit, UnitResult
+
+BUNDLE_SUFFIX = ".stxn"
+# Where a scheduled job moves a bundle whose broadcast failed
+FAILED_BUNDLE_DIR = "failed"
+BUNDLE_VERSION = 1
+
+# Algorand caps a transaction's validity window at this many rounds
+MAX_VALIDITY_ROUNDS = 1000
+# Seconds per block used to predict the round a scheduled run will start in
+DEFAULT_ROUND_SECONDS = 2.8
+# How much of the window sits before the predicted round: blocks rarely come
+# faster than expected, so most of the slack is for a slower chain
+EARLY_ROUNDS = MAX_VALIDITY_ROUNDS // 4
+
+
+class BundleNotValid(Exception):
+    """The chain is outside a bundle's validity window; nothing was sent."""
+
+
+class BundleRow(NamedTuple):
+    employee_address: str
+    employee_name: str
+    amount: int  # microAlgos
+    note: str
+    fee: int
+    txid: Optional[str]  # None if the payment could not be built
+
+
+class PayrollBundle(NamedTuple):
+    """
+    One payroll run signed ahead of time.
+
+    ``rows`` are the run's payments in roster order; ``units`` are the
+    signed submission units (single payments or atomic groups) covering
+    the rows that have a txid, in the same order.
+    """
+
+    payroll_id: str
+    department: str
+    job_id: str
+    employer: str
+    genesis_id: str
+    genesis_hash: str
+    first_valid: int
+    last_valid: int
+    run_at: str  # ISO 8601, UTC
+    rows: List[BundleRow]
+    units: List[RawUnit]
+
+
+def validity_window(
+    last_round: int,
+    run_at: Optional[datetime] = None,
+    round_seconds: float = DEFAULT_ROUND_SECONDS,
+) -> Tuple[int, int]:
+    """
+    ``(first_valid, last_valid)`` for transactions that should be sendable
+    at ``run_at`` (default: now), predicting the round from ``last_round``
+    and ``round_seconds`` per block.
+    """
+    lead = 0.0
+    if run_at is not None:
+        lead = max(0.0, (run_at - datetime.now(timezone.utc)).total_seconds())
+    predicted = last_round + math.ceil(lead / round_seconds)
+    first_valid = max(last_round, predicted - EARLY_ROUNDS)
+    return first_valid, first_valid + MAX_VALIDITY_ROUNDS
+
+
+# ----------------------
+# File format
+# ----------------------
+def write_bundle(path: str, bundle: PayrollBundle) -> None:
+    """
+    Write ``bundle`` as a ``.stxn`` file: a msgpack header map followed by
+    one msgpack bin per unit holding its signed transactions, concatenated
+    exactly as they go on the wire. The file is replaced atomically.
+    """
+    header = bundle._asdict()
+    header["version"] = BUNDLE_VERSION
+    header["rows"] = [list(row) for row in bundle.rows]
+    header["units"] = [len(unit.txids) for unit in bundle.units]
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            packer = msgpack.Packer(use_bin_type=True)
+            f.write(packer.pack(header))
+            for unit in bundle.units:
+                f.write(packer.pack(unit.data))
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def read_bundle(path: str) -> PayrollBundle:
+    with open(path, "rb") as f:
+        unpacker = msgpack.Unpacker(f, raw=False, max_buffer_size=0)
+        header = next(unpacker)
+        if header.get("version") != BUNDLE_VERSION:
+            raise ValueError(
+                f"Unsupported bundle version {header.get('version')} in {path}"
+            )
+        rows = [BundleRow(*row) for row in header["rows"]]
+        txids = iter(row.txid for row in rows if row.txid is not None)
+        units = [
+            RawUnit([next(txids) for _ in range(size)], data)
+            for size, data in zip(header["units"], unpacker)
+        ]
+    if len(units) != len(header["units"]):
+        raise ValueError(f"Bundle {path} is truncated")
+    fields = {k: header[k] for k in PayrollBundle._fields}
+    return PayrollBundle(**{**fields, "rows": rows, "units": units})
+
+
+# ----------------------
+# Broadcasting
+# ----------------------
+def broadcast_bundle(
+    client: algod.AlgodClient,
+    bundle: PayrollBundle,
+    window: int = 64,
+    params_cache: Optional[SuggestedParamsCache] = None,
+    on_results: Optional[Callable[[List[Tuple[int, UnitResult]]], None]] = None,
+) -> List[UnitResult]:
+    """
+    Submit a bundle's units through a ``PaymentPipeline`` and confirm them.
+
+    No key is needed. Raises ``BundleNotValid`` before sending anything if
+    ``client`` is on another network or the next round is outside the
+    bundle's validity window. Sending the same bundle again cannot pay
+    anyone twice: the transactions are byte-identical and carry leases.
+    """
+    params_cache = params_cache or default_params_cache
+    params = params_cache.get(client)
+    if params.gh != bundle.genesis_hash:
+        raise BundleNotValid(
+            f"Bundle {bundle.payroll_id} is for {bundle.genesis_id}, "
+            f"not {params.gen}"
+        )
+    next_round = client.status()["last-round"] + 1
+    if not bundle.first_valid <= next_round <= bundle.last_valid:
+        raise BundleNotValid(
+            f"Bundle {bundle.payroll_id} is valid for rounds "
+            f"{bundle.first_valid}-{bundle.last_valid}; next round is {next_round}"
+        )
+    pipeline = PaymentPipeline(client, window=window, params_cache=params_cache)
+    return pipeline.run(bundle.units, on_results=on_results)
+
+
+def bundle_results(
+    bundle: PayrollBundle,
+    unit_results: Sequence[UnitResult],
+    balance_tracker: BalanceTracker,
+) -> List[tuple]:
+    """
+    ``(txid, balance_before, balance_after, status)`` per row, walking
+    ``balance_tracker`` forward by each confirmed payment and its fee.
+    Payments still pending keep their txid with status ``PENDING``.
+    """
+    confirmed = {txid for result in unit_results if result.ok for txid in result.txids}
+    pending = {
+        txid for result in unit_results if result.pending for txid in result.txids
+    }
+    results = []
+    for row in bundle.rows:
+        before = balance_tracker.balance
+        if row.txid in confirmed:
+            after = balance_tracker.debit(row.amount, row.fee)
+            results.append((row.txid, before, after, "SUCCESS"))
+        elif row.txid in pending:
+            results.append((row.txid, before, before, "PENDING"))
+        else:
+            results.append(("FAILED", before, before, "FAILED"))
+    return results
+
+
+def main(argv=None) -> int:
+    """``python -m algo_pay.bundle``: broadcast a prepared bundle, no key needed."""
+    # payroll imports this module, so import its ledger helper lazily
+    from .payroll import log_transaction
+
+    parser = argparse.ArgumentParser(
+        description="Broadcast a pre-signed payroll bundle (.stxn)."
+    )
+    parser.add_argument("bundle", help="Path to the .stxn bundle")
+    parser.add_argument(
+        "--network", default="localnet", help="localnet, testnet or mainnet"
+    )
+    parser.add_argument("--algod-address", default=None, help="Overrides --network")
+    parser.add_argument("--algod-token", default="")
+    parser.add_argument("--window", type=int, default=64, help="Units in flight")
+    parser.add_argument(
+        "--history-file",
+        default=None,
+        help="Ledger to append one row per payment to (.csv, or .db for SQLite)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.algod_address:
+        client = get_algod_client(args.algod_address, args.algod_token)
+    else:
+        client = get_algod_client(*resolve_network(args.network))
+    bundle = read_bundle(args.bundle)
+    tracker = BalanceTracker(client, bundle.employer)
+    tracker.refresh()
+    try:
+        unit_results = broadcast_bundle(client, bundle, window=args.window)
+    except BundleNotValid as e:
+        print(f"[{bundle.department}] {e}")
+        return 2
+    results = bundle_results(bundle, unit_results, tracker)
+
+    if args.history_file:
+        writer = get_audit_writer(args.history_file)
+        for row, (txid, before, after, status) in zip(bundle.rows, results):
+            log_transaction(
+                args.history_file,
+                bundle.department,
+                bundle.job_id,
+                bundle.payroll_id,
+                row.employee_name,
+                row.employee_address,
+                microalgos_to_algos(row.amount),
+                txid,
+                bundle.employer,
+                before,
+                after,
+                status,
+                writer=writer,
+            )
+        writer.end_run()
+    statuses = Counter(status for *_, status in results)
+    print(
+        f"[{bundle.department}] Broadcast {bundle.payroll_id}: "
+        f"{statuses['SUCCESS']} paid, {statuses['FAILED']} failed, "
+        f"{statuses['PENDING']} pending"
+    )
+    return 0 if statuses["SUCCESS"] == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# algo_pay/clients.py
+
+import atexit
+import http.client
+import json
+import ssl
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client import algod
+
+from . import metrics
+
+# algod endpoint and token per supported network
+NETWORKS = {
+    "localnet": ("http://localhost:4001", "a" * 64),
+    "testnet": ("https://testnet-api.algonode.cloud", ""),
+    "mainnet": ("https://mainnet-api.algonode.cloud", ""),
+}
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# A reused keep-alive connection may have been closed by the server while
+# idle; these surface on the first request over it and are retried once
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def resolve_network(network: str) -> tuple:
+    """Return ``(algod_address, algod_token)`` for a network name."""
+    if network not in NETWORKS:
+        raise ValueError("Unsupported network")
+    return NETWORKS[network]
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections to one algod endpoint.
+
+    At most ``pool_size`` requests are in flight at once; idle connections
+    are kept for reuse, so TCP and TLS setup is paid once per connection
+    rather than once per request.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        parts = parse.urlsplit(address)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported algod address {address!r}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.connections_opened = 0
+        self._ssl_context = (
+            ssl.create_default_context() if self.scheme == "https" else None
+        )
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, str, bytes]:
+        """Send one request; returns ``(status, reason, body)``."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._slots:
+            conn, reused = self._checkout()
+            try:
+                try:
+                    resp, data = self._send(conn, method, path, body, headers, timeout)
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    metrics.increment("algod_retries_total", reason="stale_connection")
+                    conn.close()
+                    conn, reused = self._connect(), False
+                    resp, data = self._send(conn, method, path, body, headers, timeout)
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+            return resp.status, resp.reason, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _send(self, conn, method, path, body, headers, timeout):
+        if conn.sock is None:
+            conn.connect()
+        conn.sock.settimeout(timeout)
+        conn.request(method, self.base_path + path, body=body, headers=headers or {})
+        resp = conn.getresponse()
+        return resp, resp.read()
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self.host,
+                self.port,
+                timeout=self.connect_timeout,
+                context=self._ssl_context,
+            )
+        else:
+            conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.connect_timeout
+            )
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """
+    ``AlgodClient`` that sends requests over a shared keep-alive pool.
+
+    Drop-in replacement for ``algosdk.v2client.algod.AlgodClient``; only the
+    transport differs. Errors are raised as ``AlgodHTTPError`` /
+    ``AlgodResponseError`` exactly like the SDK client.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    ):
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = ConnectionPool(algod_address, pool_size, timeout, connect_timeout)
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params=None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: Optional[str] = "json",
+        timeout: Optional[float] = None,
+    ):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, reason, body = self.pool.request(
+            method, requrl, body=data, headers=header, timeout=timeout
+        )
+        if status >= 400:
+            message, payload = reason, {}
+            try:
+                payload = json.loads(body)
+                message = payload["message"]
+            except (ValueError, KeyError, TypeError):
+                payload = {}
+                message = body.decode("utf-8", "replace") or reason
+            raise error.AlgodHTTPError(message, status, payload.get("data"))
+
+        if response_format != "json":
+            return body
+        if not body:
+            # Some algod endpoints answer 200 with an empty body
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from e
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+_clients: Dict[tuple, PooledAlgodClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_algod_client(
+    algod_address: str,
+    algod_token: str = "",
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+) -> PooledAlgodClient:
+    """
+    Return the process-wide client for ``(algod_address, algod_token)``.
+
+    Pool size and timeouts only apply when the client is first created;
+    later callers share the existing client and its pool.
+    """
+    key = (algod_address.rstrip("/"), algod_token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = PooledAlgodClient(
+                algod_token,
+                algod_address,
+                pool_size=pool_size,
+                timeout=timeout,
+                connect_timeout=connect_timeout,
+            )
+            _clients[key] = client
+        return client
+
+
+def client_for_network(network: str, **pool_options) -> PooledAlgodClient:
+    """Shared client for a named network (``localnet``/``testnet``/``mainnet``)."""
+    return get_algod_client(*resolve_network(network), **pool_options)
+
+
+def resolve_client(client: Union[algod.AlgodClient, str]) -> algod.AlgodClient:
+    """Accept a client instance or a network name."""
+    if isinstance(client, str):
+        return client_for_network(client)
+    return client
+
+
+def close_algod_clients() -> None:
+    """Close every shared client's idle connections (also run at exit)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_algod_clients)
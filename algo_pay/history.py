@@ -0,0 +1,276 @@
+# algo_pay/history.py
+
+import csv
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .audit import AUDIT_HEADER
+
+# Columns copied into the sidecar index, in table order after the offset
+INDEXED_COLUMNS = (
+    "timestamp",
+    "department",
+    "job_id",
+    "payroll_id",
+    "employee_address",
+    "txid",
+)
+_FLOAT_COLUMNS = ("amount_ALGO", "employer_balance_before", "employer_balance_after")
+
+TimeBound = Union[str, datetime, None]
+
+
+def default_index_path(csv_path: str) -> str:
+    return csv_path + ".idx.sqlite"
+
+
+class HistoryIndex:
+    """
+    SQLite sidecar mapping ledger columns to byte offsets in the CSV.
+
+    The CSV stays the source of truth; the index only stores, per row, its
+    offset plus the columns it can be searched by. ``catch_up`` indexes just
+    the bytes appended since the last call, so keeping it current costs
+    time proportional to the new rows. A ledger that shrank or whose header
+    changed (rotated, replaced) is re-indexed from scratch. The index is
+    disposable: delete the sidecar and it is rebuilt on next use.
+    """
+
+    def __init__(self, csv_path: str, index_path: Optional[str] = None):
+        self.csv_path = csv_path
+        self.index_path = index_path or default_index_path(csv_path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        # Rebuildable from the CSV, so durability can be traded for speed
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS rows (
+                offset INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                department TEXT,
+                job_id TEXT,
+                payroll_id TEXT,
+                employee_address TEXT,
+                txid TEXT
+            );
+            CREATE INDEX IF NOT EXISTS rows_payroll_id ON rows (payroll_id);
+            CREATE INDEX IF NOT EXISTS rows_job_id ON rows (job_id);
+            CREATE INDEX IF NOT EXISTS rows_employee ON rows (employee_address);
+            CREATE INDEX IF NOT EXISTS rows_txid ON rows (txid);
+            CREATE INDEX IF NOT EXISTS rows_timestamp ON rows (timestamp);
+            """)
+
+    @property
+    def indexed_bytes(self) -> int:
+        return int(self._meta("indexed_bytes") or 0)
+
+    def catch_up(self) -> int:
+        """Index rows appended since the last call; returns how many."""
+        with self._lock:
+            if not os.path.exists(self.csv_path):
+                return 0
+            with open(self.csv_path, "rb") as f:
+                header = f.readline()
+                start = self.indexed_bytes
+                fingerprint = hashlib.sha256(header).hexdigest()
+                size = os.fstat(f.fileno()).st_size
+                if start > size or self._meta("header") not in (None, fingerprint):
+                    self._db.execute("DELETE FROM rows")
+                    start = 0
+                if start == 0:
+                    start = len(header)
+                f.seek(start)
+
+                entries, end = [], start
+                for offset, end, record in _records(f, start):
+                    # Skip stray headers and malformed rows rather than fail
+                    if record == AUDIT_HEADER or len(record) != len(AUDIT_HEADER):
+                        continue
+                    row = dict(zip(AUDIT_HEADER, record))
+                    entries.append((offset,) + tuple(row[c] for c in INDEXED_COLUMNS))
+
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?, ?)", entries
+                )
+                self._set_meta("indexed_bytes", str(end))
+                self._set_meta("header", fingerprint)
+            return len(entries)
+
+    def offsets(
+        self,
+        payroll_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        employee_address: Optional[str] = None,
+        txid: Optional[str] = None,
+        department: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Byte offsets of matching rows, in file order."""
+        where, params = _where(
+            payroll_id=payroll_id,
+            job_id=job_id,
+            employee_address=employee_address,
+            txid=txid,
+            department=department,
+            start=start,
+            end=end,
+        )
+        sql = f"SELECT offset FROM rows{where} ORDER BY offset"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [offset for (offset,) in self._db.execute(sql, params)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+
+class HistoryQueries:
+    """
+    Lookups shared by every queryable history store.
+
+    Subclasses implement ``query`` with the filters of
+    ``HistoryIndex.offsets``, returning typed rows in the order they were
+    logged.
+    """
+
+    def query(self, **filters) -> List[dict]:
+        raise NotImplementedError
+
+    def by_payroll_id(self, payroll_id: str) -> List[dict]:
+        return self.query(payroll_id=payroll_id)
+
+    def by_job_id(self, job_id: str) -> List[dict]:
+        return self.query(job_id=job_id)
+
+    def by_employee(self, employee_address: str) -> List[dict]:
+        return self.query(employee_address=employee_address)
+
+    def by_txid(self, txid: str) -> Optional[dict]:
+        rows = self.query(txid=txid, limit=1)
+        return rows[0] if rows else None
+
+    def between(self, start: TimeBound = None, end: TimeBound = None) -> List[dict]:
+        """Rows logged in ``[start, end)`` (UTC; ISO strings or naive datetimes)."""
+        return self.query(start=start, end=end)
+
+
+class PayrollHistory(HistoryQueries):
+    """
+    Query a CSV payroll ledger by payroll, job, employee, txid or time range.
+
+    Every query first catches the sidecar ``HistoryIndex`` up with rows
+    appended since the last one, then reads only the matching rows from the
+    CSV by offset. Rows come back as dicts keyed by the ledger header, with
+    amounts and balances as floats, in the order they were logged.
+    """
+
+    def __init__(self, csv_path: str, index_path: Optional[str] = None):
+        self.csv_path = csv_path
+        self.index = HistoryIndex(csv_path, index_path)
+
+    def query(self, **filters) -> List[dict]:
+        """Rows matching every filter given (see ``HistoryIndex.offsets``)."""
+        self.index.catch_up()
+        offsets = self.index.offsets(**filters)
+        if not offsets:
+            return []
+        rows = []
+        with open(self.csv_path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                (_, _, record), *_ = _records(f, offset, limit=1)
+                rows.append(_typed(record))
+        return rows
+
+    def close(self) -> None:
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _where(
+    start: TimeBound = None, end: TimeBound = None, **columns: Optional[str]
+) -> Tuple[str, list]:
+    """SQL ``WHERE`` clause (or ``""``) and parameters for the query filters."""
+    clauses, params = [], []
+    for column, value in columns.items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(_timestamp(start))
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(_timestamp(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _records(f, start: int, limit: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    ``(offset, end, fields)`` for each complete CSV record from ``start``.
+
+    A trailing record without its newline (still being written) is left for
+    the next call. Quoted fields spanning lines are handled by the csv module.
+    """
+    position = start
+
+    def lines():
+        nonlocal position
+        while True:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return
+            position += len(line)
+            yield line.decode("utf-8")
+
+    reader = csv.reader(lines())
+    count = 0
+    offset = start
+    while limit is None or count < limit:
+        try:
+            record = next(reader)
+        except (StopIteration, csv.Error):
+            # csv.Error: a quoted field still open at the end of the file
+            return
+        yield offset, position, record
+        offset = position
+        count += 1
+
+
+def _typed(record: List[str]) -> dict:
+    row = dict(zip(AUDIT_HEADER, record))
+    for column in _FLOAT_COLUMNS:
+        try:
+            row[column] = float(row[column])
+        except (TypeError, ValueError):
+            pass
+    return row
+
+
+def _timestamp(bound: Union[str, datetime]) -> str:
+    return bound.isoformat() if isinstance(bound, datetime) else str(bound)
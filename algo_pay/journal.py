@@ -0,0 +1,329 @@
+# algo_pay/journal.py
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .pipeline import UnitResult
+
+JOURNAL_SUFFIX = ".journal"
+
+# Entry states. SIGNED covers "signed, maybe sent": only the chain knows more.
+# FAILED entries will never land (never signed, rejected or expired)
+INTENT = "intent"
+SIGNED = "signed"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+# The sent mark is written this many units ahead, so marking costs one
+# commit per stride rather than one per unit sent
+MARK_STRIDE = 256
+
+
+def payment_lease(payroll_id: str, address: str) -> bytes:
+    """
+    The 32-byte lease for ``address``'s payment in ``payroll_id``.
+
+    While any transaction carrying it is valid, algod rejects every other
+    transaction from the employer with the same lease, so a payment can be
+    signed again on resume without risking a second one landing.
+    """
+    return hashlib.sha256(f"{payroll_id}:{address}".encode()).digest()
+
+
+class JournalEntry(NamedTuple):
+    position: int  # of the payment in the run's rows
+    employee_address: str
+    employee_name: str
+    amount: int  # microAlgos
+    note: str
+    lease: bytes
+    state: str
+    unit: Optional[int]  # submission unit: one payment or one atomic group
+    txid: Optional[str]
+    signed: Optional[bytes]  # msgpack signed transaction, exactly as sent
+    fee: Optional[int]
+    first_valid: Optional[int]
+    last_valid: Optional[int]
+    confirmed_round: Optional[int]
+    error: Optional[str]
+
+
+class SignedEntry(NamedTuple):
+    position: int
+    txid: str
+    signed: bytes
+    fee: int
+    first_valid: int
+    last_valid: int
+
+
+_COLUMNS = ", ".join(JournalEntry._fields)
+
+
+class PayrollJournal:
+    """
+    Write-ahead journal of one payroll run, in ``<directory>/<payroll_id>.journal``.
+
+    The run records every payment's intent (employee, amount, note, lease)
+    before anything is signed. It records each signed transaction, txid and
+    validity window before anything is broadcast, then confirmations as they
+    arrive. Before sending unit ``n``, ``mark_sending`` makes sure the
+    durable "sent mark" is above ``n``; units at or above the mark were never
+    sent. After a crash, only signed units below the mark and still
+    unconfirmed need checking against the chain (see
+    ``Payroll.resume_payroll``).
+
+    SQLite in WAL mode with ``synchronous=FULL``; every record is one
+    transaction, durable once the call returns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                position INTEGER PRIMARY KEY,
+                employee_address TEXT,
+                employee_name TEXT,
+                amount INTEGER,
+                note TEXT,
+                lease BLOB,
+                state TEXT,
+                unit INTEGER,
+                txid TEXT,
+                signed BLOB,
+                fee INTEGER,
+                first_valid INTEGER,
+                last_valid INTEGER,
+                confirmed_round INTEGER,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_unit ON entries (unit);
+            """)
+        self._mark = int(self._meta_value("sent_mark") or 0)
+
+    @classmethod
+    def create(
+        cls,
+        directory: str,
+        payroll_id: str,
+        rows: Iterable[Tuple[str, str, int, str]],
+        **meta,
+    ) -> "PayrollJournal":
+        """
+        Start the journal for ``payroll_id`` with one intent per
+        ``(employee_address, employee_name, microalgos, note)`` row;
+        ``meta`` (JSON-serialisable) is stored alongside for resuming.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = journal_path(directory, payroll_id)
+        if os.path.exists(path):
+            raise FileExistsError(f"A journal for {payroll_id} already exists")
+        journal = cls(path)
+        with journal._transaction():
+            journal._db.executemany(
+                "INSERT INTO entries (position, employee_address, employee_name, "
+                "amount, note, lease, state) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (i, address, name, int(amount), note, lease, INTENT)
+                    for i, (address, name, amount, note) in enumerate(rows)
+                    for lease in [payment_lease(payroll_id, address)]
+                ),
+            )
+            journal._set_meta(payroll_id=payroll_id, completed=False, **meta)
+        return journal
+
+    @classmethod
+    def open(cls, directory: str, payroll_id: str) -> "PayrollJournal":
+        path = journal_path(directory, payroll_id)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No journal for {payroll_id} in {directory}")
+        return cls(path)
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    @property
+    def meta(self) -> dict:
+        return {
+            key: json.loads(value)
+            for key, value in self._db.execute("SELECT key, value FROM meta")
+        }
+
+    @property
+    def payroll_id(self) -> str:
+        return self.meta["payroll_id"]
+
+    @property
+    def completed(self) -> bool:
+        return bool(self.meta.get("completed"))
+
+    @property
+    def logged(self) -> bool:
+        """Every row has an audit row; SIGNED ones were logged as PENDING."""
+        return bool(self.meta.get("logged"))
+
+    @property
+    def sent_mark(self) -> int:
+        """Units numbered at or above this were never handed to algod."""
+        return self._mark
+
+    def entries(self, states: Optional[Sequence[str]] = None) -> List[JournalEntry]:
+        sql = f"SELECT {_COLUMNS} FROM entries"
+        params: list = []
+        if states is not None:
+            sql += f" WHERE state IN ({', '.join('?' * len(states))})"
+            params = list(states)
+        sql += " ORDER BY position"
+        return [JournalEntry(*row) for row in self._db.execute(sql, params)]
+
+    def next_unit(self) -> int:
+        (unit,) = self._db.execute("SELECT MAX(unit) FROM entries").fetchone()
+        return 0 if unit is None else unit + 1
+
+    # ----------------------
+    # Recording
+    # ----------------------
+    def record_signed(self, units: Sequence[Tuple[int, Sequence[SignedEntry]]]) -> None:
+        """Record signed ``(unit, entries)`` before any of them is sent."""
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE entries SET state = ?, unit = ?, txid = ?, signed = ?, "
+                "fee = ?, first_valid = ?, last_valid = ?, error = NULL "
+                "WHERE position = ?",
+                (
+                    (
+                        SIGNED,
+                        unit,
+                        e.txid,
+                        e.signed,
+                        e.fee,
+                        e.first_valid,
+                        e.last_valid,
+                        e.position,
+                    )
+                    for unit, entries in units
+                    for e in entries
+                ),
+            )
+
+    def record_failed(self, positions: Iterable[int], error: str) -> None:
+        """Entries that were never signed and will not be (e.g. a bad address)."""
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE entries SET state = ?, error = ? WHERE position = ?",
+                ((FAILED, error, p) for p in positions),
+            )
+
+    def mark_sending(self, unit: int) -> None:
+        """Call before sending ``unit``; units must be sent in increasing order."""
+        if unit < self._mark:
+            return
+        mark = unit + MARK_STRIDE
+        with self._transaction():
+            self._set_meta(sent_mark=mark)
+        self._mark = mark
+
+    def record_results(self, results: Iterable[Tuple[int, UnitResult]]) -> None:
+        """
+        Record unit outcomes. Confirmed units are final, and so are failed
+        ones (rejected or expired). A ``pending`` unit stays SIGNED with the
+        error noted, since it may still land until its last valid round.
+        """
+        rows = []
+        for unit, result in results:
+            if result.ok:
+                rows.append((CONFIRMED, result.confirmed_round, None, unit))
+            elif result.pending:
+                rows.append((SIGNED, None, result.error, unit))
+            else:
+                rows.append((FAILED, None, result.error, unit))
+        if not rows:
+            return
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE entries SET state = ?, confirmed_round = ?, error = ? "
+                "WHERE unit = ? AND state != 'confirmed'",
+                rows,
+            )
+
+    def mark_logged(self) -> None:
+        """Every row is in the audit log; later resumes log only what settles."""
+        with self._transaction():
+            self._set_meta(logged=True)
+
+    def complete(self) -> None:
+        """Mark the run finished (every row logged); resuming is then a no-op."""
+        with self._transaction():
+            self._set_meta(completed=True)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def _meta_value(self, key: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, **values) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            ((key, json.dumps(value)) for key, value in values.items()),
+        )
+
+
+class _Transaction:
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def __enter__(self):
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self._db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def journal_path(directory: str, payroll_id: str) -> str:
+    return os.path.join(directory, payroll_id + JOURNAL_SUFFIX)
+
+
+def incomplete_payrolls(directory: str) -> List[str]:
+    """Payroll ids with a journal in ``directory`` that never completed."""
+    if not os.path.isdir(directory):
+        return []
+    pending = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        with PayrollJournal(os.path.join(directory, name)) as journal:
+            if not journal.completed:
+                pending.append(journal.payroll_id)
+    return pending
+
+
+def units_of(entries: Iterable[JournalEntry]) -> Dict[int, List[JournalEntry]]:
+    """Signed entries grouped by unit, each unit in group order."""
+    units: Dict[int, List[JournalEntry]] = {}
+    for entry in sorted(entries, key=lambda e: e.position):
+        if entry.unit is not None:
+            units.setdefault(entry.unit, []).append(entry)
+    return dict(sorted(units.items()))
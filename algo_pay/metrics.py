@@ -0,0 +1,352 @@
+# algo_pay/metrics.py
+
+import bisect
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from algosdk import error
+
+# Hot-path stages timed during a payroll run
+STAGES = (
+    "suggested_params",
+    "sign",
+    "send",
+    "confirm",
+    "balance",
+    "log",
+    "journal",
+    "simulate",
+    "run",
+)
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "items", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.items = 0
+        self.sum = 0.0
+
+
+class MetricsRegistry:
+    """
+    Per-stage counters and latency histograms for payroll runs.
+
+    Stage timings are keyed by ``(stage, department, job_id)``; counters
+    (algod errors, retries, payments) carry their own labels. Read the
+    numbers in-process with ``snapshot`` or as Prometheus text with
+    ``prometheus_text``.
+
+    A disabled registry records nothing and its timers are a shared no-op,
+    so instrumentation costs a flag check per stage.
+    """
+
+    def __init__(
+        self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.enabled = enabled
+        self.bucket_bounds = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # ----------------------
+    # Recording
+    # ----------------------
+    def observe(
+        self,
+        stage: str,
+        seconds: float,
+        department: str = "",
+        job_id: str = "",
+        items: int = 1,
+    ) -> None:
+        """Record one call of ``stage`` that took ``seconds`` for ``items`` txns."""
+        if not self.enabled:
+            return
+        key = (stage, department, job_id)
+        index = bisect.bisect_left(self.bucket_bounds, seconds)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(len(self.bucket_bounds) + 1)
+            hist.buckets[index] += 1
+            hist.count += 1
+            hist.items += items
+            hist.sum += seconds
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add ``value`` to the counter ``name`` with the given labels."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextlib.contextmanager
+    def bind(
+        self, department: str = "", job_id: Optional[str] = None
+    ) -> Iterator[None]:
+        """
+        Attribute stages recorded in this context (including those inside
+        ``algo_pay.transactions``) to this registry, department and job.
+
+        With ``job_id=None`` an enclosing binding's job id is kept.
+        """
+        current = _binding.get()
+        if job_id is None:
+            job_id = current[2] if current and current[1] == department else ""
+        token = _binding.set((self, department, job_id))
+        try:
+            yield
+        finally:
+            _binding.reset(token)
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    def snapshot(self) -> dict:
+        """
+        Copy of everything recorded so far::
+
+            {"stages": [{"stage", "department", "job_id", "count", "items",
+                         "sum_seconds", "buckets": {le: cumulative_count}}],
+             "counters": [{"name", "labels", "value"}]}
+        """
+        with self._lock:
+            histograms = [
+                (key, list(h.buckets), h.count, h.items, h.sum)
+                for key, h in self._histograms.items()
+            ]
+            counters = list(self._counters.items())
+
+        stages = []
+        for (stage, department, job_id), buckets, count, items, total in sorted(
+            histograms
+        ):
+            stages.append(
+                {
+                    "stage": stage,
+                    "department": department,
+                    "job_id": job_id,
+                    "count": count,
+                    "items": items,
+                    "sum_seconds": total,
+                    "buckets": dict(zip(self._bucket_labels(), _cumulative(buckets))),
+                }
+            )
+        return {
+            "stages": stages,
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters)
+            ],
+        }
+
+    def stage_totals(self, stage: str, **labels: str) -> dict:
+        """Sum count, items and seconds of ``stage`` over matching labels."""
+        totals = {"count": 0, "items": 0, "sum_seconds": 0.0}
+        for record in self.snapshot()["stages"]:
+            if record["stage"] != stage or any(
+                record[k] != v for k, v in labels.items()
+            ):
+                continue
+            for field in totals:
+                totals[field] += record[field]
+        return totals
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Sum of counter ``name`` over entries matching ``labels``."""
+        total = 0
+        for record in self.snapshot()["counters"]:
+            if record["name"] == name and all(
+                record["labels"].get(k) == str(v) for k, v in labels.items()
+            ):
+                total += record["value"]
+        return total
+
+    def prometheus_text(self, prefix: str = "algopay") -> str:
+        """Everything recorded, in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        if snap["stages"]:
+            name = f"{prefix}_stage_seconds"
+            lines += [
+                f"# HELP {name} Time spent in each payroll stage.",
+                f"# TYPE {name} histogram",
+            ]
+            for record in snap["stages"]:
+                labels = {k: record[k] for k in ("stage", "department", "job_id")}
+                for le, count in record["buckets"].items():
+                    lines.append(
+                        f"{name}_bucket{_labels({**labels, 'le': le})} {count}"
+                    )
+                lines.append(f"{name}_sum{_labels(labels)} {record['sum_seconds']!r}")
+                lines.append(f"{name}_count{_labels(labels)} {record['count']}")
+
+            name = f"{prefix}_stage_transactions_total"
+            lines += [
+                f"# HELP {name} Transactions handled by each payroll stage.",
+                f"# TYPE {name} counter",
+            ]
+            for record in snap["stages"]:
+                labels = {k: record[k] for k in ("stage", "department", "job_id")}
+                lines.append(f"{name}{_labels(labels)} {record['items']}")
+
+        by_name: Dict[str, List[dict]] = {}
+        for record in snap["counters"]:
+            by_name.setdefault(record["name"], []).append(record)
+        for counter_name, records in by_name.items():
+            name = f"{prefix}_{counter_name}"
+            lines.append(f"# TYPE {name} counter")
+            for record in records:
+                lines.append(f"{name}{_labels(record['labels'])} {record['value']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _bucket_labels(self) -> List[str]:
+        return [repr(float(b)) for b in self.bucket_bounds] + ["+Inf"]
+
+
+class _StageTimer:
+    __slots__ = ("registry", "stage", "department", "job_id", "items", "start")
+
+    def __init__(self, registry, stage, department, job_id, items):
+        self.registry = registry
+        self.stage = stage
+        self.department = department
+        self.job_id = job_id
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(
+            self.stage,
+            time.perf_counter() - self.start,
+            self.department,
+            self.job_id,
+            self.items,
+        )
+        if isinstance(exc, _ALGOD_ERRORS):
+            self.registry.increment(
+                "algod_errors_total",
+                stage=self.stage,
+                department=self.department,
+                job_id=self.job_id,
+                error=_error_label(exc),
+            )
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+# Failures counted as algod errors when they escape a timed stage
+_ALGOD_ERRORS = (
+    error.AlgodHTTPError,
+    error.AlgodResponseError,
+    error.ConfirmationTimeoutError,
+    error.TransactionRejectedError,
+    OSError,
+)
+
+# Process-wide registry; disabled until someone calls enable()
+default_metrics = MetricsRegistry()
+
+# (registry, department, job_id) bound by MetricsRegistry.bind
+_binding: ContextVar[Optional[tuple]] = ContextVar("algopay_metrics", default=None)
+
+
+def stage(name: str, items: int = 1):
+    """Time a block as ``name`` against the bound (or default) registry."""
+    binding = _binding.get()
+    if binding is None:
+        if not default_metrics.enabled:
+            return _NULL_TIMER
+        return _StageTimer(default_metrics, name, "", "", items)
+    registry, department, job_id = binding
+    if not registry.enabled:
+        return _NULL_TIMER
+    return _StageTimer(registry, name, department, job_id, items)
+
+
+def increment(name: str, value: float = 1, **labels: str) -> None:
+    """Bump a counter on the bound (or default) registry with bound labels."""
+    binding = _binding.get()
+    if binding is None:
+        if default_metrics.enabled:
+            default_metrics.increment(name, value, department="", job_id="", **labels)
+        return
+    registry, department, job_id = binding
+    if registry.enabled:
+        registry.increment(name, value, department=department, job_id=job_id, **labels)
+
+
+def _error_label(exc: BaseException) -> str:
+    if isinstance(exc, error.AlgodHTTPError) and exc.code:
+        return str(exc.code)
+    return type(exc).__name__
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    total, out = 0, []
+    for c in counts:
+        total += c
+        out.append(total)
+    return out
+
+
+def _labels(labels: dict) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
@@ -1,9 +1,14 @@
 # algo_pay/notifier.py
 
+import atexit
+import queue
 import smtplib
+import threading
+import time
+import weakref
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 class Notifier:
@@ -27,8 +32,18 @@ class ConsoleNotifier(Notifier):
 
 class EmailNotifier(Notifier):
     """
-    Notifier that sends emails directly via SMTP.
-    Expects SMTP credentials and default recipient info on initialization.
+    Notifier that emails job details via SMTP from a background queue.
+
+    ``notify`` only enqueues the payload, so a payroll run never waits on the
+    mail server. A worker thread keeps one authenticated SMTP session open
+    (reconnecting if the server drops it) and, with ``digest_window`` > 0,
+    collects notifications for that many seconds and sends one digest email
+    per recipient. ``flush`` waits for the queue to drain; ``close`` also
+    ends the session. Pending mail is flushed at interpreter exit.
+
+    Port 465 uses implicit TLS; other ports use STARTTLS unless
+    ``starttls=False`` (e.g. for a local test server). Login is skipped when
+    no password is set.
     """
 
     def __init__(
@@ -38,42 +53,232 @@ class EmailNotifier(Notifier):
         sender_email: str,
         sender_password: str,
         recipient_email: str,
+        digest_window: float = 0.0,
+        max_digest_size: int = 100,
+        use_ssl: Optional[bool] = None,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0,
     ):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.recipient_email = recipient_email
+        self.digest_window = digest_window
+        self.max_digest_size = max_digest_size
+        self.use_ssl = smtp_port == 465 if use_ssl is None else use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        # Close the SMTP session after this long without mail
+        self.idle_timeout = idle_timeout
 
+        self.sent = 0
+        self.failed = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._smtp = None
+        _live_notifiers.add(self)
+
+    # ----------------------
+    # Public API
+    # ----------------------
     def notify(
         self, payload: Dict[str, Any], recipient_override: Optional[str] = None
     ) -> None:
-        """Send an email immediately with job details in the payload."""
+        """
+        Queue an email with job details in the payload; returns immediately.
+
+        After ``close`` the notification is logged and dropped (counted in
+        ``failed``) rather than raised, so a payroll that has already paid
+        cannot fail on it.
+        """
         recipient = recipient_override or self.recipient_email
+        with self._cond:
+            if self._closed:
+                self.failed += 1
+                print(
+                    f"[EmailNotifier] Notifier is closed; dropped notification "
+                    f"for job {payload.get('job_id')}"
+                )
+                return
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._worker, name="EmailNotifier", daemon=True
+                )
+                self._thread.start()
+            # Under the lock, so a concurrent close() cannot queue its stop
+            # marker ahead of this item
+            self._queue.put((recipient, payload))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued notification has been handled."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Deliver what is queued, then stop the worker and end the session."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+        else:
+            self._disconnect()
+        _live_notifiers.discard(self)
+
+    # ----------------------
+    # Delivery worker
+    # ----------------------
+    def _worker(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._disconnect()
+                continue
+            if item is _STOP:
+                break
 
-        subject = f"Payroll Job Completed: {payload.get('job_id', 'UnknownJob')}"
-        body = (
-            f"Payroll Job ID: {payload.get('job_id', 'N/A')}\n"
-            f"Department: {payload.get('department', 'N/A')}\n"
-            f"Employees Paid: {payload.get('employees', [])}\n"
-            f"Transaction IDs: {payload.get('txids', [])}\n"
-            f"Status: {payload.get('status', 'Unknown')}\n"
-        )
+            batch = [item]
+            stop = self._collect(batch)
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                # Keep the worker alive, or later mail would queue forever
+                self.failed += len(batch)
+                print(
+                    f"[EmailNotifier] Failed to deliver {len(batch)} notifications: {e}"
+                )
+            finally:
+                with self._cond:
+                    self._pending -= len(batch)
+                    self._cond.notify_all()
+            if stop:
+                break
+        self._disconnect()
+
+    def _collect(self, batch: list) -> bool:
+        """Gather notifications for the digest window; True if told to stop."""
+        if self.digest_window <= 0:
+            return False
+        deadline = time.monotonic() + self.digest_window
+        while len(batch) < self.max_digest_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    def _deliver(self, batch: list) -> None:
+        by_recipient: Dict[str, List[Dict[str, Any]]] = {}
+        for recipient, payload in batch:
+            by_recipient.setdefault(recipient, []).append(payload)
+
+        for recipient, payloads in by_recipient.items():
+            jobs = ", ".join(str(p.get("job_id")) for p in payloads)
+            try:
+                self._send(recipient, self._build_message(recipient, payloads))
+                self.sent += 1
+                print(f"[EmailNotifier] Email sent to {recipient} for job {jobs}")
+            except Exception as e:
+                self.failed += 1
+                print(f"[EmailNotifier] Failed to send email: {e}")
+
+    def _build_message(
+        self, recipient: str, payloads: List[Dict[str, Any]]
+    ) -> MIMEMultipart:
+        if len(payloads) == 1:
+            subject = (
+                f"Payroll Job Completed: {payloads[0].get('job_id', 'UnknownJob')}"
+            )
+        else:
+            subject = f"Payroll Digest: {len(payloads)} jobs completed"
+        body = "\n".join(_format_payload(p) for p in payloads)
 
-        # Build email message
         message = MIMEMultipart()
         message["From"] = self.sender_email
         message["To"] = recipient
         message["Subject"] = subject
         message.attach(MIMEText(body, "plain"))
+        return message
 
-        try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipient, message.as_string())
-            print(
-                f"[EmailNotifier] Email sent to {recipient} for job {payload.get('job_id')}"
+    # ----------------------
+    # SMTP session
+    # ----------------------
+    def _send(self, recipient: str, message: MIMEMultipart) -> None:
+        # A long-lived session may have been dropped by the server; reconnect
+        # once and retry before giving up on this message
+        for attempt in (1, 2):
+            try:
+                if self._smtp is None:
+                    self._connect()
+                self._smtp.sendmail(self.sender_email, recipient, message.as_string())
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self._disconnect()
+                if attempt == 2:
+                    raise
+
+    def _connect(self) -> None:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(
+                self.smtp_server, self.smtp_port, timeout=self.timeout
             )
-        except Exception as e:
-            print(f"[EmailNotifier] Failed to send email: {e}")
+        else:
+            smtp = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.starttls and not self.use_ssl:
+                smtp.starttls()
+            if self.sender_password:
+                smtp.login(self.sender_email, self.sender_password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def _disconnect(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+def _format_payload(payload: Dict[str, Any]) -> str:
+    return (
+        f"Payroll Job ID: {payload.get('job_id', 'N/A')}\n"
+        f"Department: {payload.get('department', 'N/A')}\n"
+        f"Employees Paid: {payload.get('employees', [])}\n"
+        f"Transaction IDs: {payload.get('txids', [])}\n"
+        f"Status: {payload.get('status', 'Unknown')}\n"
+    )
+
+
+_STOP = object()
+_live_notifiers: "weakref.WeakSet[EmailNotifier]" = weakref.WeakSet()
+
+
+def close_notifiers(timeout: Optional[float] = 30.0) -> None:
+    """Deliver queued email for every live ``EmailNotifier`` (run at exit)."""
+    for notifier in list(_live_notifiers):
+        notifier.close(timeout)
+
+
+atexit.register(close_notifiers)
@@ -0,0 +1,93 @@
+# algo_pay/params_cache.py
+
+import copy
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from algosdk import transaction
+from algosdk.v2client import algod
+
+
+class SuggestedParamsCache:
+    """
+    Process-wide cache of ``suggested_params`` keyed by algod endpoint.
+
+    A cached entry is refreshed when it is older than ``ttl`` seconds, or when
+    a round observed on that endpoint (e.g. while waiting for confirmations)
+    is more than ``round_margin`` rounds past the entry's first valid round.
+    Callers always get their own copy, so mutating it (flat fees, custom
+    validity windows) never leaks into other transactions. Each endpoint is
+    fetched under its own lock, so a slow endpoint only holds up callers of
+    that endpoint, and concurrent callers share one fetch.
+    """
+
+    def __init__(self, ttl: float = 30.0, round_margin: int = 10):
+        self.ttl = ttl
+        self.round_margin = round_margin
+        self._entries: Dict[Any, tuple] = {}
+        self._last_round: Dict[Any, int] = {}
+        # Guards the dicts; never held across a network call
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[Any, threading.Lock] = {}
+
+    @staticmethod
+    def _key(client: algod.AlgodClient):
+        return getattr(client, "algod_address", None) or id(client)
+
+    def get(self, client: algod.AlgodClient) -> transaction.SuggestedParams:
+        """Return suggested params for ``client``, fetching only when stale."""
+        key = self._key(client)
+        entry = self._fresh_entry(key)
+        if entry is None:
+            with self._lock:
+                fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+            with fetch_lock:
+                # Another caller may have refreshed it while we waited
+                entry = self._fresh_entry(key)
+                if entry is None:
+                    entry = (client.suggested_params(), time.monotonic())
+                    with self._lock:
+                        self._entries[key] = entry
+        return copy.copy(entry[0])
+
+    def _fresh_entry(self, key) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_stale(key, entry):
+                return None
+            return entry
+
+    def observe_round(self, client: algod.AlgodClient, last_round: int) -> None:
+        """Record the latest round seen on ``client``'s endpoint."""
+        key = self._key(client)
+        with self._lock:
+            if last_round > self._last_round.get(key, 0):
+                self._last_round[key] = last_round
+
+    def invalidate(self, client: Optional[algod.AlgodClient] = None) -> None:
+        """Drop the cached params for one endpoint, or for all of them."""
+        with self._lock:
+            if client is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(client), None)
+
+    def _is_stale(self, key, entry) -> bool:
+        params, fetched_at = entry
+        if time.monotonic() - fetched_at > self.ttl:
+            return True
+        last_round = self._last_round.get(key)
+        first = getattr(params, "first", None)
+        if last_round is None or not isinstance(first, int):
+            return False
+        return last_round > first + self.round_margin
+
+
+# Shared by every builder and Payroll instance in the process
+default_params_cache = SuggestedParamsCache()
+
+
+def get_suggested_params(client: algod.AlgodClient) -> transaction.SuggestedParams:
+    """Fetch suggested params for ``client`` through the shared cache."""
+    return default_params_cache.get(client)
@@ -0,0 +1,120 @@
+# algo_pay/paycalc.py
+
+from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN, ROUND_HALF_UP
+from decimal import Decimal, localcontext
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+MICROALGOS_PER_ALGO = 1_000_000
+
+# How fractional microAlgos are settled when pay is computed
+ROUNDING_POLICIES = ("half_even", "half_up", "floor", "ceil")
+
+_DECIMAL_ROUNDING = {
+    "half_even": ROUND_HALF_EVEN,
+    "half_up": ROUND_HALF_UP,
+    "floor": ROUND_FLOOR,
+    "ceil": ROUND_CEILING,
+}
+
+
+def _check_policy(rounding: str) -> None:
+    if rounding not in ROUNDING_POLICIES:
+        raise ValueError(
+            f"Unknown rounding policy {rounding!r}; expected one of {ROUNDING_POLICIES}"
+        )
+
+
+def algos_to_microalgos(amount: float, rounding: str = "half_even") -> int:
+    """
+    Convert an ALGO amount to integer microAlgos.
+
+    Goes through the decimal representation of ``amount`` so values such as
+    0.29 become exactly 290000 instead of truncating to 289999.
+    """
+    _check_policy(rounding)
+    micro = Decimal(repr(float(amount))) * MICROALGOS_PER_ALGO
+    return int(micro.quantize(Decimal(1), rounding=_DECIMAL_ROUNDING[rounding]))
+
+
+def microalgos_to_algos(amount: int) -> float:
+    return amount / MICROALGOS_PER_ALGO
+
+
+# Rates and hours with at most this many decimal places (nearly all real
+# ones) are multiplied as exact scaled integers; the rest go through Decimal
+RATE_PLACES = 12
+HOURS_PLACES = 6
+
+
+def _scaled(values: np.ndarray, places: int) -> Tuple[np.ndarray, np.ndarray]:
+    # values * 10**places as integers, and where that is the decimal value
+    scale = 10.0**places
+    units = np.rint(values * scale)
+    exact = (units / scale == values) & (units < 2**53)
+    return np.where(exact, units, 0).astype(np.int64), exact
+
+
+def _divide(numerators: np.ndarray, divisor: int, rounding: str) -> np.ndarray:
+    # Integer division of Python ints, settled once by ``rounding``
+    quotients, remainders = numerators // divisor, numerators % divisor
+    if rounding == "floor":
+        return quotients
+    if rounding == "ceil":
+        return quotients + (remainders > 0)
+    if rounding == "half_up":
+        return quotients + (2 * remainders >= divisor)
+    odd = (quotients % 2) == 1
+    return quotients + (
+        (2 * remainders > divisor) | ((2 * remainders == divisor) & odd)
+    )
+
+
+def compute_pay_microalgos(
+    rates: Union[Sequence[float], np.ndarray],
+    hours: Union[float, Sequence[float], np.ndarray],
+    rounding: str = "half_even",
+) -> np.ndarray:
+    """
+    Compute every employee's pay in one vectorized pass.
+
+    ``rates`` are hourly rates in ALGOs; ``hours`` is a single value for the
+    whole roster or one value per employee. Like ``algos_to_microalgos``,
+    each value counts as the decimal it prints as, so ``rate * hours`` in
+    microAlgos is computed exactly and rounded once with ``rounding``.
+    Returns an ``int64`` array of microAlgo amounts in roster order.
+    """
+    _check_policy(rounding)
+    rates = np.asarray(rates, dtype=np.float64)
+    hours = np.asarray(hours, dtype=np.float64)
+    for values in (rates, hours):
+        # NaN and inf pass a "< 0" check, then cast to garbage int64 amounts
+        if np.any(~np.isfinite(values) | (values < 0)):
+            raise ValueError("Rates and hours must be finite and non-negative")
+    rates, hours = np.broadcast_arrays(rates, hours)
+
+    rate_units, rate_exact = _scaled(rates, RATE_PLACES)
+    hour_units, hour_exact = _scaled(hours, HOURS_PLACES)
+    # Python ints: the product of the scaled values can overflow int64
+    products = rate_units.astype(object) * hour_units.astype(object)
+    divisor = 10 ** (RATE_PLACES + HOURS_PLACES) // MICROALGOS_PER_ALGO
+    amounts = _divide(products, divisor, rounding)
+
+    for i in np.flatnonzero(~(rate_exact & hour_exact)):
+        with localcontext() as context:
+            context.prec = 64
+            micro = (
+                Decimal(repr(float(rates.flat[i])))
+                * Decimal(repr(float(hours.flat[i])))
+                * MICROALGOS_PER_ALGO
+            )
+            amounts.flat[i] = int(
+                micro.quantize(Decimal(1), rounding=_DECIMAL_ROUNDING[rounding])
+            )
+    return amounts.astype(np.int64)
+
+
+def total_microalgos(amounts: Union[Sequence[int], np.ndarray]) -> int:
+    """Exact total of microAlgo amounts as a Python int."""
+    return int(np.sum(np.asarray(amounts, dtype=np.int64), dtype=np.int64))
@@ -1,11 +1,61 @@
-from typing import Dict, List, Optional
+import functools
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
 from algosdk.v2client import algod
-from algosdk import mnemonic, account, transaction
-import csv
-from datetime import datetime, timezone
+from algosdk import mnemonic, account
+from . import metrics, transactions
+from .audit import AuditBackend, FlushPolicy, get_audit_writer
+from .balance import BalanceTracker
+from .bundle import (
+    BUNDLE_SUFFIX,
+    DEFAULT_ROUND_SECONDS,
+    FAILED_BUNDLE_DIR,
+    BundleNotValid,
+    BundleRow,
+    PayrollBundle,
+    broadcast_bundle,
+    bundle_results,
+    read_bundle,
+    validity_window,
+    write_bundle,
+)
+from .clients import NETWORKS, get_algod_client, resolve_network  # noqa: F401
+from .history import HistoryQueries, PayrollHistory
+from .journal import (
+    CONFIRMED,
+    INTENT,
+    SIGNED,
+    JournalEntry,
+    PayrollJournal,
+    SignedEntry,
+    payment_lease,
+    units_of,
+)
+from .metrics import MetricsRegistry, default_metrics
+from .paycalc import compute_pay_microalgos, microalgos_to_algos, total_microalgos
+from .roster import Roster
+from .roster_loader import RosterLoadReport, load_roster
+from .params_cache import SuggestedParamsCache, default_params_cache
+from .pipeline import PaymentPipeline, RawUnit, UnitResult
+from .signing import BatchSigner
+from .simulation import SimulatedFailure, SimulationReport, simulate_payments
+from .scheduler import PayrollScheduler, get_default_scheduler
+from datetime import datetime, timedelta, timezone
 import uuid
-import threading
-import time
+
+
+def _metered(method):
+    # Attribute every stage timed inside ``method`` to this Payroll's department
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.metrics.bind(self.department):
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 def log_transaction(
@@ -21,48 +71,36 @@ def log_transaction(
     balance_before: float,
     balance_after: float,
     status: str,
+    writer: Optional[AuditBackend] = None,
 ):
-    """Append a payroll transaction to a CSV audit log."""
-    header = [
-        "timestamp",
-        "department",
-        "job_id",
-        "payroll_id",
-        "employer",
-        "employee_name",
-        "employee_address",
-        "amount_ALGO",
-        "txid",
-        "employer_balance_before",
-        "employer_balance_after",
-        "status",
-    ]
-
-    try:
-        with open(filename, "x", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-    except FileExistsError:
-        pass
-
-    with open(filename, "a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(
-            [
-                datetime.utcnow().isoformat(),
-                department,
-                job_id,
-                payroll_id,
-                employer,
-                employee_name,
-                employee_address,
-                amount,
-                txid,
-                balance_before,
-                balance_after,
-                status,
-            ]
-        )
+    """Append a payroll transaction to the audit log.
+
+    Rows go through ``writer``, which buffers them until the run or its
+    flush policy writes them out. Without one, the row goes to the shared
+    writer for ``filename`` (CSV, or SQLite for ``.db`` paths) and is
+    flushed to disk before returning, as nobody will end the run.
+    """
+    standalone = writer is None
+    if standalone:
+        writer = get_audit_writer(filename)
+    writer.write_row(
+        [
+            datetime.utcnow().isoformat(),
+            department,
+            job_id,
+            payroll_id,
+            employer,
+            employee_name,
+            employee_address,
+            amount,
+            txid,
+            balance_before,
+            balance_after,
+            status,
+        ]
+    )
+    if standalone:
+        writer.flush()
 
 
 class Payroll:
@@ -71,23 +109,25 @@ class Payroll:
         employer_mnemonic: str,
         department: str,
         network: str = "localnet",
-        history_file: str = "payroll_history.csv",
+        history_file: Union[str, AuditBackend] = "payroll_history.csv",
         notifier: Optional[object] = None,
+        params_cache: Optional[SuggestedParamsCache] = None,
+        audit_flush: FlushPolicy = "run",
+        audit_writer: Optional[AuditBackend] = None,
+        audit_index: bool = False,
+        quiet: bool = False,
+        client: Optional[algod.AlgodClient] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        journal_dir: Optional[str] = None,
     ):
-        # Select network
-        if network == "localnet":
-            algod_address = "http://localhost:4001"
-            algod_token = "a" * 64
-        elif network == "testnet":
-            algod_address = "https://testnet-api.algonode.cloud"
-            algod_token = ""
-        elif network == "mainnet":
-            algod_address = "https://mainnet-api.algonode.cloud"
-            algod_token = ""
-        else:
-            raise ValueError("Unsupported network")
+        # Select network; clients (and their keep-alive connection pools) are
+        # shared by every Payroll on the same endpoint
+        if client is None:
+            client = get_algod_client(*resolve_network(network))
+        self.client = client
 
-        self.client = algod.AlgodClient(algod_token, algod_address)
+        # Suggested params are shared by every Payroll on the same endpoint
+        self.params_cache = params_cache or default_params_cache
 
         # Recover employer account
         self.employer_private_key = mnemonic.to_private_key(employer_mnemonic)
@@ -95,29 +135,62 @@ class Payroll:
             self.employer_private_key
         )
 
+        # Employer balance for the audit log, read once per run and walked
+        # forward locally instead of two account_info calls per payment
+        self.balance_tracker = BalanceTracker(self.client, self.employer_address)
+
         # Department + employees
         self.department = department
-        self.employees: Dict[str, Dict[str, str | float]] = {}
+        self.employees = Roster()
 
-        # History file
-        self.history_file = history_file
+        # Quiet mode suppresses per-employee output (roster edits, payments)
+        self.quiet = quiet
+
+        # History file, written through a writer shared with every other
+        # Payroll (and thread) logging to the same path: SQLite for .db paths,
+        # CSV otherwise, or any AuditBackend passed in. With audit_index the
+        # CSV writer also keeps the history query index current as it flushes
+        if isinstance(history_file, AuditBackend):
+            audit_writer = audit_writer or history_file
+        self.audit_writer = audit_writer or get_audit_writer(
+            history_file, flush=audit_flush, index=audit_index
+        )
+        self.history_file = self.audit_writer.filename
+        self._history: Optional[HistoryQueries] = None
+
+        # Per-stage timings and counters; the shared registry is disabled
+        # (and costs next to nothing) until someone calls enable()
+        self.metrics = metrics or default_metrics
+
+        # Write-ahead journal per payroll_id, so a crashed run can be resumed
+        # (resume_payroll) instead of re-run
+        self.journal_dir = journal_dir
 
         # Optional notifier (ConsoleNotifier, EmailNotifier, etc.)
         self.notifier = notifier
+        self._job = None
+        self._scheduler = None
+        self._prepared: List[str] = []
+        self._job_stopped = threading.Event()
+        self._prepared_lock = threading.Lock()
 
         print(f"[{self.department}] Connected as {self.employer_address}")
 
     # ----------------------
     # Account Utilities
     # ----------------------
+    @_metered
     def get_balance(self, address: str = None) -> float:
         if not address:
             address = self.employer_address
-        info = self.client.account_info(address)
+        with metrics.stage("balance"):
+            info = self.client.account_info(address)
         return info["amount"] / 1e6  # microAlgos → ALGOs
 
+    @_metered
     def get_asset_balance(self, address: str, asset_id: int) -> float:
-        info = self.client.account_info(address)
+        with metrics.stage("balance"):
+            info = self.client.account_info(address)
         for holding in info.get("assets", []):
             if holding["asset-id"] == asset_id:
                 return holding["amount"]
@@ -127,78 +200,466 @@ class Payroll:
     # Payroll Management
     # ----------------------
     def add_employee(self, address: str, hourly_rate: float, name: str = None):
-        self.employees[address] = {"rate": hourly_rate, "name": name or address}
-        print(
-            f"[{self.department}] Added employee {name or address} at {hourly_rate} ALGO/hr"
-        )
+        self.employees.add(address, hourly_rate, name)
+        if not self.quiet:
+            print(
+                f"[{self.department}] Added employee {name or address} at {hourly_rate} ALGO/hr"
+            )
 
     def remove_employee(self, address: str):
-        if address in self.employees:
-            removed = self.employees[address]["name"]
-            del self.employees[address]
+        removed = self.employees.remove(address)
+        if removed is not None and not self.quiet:
             print(f"[{self.department}] Removed employee {removed}")
 
+    def add_employees(
+        self,
+        addresses: Sequence[str],
+        hourly_rates: Sequence[float],
+        names: Optional[Sequence[Optional[str]]] = None,
+    ) -> int:
+        """Add or update many employees at once; returns how many were new."""
+        added = self.employees.add_many(addresses, hourly_rates, names)
+        if not self.quiet:
+            print(
+                f"[{self.department}] Added {added} employees "
+                f"({len(addresses) - added} updated, {len(self.employees)} total)"
+            )
+        return added
+
+    def load_roster(self, path: str, chunksize: int = 50_000) -> RosterLoadReport:
+        """
+        Stream an ``employee_address,hourly_rate`` CSV or Parquet file into
+        the roster, rejecting bad addresses and rates up front.
+        """
+        report = load_roster(self.employees, path, chunksize=chunksize)
+        print(
+            f"[{self.department}] Loaded roster from {path}: {report.added} added, "
+            f"{report.updated} updated, {report.duplicates} duplicates skipped, "
+            f"{report.rejected} rejected"
+        )
+        for row, address, reason in [] if self.quiet else report.rejects[:10]:
+            print(f"[{self.department}]   row {row}: {reason} ({address})")
+        return report
+
+    def remove_employees(self, addresses: Sequence[str]) -> int:
+        removed = self.employees.remove_many(addresses)
+        if not self.quiet:
+            print(f"[{self.department}] Removed {removed} employees")
+        return removed
+
+    def update_rates(self, addresses: Sequence[str], hourly_rates: Sequence[float]):
+        self.employees.update_rates(addresses, hourly_rates)
+        if not self.quiet:
+            print(f"[{self.department}] Updated rates for {len(addresses)} employees")
+
     # ----------------------
     # Transactions
     # ----------------------
-    def send_payment(self, to: str, amount: float, note: str = "") -> tuple:
-        balance_before = self.get_balance(self.employer_address)
+    @_metered
+    def send_payment(
+        self, to: str, amount: float, note: str = "", microalgos: bool = False
+    ) -> tuple:
+        balance_before = self.balance_tracker.balance
         try:
-            params = self.client.suggested_params()
-            txn = transaction.PaymentTxn(
-                sender=self.employer_address,
-                sp=params,
-                receiver=to,
-                amt=int(amount * 1e6),
-                note=note.encode() if note else None,
-            )
-            signed = txn.sign(self.employer_private_key)
-            txid = self.client.send_transaction(signed)
-            transaction.wait_for_confirmation(self.client, txid, 4)
-            balance_after = self.get_balance(self.employer_address)
+            with metrics.stage("suggested_params"):
+                params = self.params_cache.get(self.client)
+            txn = transactions.build_payment_txn(
+                self.client,
+                self.employer_address,
+                to,
+                amount,
+                note,
+                params=params,
+                microalgos=microalgos,
+            )
+            signed = transactions.sign_transaction(txn, self.employer_private_key)
+            txid = transactions.broadcast_transaction(self.client, signed)
+            info = transactions.wait_for_confirmation(self.client, txid, 4)
+            self._observe_confirmation(info)
+            balance_after = self.balance_tracker.debit(txn.amt, txn.fee)
             return txid, balance_before, balance_after, "SUCCESS"
         except Exception as e:
             print(f"[{self.department}] Payment to {to} failed: {e}")
-            balance_after = self.get_balance(self.employer_address)
-            return "FAILED", balance_before, balance_after, "FAILED"
+            return "FAILED", balance_before, balance_before, "FAILED"
+
+    @_metered
+    def send_payment_group(
+        self, payments: List[tuple], microalgos: bool = False
+    ) -> List[tuple]:
+        """
+        Send up to 16 payments as one atomic group.
+
+        ``payments`` is a list of ``(to, amount, note)`` tuples with amounts in
+        ALGOs (or integer microAlgos with ``microalgos=True``). The group is
+        submitted with a single ``send_transactions`` call and confirmed once,
+        so either every payment lands or none does. Returns one
+        ``(txid, balance_before, balance_after, status)`` tuple per payment,
+        with the employer balance walked forward row by row.
+        """
+        balance_before = self.balance_tracker.balance
+        try:
+            with metrics.stage("suggested_params"):
+                params = self.params_cache.get(self.client)
+            signed = self._sign_payments(
+                payments, params, group=True, microalgos=microalgos
+            )
+            txids = transactions.broadcast_group(self.client, signed)
+            info = transactions.wait_for_confirmation(
+                self.client, txids[0], 4, items=len(signed)
+            )
+            self._observe_confirmation(info)
+        except Exception as e:
+            print(f"[{self.department}] Group of {len(payments)} payments failed: {e}")
+            return [
+                ("FAILED", balance_before, balance_before, "FAILED") for _ in payments
+            ]
+
+        return [
+            (txid, *self._debit(stxn.transaction), "SUCCESS")
+            for txid, stxn in zip(txids, signed)
+        ]
+
+    @_metered
+    def send_payments_pipelined(
+        self,
+        payments: List[tuple],
+        window: int = 64,
+        group_size: int = 1,
+        microalgos: bool = False,
+        signing_processes: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Send many payments without blocking on each confirmation.
+
+        Payments are signed up front (in atomic groups of ``group_size`` when
+        it is above 1) and handed to a ``PaymentPipeline`` that keeps up to
+        ``window`` units in flight and confirms them as rounds advance. Returns
+        one ``(txid, balance_before, balance_after, status)`` tuple per payment
+        in the order given.
+
+        Payments are signed in-process unless ``signing_processes`` is 2 or
+        more; then large batches are signed across a spawned process pool
+        (``signing.BatchSigner``), whose workers re-import the calling
+        script, so it must keep its top-level code under
+        ``if __name__ == "__main__":``.
+        """
+        with metrics.stage("suggested_params"):
+            params = self.params_cache.get(self.client)
+
+        chunks = [
+            payments[start : start + group_size]
+            for start in range(0, len(payments), group_size)
+        ]
+        unit_txns, unit_chunks, failed_chunks = [], [], set()
+        for i, chunk in enumerate(chunks):
+            try:
+                unit_txns.append(
+                    self._build_payments(
+                        chunk, params, group=group_size > 1, microalgos=microalgos
+                    )
+                )
+                unit_chunks.append(i)
+            except Exception as e:
+                print(
+                    f"[{self.department}] Could not build payment to {chunk[0][0]}: {e}"
+                )
+                failed_chunks.add(i)
+
+        with BatchSigner(self.employer_private_key, signing_processes) as signer:
+            signed = iter(
+                signer.sign_with_txids([txn for txns in unit_txns for txn in txns])
+            )
+        units = []
+        for txns in unit_txns:
+            blobs = [next(signed) for _ in txns]
+            units.append(RawUnit([t for t, _ in blobs], b"".join(b for _, b in blobs)))
+
+        pipeline = PaymentPipeline(
+            self.client, window=window, params_cache=self.params_cache
+        )
+        unit_results = dict(zip(unit_chunks, pipeline.run(units)))
+        txns_by_chunk = dict(zip(unit_chunks, unit_txns))
+
+        results = []
+        for i, chunk in enumerate(chunks):
+            outcome = unit_results.get(i)
+            balance = self.balance_tracker.balance
+            if outcome is not None and outcome.pending:
+                # Sent but unresolved: log the txids, debit nothing yet
+                print(
+                    f"[{self.department}] Payment to {chunk[0][0]} is pending: "
+                    f"{outcome.error}"
+                )
+                results.extend(
+                    (txid, balance, balance, "PENDING") for txid in outcome.txids
+                )
+                continue
+            if i in failed_chunks or not outcome.ok:
+                if outcome is not None:
+                    print(
+                        f"[{self.department}] Payment to {chunk[0][0]} failed: {outcome.error}"
+                    )
+                results.extend(("FAILED", balance, balance, "FAILED") for _ in chunk)
+                continue
+            for txid, txn in zip(outcome.txids, txns_by_chunk[i]):
+                results.append((txid, *self._debit(txn), "SUCCESS"))
+        return results
+
+    def _debit(self, txn) -> tuple:
+        # Walk the tracked employer balance forward by one confirmed payment
+        before = self.balance_tracker.balance
+        after = self.balance_tracker.debit(txn.amt, txn.fee)
+        return before, after
+
+    def _observe_confirmation(self, info):
+        # Confirmed rounds tell the params cache how far the chain has moved
+        if isinstance(info, dict) and isinstance(info.get("confirmed-round"), int):
+            self.params_cache.observe_round(self.client, info["confirmed-round"])
+
+    def _build_payments(
+        self,
+        payments: List[tuple],
+        params,
+        group: bool = False,
+        microalgos: bool = False,
+    ):
+        # (to, amount, note) tuples, optionally with a fourth item: the lease
+        txns = [
+            transactions.build_payment_txn(
+                self.client,
+                self.employer_address,
+                to,
+                amount,
+                note,
+                params=params,
+                microalgos=microalgos,
+                lease=lease[0] if lease else None,
+            )
+            for to, amount, note, *lease in payments
+        ]
+        if group:
+            transactions.group_and_assign_id(txns)
+        return txns
+
+    def _sign_payments(self, payments: List[tuple], params, **options):
+        return [
+            transactions.sign_transaction(txn, self.employer_private_key)
+            for txn in self._build_payments(payments, params, **options)
+        ]
+
+    def compute_pay(self, hours, rounding: str = "half_even") -> np.ndarray:
+        """
+        Pay for every employee in integer microAlgos, in roster order.
+
+        ``hours`` is one value for everyone or one per employee; see
+        ``paycalc.compute_pay_microalgos`` for the rounding policies. Sum the
+        result with ``paycalc.total_microalgos`` for an exact budget total.
+        """
+        return compute_pay_microalgos(self.employees.rates, hours, rounding=rounding)
 
     def run_payroll(
         self,
         hours: float,
         note: str = "Payroll Run",
         job_id: str = "DefaultJob",
+        batch_size: Optional[int] = None,
+        pipeline_window: Optional[int] = None,
+        amounts: Optional[Sequence[int]] = None,
+        rounding: str = "half_even",
+        budget_microalgos: Optional[int] = None,
+        signing_processes: Optional[int] = None,
     ) -> List[str]:
-        print(f"[{self.department}] Running payroll for {hours} hours...")
-        payroll_id = f"Payroll_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
-        txids = []
+        """
+        Pay every employee for ``hours`` worked and log one row per payment.
 
-        for emp_addr, data in self.employees.items():
-            rate = data["rate"]
-            name = data["name"]
-            amount = rate * hours
+        Pay is computed for the whole roster in one pass as integer
+        microAlgos (``compute_pay`` with ``rounding``), or taken from
+        ``amounts`` when precomputed. If the exact total exceeds
+        ``budget_microalgos`` nothing is sent and ``ValueError`` is raised.
 
-            print(
-                f"[{self.department}] Paying {name}: {hours}h * {rate} = {amount} ALGO"
+        With ``batch_size`` set, payments are packed into atomic groups of up
+        to ``transactions.MAX_GROUP_SIZE`` and each group succeeds or fails as
+        a unit; otherwise every employee is paid with its own transaction.
+
+        With ``pipeline_window`` set, payments (or groups) are submitted
+        continuously with up to that many in flight and confirmed in bulk as
+        rounds advance, instead of waiting a full round per payment.
+
+        Pipelined and journaled runs sign in-process unless
+        ``signing_processes`` is 2 or more, which signs large runs across a
+        spawned process pool (``signing.BatchSigner``). The workers re-import
+        the calling script, so it must keep its top-level code under
+        ``if __name__ == "__main__":``.
+
+        Every stage of the run is timed on ``self.metrics`` under this
+        department and ``job_id``.
+        """
+        with self.metrics.bind(self.department, job_id), metrics.stage("run"):
+            return self._run_payroll(
+                hours,
+                note,
+                job_id,
+                batch_size,
+                pipeline_window,
+                amounts,
+                rounding,
+                budget_microalgos,
+                signing_processes,
             )
-            txid, bal_before, bal_after, status = self.send_payment(
-                emp_addr, amount, note=f"{note}: {hours}h @ {rate} ALGO/hr"
+
+    def _run_payroll(
+        self,
+        hours: float,
+        note: str = "Payroll Run",
+        job_id: str = "DefaultJob",
+        batch_size: Optional[int] = None,
+        pipeline_window: Optional[int] = None,
+        amounts: Optional[Sequence[int]] = None,
+        rounding: str = "half_even",
+        budget_microalgos: Optional[int] = None,
+        signing_processes: Optional[int] = None,
+    ) -> List[str]:
+        payroll_id, rows = self._payroll_rows(
+            "Running", hours, note, batch_size, amounts, rounding, budget_microalgos
+        )
+
+        # One account_info read per run; balances are tracked locally from here
+        with metrics.stage("balance"):
+            self.balance_tracker.refresh()
+
+        if self.journal_dir is not None:
+            txids = self._run_journaled(
+                payroll_id, job_id, rows, batch_size, pipeline_window, signing_processes
             )
-            if txid != "FAILED":
-                txids.append(txid)
+        else:
+            if pipeline_window is not None:
+                results = self.send_payments_pipelined(
+                    [
+                        (emp_addr, amount, row_note)
+                        for emp_addr, _, amount, row_note in rows
+                    ],
+                    window=pipeline_window,
+                    group_size=batch_size or 1,
+                    microalgos=True,
+                    signing_processes=signing_processes,
+                )
+            elif batch_size is None:
+                results = [
+                    self.send_payment(emp_addr, amount, note=row_note, microalgos=True)
+                    for emp_addr, _, amount, row_note in rows
+                ]
+            else:
+                results = []
+                for start in range(0, len(rows), batch_size):
+                    chunk = rows[start : start + batch_size]
+                    results.extend(
+                        self.send_payment_group(
+                            [
+                                (emp_addr, amount, row_note)
+                                for emp_addr, _, amount, row_note in chunk
+                            ],
+                            microalgos=True,
+                        )
+                    )
+            txids = self._log_run(payroll_id, job_id, rows, results)
 
-            log_transaction(
-                self.history_file,
-                self.department,
-                job_id,
+        self._finish_run(payroll_id, job_id, rows, txids)
+        return txids
+
+    def _run_journaled(
+        self,
+        payroll_id: str,
+        job_id: str,
+        rows: List[tuple],
+        batch_size: Optional[int],
+        pipeline_window: Optional[int],
+        signing_processes: Optional[int] = None,
+    ) -> List[str]:
+        # Every payment is on disk (with its lease) before anything is signed
+        with metrics.stage("journal", items=len(rows)):
+            journal = PayrollJournal.create(
+                self.journal_dir,
                 payroll_id,
-                name,
-                emp_addr,
-                amount,
-                txid,
-                self.employer_address,
-                bal_before,
-                bal_after,
-                status,
+                rows,
+                department=self.department,
+                job_id=job_id,
+                employer=self.employer_address,
+                batch_size=batch_size,
+                pipeline_window=pipeline_window,
+            )
+        with journal:
+            self._send_journaled(
+                journal,
+                journal.entries(),
+                {},
+                window=pipeline_window or 1,
+                group_size=batch_size or 1,
+                signing_processes=signing_processes,
+            )
+            return self._log_journaled(journal, job_id)
+
+    def _payroll_rows(
+        self,
+        action: str,
+        hours: float,
+        note: str,
+        batch_size: Optional[int],
+        amounts: Optional[Sequence[int]],
+        rounding: str,
+        budget_microalgos: Optional[int],
+    ) -> tuple:
+        # A new payroll_id and one (address, name, microalgos, note) row per
+        # employee, after checking the exact total against the budget
+        if (
+            batch_size is not None
+            and not 1 <= batch_size <= transactions.MAX_GROUP_SIZE
+        ):
+            raise ValueError(
+                f"batch_size must be between 1 and {transactions.MAX_GROUP_SIZE}"
+            )
+
+        # Work from a snapshot so roster edits mid-run cannot skew the rows
+        roster = self.employees.snapshot()
+        if amounts is None:
+            amounts = compute_pay_microalgos(roster.rates, hours, rounding=rounding)
+        elif len(amounts) != len(roster):
+            raise ValueError("amounts must have one entry per employee")
+        total = total_microalgos(amounts)
+        if budget_microalgos is not None and total > budget_microalgos:
+            raise ValueError(
+                f"Payroll total {total} microAlgos exceeds budget of {budget_microalgos}"
+            )
+
+        print(
+            f"[{self.department}] {action} payroll for {hours} hours "
+            f"(total {microalgos_to_algos(total)} ALGO)..."
+        )
+        payroll_id = f"Payroll_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+        rows = []
+        for emp_addr, name, rate, micro in zip(
+            roster.addresses, roster.names, roster.rates.tolist(), amounts
+        ):
+            micro = int(micro)
+
+            if not self.quiet:
+                print(
+                    f"[{self.department}] Paying {name}: {hours}h * {rate} = "
+                    f"{microalgos_to_algos(micro)} ALGO"
+                )
+            rows.append((emp_addr, name, micro, f"{note}: {hours}h @ {rate} ALGO/hr"))
+        return payroll_id, rows
+
+    def _finish_run(
+        self, payroll_id: str, job_id: str, rows: List[tuple], txids: List[str]
+    ) -> None:
+        # Reconcile the tracked balance, report and notify once rows are logged
+        with metrics.stage("balance"):
+            drift = self.balance_tracker.reconcile()
+        if drift:
+            print(
+                f"[{self.department}] WARNING: employer balance drifted by {drift} ALGO "
+                f"from the tracked value during {payroll_id}"
             )
 
         print(f"[{self.department}] Payroll complete. ID: {payroll_id}")
@@ -209,47 +670,763 @@ class Payroll:
                 "job_id": job_id,
                 "payroll_id": payroll_id,
                 "department": self.department,
-                "employees": [d["name"] for d in self.employees.values()],
+                "employees": [name for _, name, _, _ in rows],
                 "txids": txids,
                 "status": "SUCCESS" if txids else "FAILED",
             }
-            self.notifier.notify(payload)
+            try:
+                self.notifier.notify(payload)
+            except Exception as e:
+                # Everyone is paid and logged; a notifier must not fail the run
+                print(f"[{self.department}] Notification for {payroll_id} failed: {e}")
 
+    def _log_run(
+        self, payroll_id: str, job_id: str, rows: List[tuple], results: List[tuple]
+    ) -> List[str]:
+        # One audit row per payment; returns the txids that went through
+        txids = []
+        statuses = Counter()
+        with metrics.stage("log", items=len(rows)):
+            for (emp_addr, name, amount, _), result in zip(rows, results):
+                txid, bal_before, bal_after, status = result
+                statuses[status] += 1
+                if status == "SUCCESS":
+                    txids.append(txid)
+
+                log_transaction(
+                    self.history_file,
+                    self.department,
+                    job_id,
+                    payroll_id,
+                    name,
+                    emp_addr,
+                    microalgos_to_algos(amount),
+                    txid,
+                    self.employer_address,
+                    bal_before,
+                    bal_after,
+                    status,
+                    writer=self.audit_writer,
+                )
+            self.audit_writer.end_run()
+        for status, count in statuses.items():
+            metrics.increment("payments_total", count, status=status)
         return txids
 
+    # ----------------------
+    # Pre-flight simulation
+    # ----------------------
+    @_metered
+    def simulate_payroll(
+        self,
+        hours: float,
+        note: str = "Payroll Run",
+        amounts: Optional[Sequence[int]] = None,
+        rounding: str = "half_even",
+        group_size: int = transactions.MAX_GROUP_SIZE,
+        max_workers: int = 8,
+    ) -> SimulationReport:
+        """
+        Check a whole ``run_payroll`` against algod without sending anything.
+
+        Every payment is built (unsigned) as the run would build it and the
+        lot is checked through algod's simulate endpoint, ``group_size``
+        payments per request and ``max_workers`` requests in flight
+        (``simulation.simulate_payments``). Because each chunk is simulated
+        against the current ledger on its own, the employer balance is then
+        walked through the run locally to find where it would drop below
+        its minimum.
+
+        Returns a ``SimulationReport`` with one ``SimulatedFailure`` per
+        payment that would not go through (bad address, account below its
+        minimum balance, employer out of funds...), the total amount and
+        fees of the rest, and the employer balance before and after. With
+        ``batch_size`` in the real run, one failure sinks its whole group.
+        """
+        _, rows = self._payroll_rows(
+            "Simulating", hours, note, None, amounts, rounding, None
+        )
+        with metrics.stage("suggested_params"):
+            params = self.params_cache.get(self.client)
+        with metrics.stage("balance"):
+            info = self.client.account_info(self.employer_address)
+        balance, min_balance = int(info["amount"]), int(info.get("min-balance", 0))
+
+        failures: Dict[int, str] = {}
+        positions, txns = [], []
+        for i, (emp_addr, _, amount, row_note) in enumerate(rows):
+            try:
+                (txn,) = self._build_payments(
+                    [(emp_addr, amount, row_note)], params, microalgos=True
+                )
+                # Addresses are only decoded on encoding: catch bad checksums
+                # here rather than failing the whole simulate request
+                txn.dictify()
+            except Exception as e:
+                failures[i] = f"could not build payment: {e}"
+                continue
+            positions.append(i)
+            txns.append(txn)
+        simulated = simulate_payments(self.client, txns, group_size, max_workers)
+        for j, message in simulated.items():
+            failures[positions[j]] = message
+
+        # Chunks only saw today's balance: spend it down in run order
+        remaining, paid, fees = balance, 0, 0
+        for i, txn in zip(positions, txns):
+            if i in failures:
+                continue
+            if remaining - txn.amt - txn.fee < min_balance:
+                failures[i] = (
+                    f"employer balance {remaining} would fall below its "
+                    f"minimum {min_balance}"
+                )
+                continue
+            remaining -= txn.amt + txn.fee
+            paid += txn.amt
+            fees += txn.fee
+
+        report = SimulationReport(
+            payments=len(rows),
+            failures=[
+                SimulatedFailure(i, rows[i][0], rows[i][1], rows[i][2], failures[i])
+                for i in sorted(failures)
+            ],
+            amount=paid,
+            fees=fees,
+            balance_before=balance,
+            balance_after=remaining,
+            min_balance=min_balance,
+        )
+        print(
+            f"[{self.department}] Simulated {report.payments} payments: "
+            f"{len(report.failures)} would fail, total cost "
+            f"{microalgos_to_algos(report.total_cost)} ALGO "
+            f"({microalgos_to_algos(fees)} in fees), employer balance "
+            f"{microalgos_to_algos(balance)} -> {microalgos_to_algos(remaining)} ALGO"
+        )
+        for failure in [] if self.quiet else report.failures[:10]:
+            print(f"[{self.department}]   {failure.employee_name}: {failure.reason}")
+        return report
+
+    # ----------------------
+    # Journal and resume
+    # ----------------------
+    @_metered
+    def resume_payroll(self, payroll_id: str, indexer_client=None) -> List[str]:
+        """
+        Finish a run that was interrupted, from its journal in ``journal_dir``.
+
+        Only entries the journal does not already show as confirmed are
+        looked at. Signed units that may have been sent are checked against
+        algod in one concurrent pass. Units that can still land are
+        rebroadcast byte for byte, so they keep the same txid. Payments that
+        provably never landed (never signed, never sent, rejected, or expired
+        without reaching the ledger) are signed again with the same lease,
+        so algod refuses any second payment while the first could still
+        land. Once every payment is settled, the run's rows are logged and
+        the confirmed txids are returned, as ``run_payroll`` would.
+
+        A signed unit whose validity window has passed and that the node no
+        longer knows can only be settled by an indexer: pass
+        ``indexer_client`` to look those up in one paginated query. Without
+        it such units are reported and left for a later resume, never paid
+        twice. Signed units algod no longer lists are looked up in the
+        indexer too, when given, before anything is rebroadcast; a
+        rebroadcast algod refuses as already in its ledger counts as paid.
+
+        A run (or resume) that ends with payments still unconfirmed logs them
+        as PENDING and leaves the journal open; resuming it later logs only
+        those payments again, once they have settled. Resuming a completed
+        run just returns its txids.
+        """
+        if self.journal_dir is None:
+            raise ValueError("resume_payroll needs Payroll(journal_dir=...)")
+        with PayrollJournal.open(self.journal_dir, payroll_id) as journal:
+            meta = journal.meta
+            if meta["completed"]:
+                return [e.txid for e in journal.entries([CONFIRMED])]
+
+            with self.metrics.bind(self.department, meta["job_id"]):
+                with metrics.stage("balance"):
+                    self.balance_tracker.refresh()
+                # Logged as PENDING by an earlier pass, if it got that far
+                settling = {e.position for e in journal.entries([SIGNED])}
+                fresh, resend, unresolved = self._recover(journal, indexer_client)
+                print(
+                    f"[{self.department}] Resuming {payroll_id}: "
+                    f"{len(fresh)} to sign, {len(resend)} units to rebroadcast, "
+                    f"{len(unresolved)} unresolved"
+                )
+                self._send_journaled(
+                    journal,
+                    fresh,
+                    resend,
+                    window=meta.get("pipeline_window") or 1,
+                    group_size=meta.get("batch_size") or 1,
+                )
+                if unresolved:
+                    print(
+                        f"[{self.department}] WARNING: {len(unresolved)} units of "
+                        f"{payroll_id} expired and are unknown to algod; resume "
+                        "again with an indexer_client to settle them"
+                    )
+                    return [e.txid for e in journal.entries([CONFIRMED])]
+
+                txids = self._log_journaled(journal, meta["job_id"], settling)
+            if journal.completed:
+                print(
+                    f"[{self.department}] Payroll resumed and complete. "
+                    f"ID: {payroll_id}"
+                )
+        return txids
+
+    def _recover(self, journal: PayrollJournal, indexer_client=None):
+        # Sort the journal's unsettled entries into payments to sign afresh,
+        # units to rebroadcast as-is and units nobody can vouch for yet
+        pending = journal.entries([INTENT, SIGNED])
+        fresh = [e for e in pending if e.state == INTENT]
+        units = units_of(e for e in pending if e.state == SIGNED)
+        last_round = self.client.status()["last-round"]
+        # The run may have died long ago; do not sign with stale cached params
+        self.params_cache.observe_round(self.client, last_round)
+
+        def still_valid(entries):
+            # The next block is last_round + 1; validity is inclusive
+            return last_round < min(e.last_valid for e in entries)
+
+        maybe_sent = {u: es for u, es in units.items() if u < journal.sent_mark}
+        resend: Dict[int, List[JournalEntry]] = {}
+        expired: Dict[int, List[JournalEntry]] = {}
+        # Unknown to algod but still valid: landed long ago, or never arrived
+        unknown: Dict[int, List[JournalEntry]] = {}
+        settled = []
+        infos = self._pending_infos([es[0].txid for es in maybe_sent.values()])
+        for (unit, entries), info in zip(maybe_sent.items(), infos):
+            txids = [e.txid for e in entries]
+            if info.get("confirmed-round"):
+                settled.append((unit, UnitResult(txids, info["confirmed-round"], None)))
+            elif info.get("pool-error"):
+                # Rejected by the pool: this transaction can never confirm
+                fresh.extend(entries)
+            elif not still_valid(entries):
+                expired[unit] = entries
+            elif not info and indexer_client is not None:
+                unknown[unit] = entries
+            else:
+                # In the pool, or unknown with no indexer to ask: rebroadcast,
+                # and algod answers "already in ledger" if it had landed
+                resend[unit] = entries
+        for unit, entries in units.items():
+            if unit >= journal.sent_mark:
+                # Never handed to algod
+                if still_valid(entries):
+                    resend[unit] = entries
+                else:
+                    fresh.extend(entries)
+
+        unresolved = expired
+        if (expired or unknown) and indexer_client is not None:
+            landed = self._indexed_rounds(indexer_client, {**expired, **unknown})
+            unresolved = {}
+            for unit, entries in {**expired, **unknown}.items():
+                txids = [e.txid for e in entries]
+                if entries[0].txid in landed:
+                    settled.append(
+                        (unit, UnitResult(txids, landed[entries[0].txid], None))
+                    )
+                elif unit in unknown:
+                    # Not indexed (yet): the same bytes are safe to resend
+                    resend[unit] = entries
+                else:
+                    fresh.extend(entries)
+        with metrics.stage("journal", items=len(settled)):
+            journal.record_results(settled)
+        return sorted(fresh, key=lambda e: e.position), resend, unresolved
+
+    def _pending_infos(self, txids: List[str], max_workers: int = 8) -> List[dict]:
+        # algod has no bulk lookup, so check the txids concurrently
+        def info(txid):
+            try:
+                return self.client.pending_transaction_info(txid)
+            except Exception:
+                # Unknown to this node (never arrived, or confirmed and forgotten)
+                return {}
+
+        if not txids:
+            return []
+        with metrics.stage("confirm", items=len(txids)):
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                return list(pool.map(info, txids))
+
+    def _indexed_rounds(
+        self, indexer_client, units: Dict[int, List[JournalEntry]]
+    ) -> Dict[str, int]:
+        # Every employer payment in the units' validity windows, one paged query
+        entries = [e for es in units.values() for e in es]
+        rounds: Dict[str, int] = {}
+        next_page = None
+        while True:
+            response = indexer_client.search_transactions_by_address(
+                self.employer_address,
+                min_round=min(e.first_valid for e in entries),
+                max_round=max(e.last_valid for e in entries),
+                txn_type="pay",
+                limit=1000,
+                next_page=next_page,
+            )
+            for txn in response.get("transactions", []):
+                rounds[txn["id"]] = txn.get("confirmed-round")
+            next_page = response.get("next-token")
+            if not next_page or not response.get("transactions"):
+                return rounds
+
+    def _send_journaled(
+        self,
+        journal: PayrollJournal,
+        fresh: List[JournalEntry],
+        resend: Dict[int, List[JournalEntry]],
+        window: int,
+        group_size: int = 1,
+        signing_processes: Optional[int] = None,
+    ) -> None:
+        """
+        Sign ``fresh`` entries (in groups of ``group_size``) and send them,
+        after any ``resend`` units, recording every step in ``journal``.
+        Signatures are journaled before anything is sent, and the sent mark
+        is kept ahead of each unit as it goes out. Outcomes are read back
+        with ``journal.entries()``.
+        """
+        built = []
+        if fresh:
+            with metrics.stage("suggested_params"):
+                params = self.params_cache.get(self.client)
+            for start in range(0, len(fresh), group_size):
+                chunk = fresh[start : start + group_size]
+                try:
+                    txns = self._build_payments(
+                        [
+                            (e.employee_address, e.amount, e.note, e.lease)
+                            for e in chunk
+                        ],
+                        params,
+                        group=len(chunk) > 1,
+                        microalgos=True,
+                    )
+                except Exception as e:
+                    print(
+                        f"[{self.department}] Could not build payment to "
+                        f"{chunk[0].employee_address}: {e}"
+                    )
+                    journal.record_failed([entry.position for entry in chunk], str(e))
+                    continue
+                built.append((chunk, txns))
+
+        with BatchSigner(self.employer_private_key, signing_processes) as signer:
+            signed = iter(
+                signer.sign_with_txids([txn for _, txns in built for txn in txns])
+            )
+        next_unit = journal.next_unit()
+        fresh_units = []
+        for chunk, txns in built:
+            fresh_units.append(
+                (
+                    next_unit,
+                    [
+                        SignedEntry(
+                            e.position,
+                            txid,
+                            blob,
+                            txn.fee,
+                            txn.first_valid_round,
+                            txn.last_valid_round,
+                        )
+                        for e, txn, (txid, blob) in zip(
+                            chunk, txns, [next(signed) for _ in txns]
+                        )
+                    ],
+                )
+            )
+            next_unit += 1
+        with metrics.stage("journal", items=len(fresh)):
+            journal.record_signed(fresh_units)
+
+        # Resent units first: unit numbers must go out in increasing order
+        unit_numbers, units = [], []
+        for unit, entries in sorted(resend.items()) + fresh_units:
+            unit_numbers.append(unit)
+            units.append(
+                RawUnit([e.txid for e in entries], b"".join(e.signed for e in entries))
+            )
+
+        def on_results(settled):
+            with metrics.stage("journal", items=len(settled)):
+                journal.record_results((unit_numbers[i], r) for i, r in settled)
+            for i, result in settled:
+                if not result.ok:
+                    print(
+                        f"[{self.department}] Payment unit {result.txids[0]} "
+                        f"{'is pending' if result.pending else 'failed'}: "
+                        f"{result.error}"
+                    )
+
+        pipeline = PaymentPipeline(
+            self.client, window=window, params_cache=self.params_cache
+        )
+        pipeline.run(
+            units,
+            on_send=lambda i: journal.mark_sending(unit_numbers[i]),
+            on_results=on_results,
+        )
+
+    def _log_journaled(
+        self, journal: PayrollJournal, job_id: str, settling: Sequence[int] = ()
+    ) -> List[str]:
+        """
+        Log the journal's rows and return the run's confirmed txids. Once a
+        run is logged, later passes log only the ``settling`` positions
+        (logged as PENDING before) that have settled since. The journal is
+        completed only when no payment is left that may still land.
+        """
+        entries = journal.entries()
+        if journal.logged:
+            entries = [
+                e for e in entries if e.position in settling and e.state != SIGNED
+            ]
+        rows = [
+            (e.employee_address, e.employee_name, e.amount, e.note) for e in entries
+        ]
+        self._log_run(
+            journal.payroll_id, job_id, rows, self._journaled_results(entries)
+        )
+        journal.mark_logged()
+        pending = journal.entries([SIGNED])
+        if pending:
+            print(
+                f"[{self.department}] {len(pending)} payments of "
+                f"{journal.payroll_id} are unconfirmed and may still land "
+                f"(valid until round {max(e.last_valid for e in pending)}); "
+                "resume the run to settle them"
+            )
+        else:
+            journal.complete()
+        return [e.txid for e in journal.entries([CONFIRMED])]
+
+    def _journaled_results(self, entries: List[JournalEntry]) -> List[tuple]:
+        # (txid, balance_before, balance_after, status) per entry, in run order
+        results = []
+        for entry in sorted(entries, key=lambda e: e.position):
+            before = self.balance_tracker.balance
+            if entry.state == CONFIRMED:
+                after = self.balance_tracker.debit(entry.amount, entry.fee)
+                results.append((entry.txid, before, after, "SUCCESS"))
+            elif entry.state == SIGNED:
+                # Sent, but not seen confirmed: it may still land
+                results.append((entry.txid, before, before, "PENDING"))
+            else:
+                results.append(("FAILED", before, before, "FAILED"))
+        return results
+
+    # ----------------------
+    # Pre-signed bundles
+    # ----------------------
+    @_metered
+    def prepare_payroll(
+        self,
+        hours: float,
+        path: str,
+        run_at: Optional[datetime] = None,
+        note: str = "Payroll Run",
+        job_id: str = "DefaultJob",
+        batch_size: Optional[int] = None,
+        amounts: Optional[Sequence[int]] = None,
+        rounding: str = "half_even",
+        budget_microalgos: Optional[int] = None,
+        round_seconds: float = DEFAULT_ROUND_SECONDS,
+        signing_processes: Optional[int] = None,
+    ) -> PayrollBundle:
+        """
+        Build and sign a payroll run now, to be broadcast at ``run_at``.
+
+        Pay is computed as in ``run_payroll`` (and for the roster as it is
+        now). Every payment is signed with a validity window predicted to
+        cover ``run_at`` (default: now) at ``round_seconds`` per block, and
+        carries a lease for its ``payroll_id`` and employee. The signed run is
+        written to ``path`` as a ``.stxn`` bundle (``algo_pay.bundle``) and
+        returned. Nothing is sent: ``broadcast_payroll`` here, or
+        ``python -m algo_pay.bundle`` in a process without the key, submits
+        it. ``signing_processes`` opts into a signing process pool, as in
+        ``run_payroll``.
+        """
+        with self.metrics.bind(self.department, job_id):
+            payroll_id, rows = self._payroll_rows(
+                "Preparing",
+                hours,
+                note,
+                batch_size,
+                amounts,
+                rounding,
+                budget_microalgos,
+            )
+            with metrics.stage("suggested_params"):
+                params = self.params_cache.get(self.client)
+            params.first, params.last = validity_window(
+                params.first, run_at, round_seconds
+            )
+
+            group_size = batch_size or 1
+            built = []
+            for start in range(0, len(rows), group_size):
+                chunk = rows[start : start + group_size]
+                try:
+                    txns = self._build_payments(
+                        [
+                            (
+                                emp_addr,
+                                amount,
+                                row_note,
+                                payment_lease(payroll_id, emp_addr),
+                            )
+                            for emp_addr, _, amount, row_note in chunk
+                        ],
+                        params,
+                        group=len(chunk) > 1,
+                        microalgos=True,
+                    )
+                except Exception as e:
+                    print(
+                        f"[{self.department}] Could not build payment to {chunk[0][0]}: {e}"
+                    )
+                    txns = None
+                built.append((chunk, txns))
+
+            with BatchSigner(self.employer_private_key, signing_processes) as signer:
+                signed = iter(
+                    signer.sign_with_txids(
+                        [txn for _, txns in built if txns for txn in txns]
+                    )
+                )
+            bundle_rows, units = [], []
+            for chunk, txns in built:
+                if txns is None:
+                    bundle_rows.extend(BundleRow(*row, 0, None) for row in chunk)
+                    continue
+                blobs = [next(signed) for _ in txns]
+                units.append(
+                    RawUnit([t for t, _ in blobs], b"".join(b for _, b in blobs))
+                )
+                bundle_rows.extend(
+                    BundleRow(*row, txn.fee, txid)
+                    for row, txn, (txid, _) in zip(chunk, txns, blobs)
+                )
+
+            bundle = PayrollBundle(
+                payroll_id,
+                self.department,
+                job_id,
+                self.employer_address,
+                params.gen,
+                params.gh,
+                params.first,
+                params.last,
+                (run_at or datetime.now(timezone.utc)).isoformat(),
+                bundle_rows,
+                units,
+            )
+            write_bundle(path, bundle)
+        print(
+            f"[{self.department}] Prepared {payroll_id}: {len(units)} units valid for "
+            f"rounds {params.first}-{params.last} in {path}"
+        )
+        return bundle
+
+    @_metered
+    def broadcast_payroll(
+        self, bundle: Union[str, PayrollBundle], window: int = 64
+    ) -> List[str]:
+        """
+        Send a run prepared by ``prepare_payroll`` (a bundle or its path) and
+        log one row per payment, as ``run_payroll`` would.
+
+        Nothing is fetched or signed: the units go straight into a
+        ``PaymentPipeline`` with up to ``window`` in flight. Raises
+        ``BundleNotValid`` without sending anything when the chain is outside
+        the bundle's validity window. Returns the confirmed txids.
+        """
+        if isinstance(bundle, str):
+            bundle = read_bundle(bundle)
+        if bundle.employer != self.employer_address:
+            raise ValueError(
+                f"Bundle {bundle.payroll_id} was signed by {bundle.employer}, "
+                f"not {self.employer_address}"
+            )
+        with self.metrics.bind(self.department, bundle.job_id), metrics.stage("run"):
+            print(
+                f"[{self.department}] Broadcasting prepared payroll "
+                f"{bundle.payroll_id} ({len(bundle.rows)} payments)..."
+            )
+            with metrics.stage("balance"):
+                self.balance_tracker.refresh()
+            unit_results = broadcast_bundle(
+                self.client, bundle, window=window, params_cache=self.params_cache
+            )
+            for result in unit_results:
+                if not result.ok:
+                    print(
+                        f"[{self.department}] Payment unit {result.txids[0]} "
+                        f"failed: {result.error}"
+                    )
+            rows = [
+                (r.employee_address, r.employee_name, r.amount, r.note)
+                for r in bundle.rows
+            ]
+            txids = self._log_run(
+                bundle.payroll_id,
+                bundle.job_id,
+                rows,
+                bundle_results(bundle, unit_results, self.balance_tracker),
+            )
+            self._finish_run(bundle.payroll_id, bundle.job_id, rows, txids)
+        return txids
+
+    # ----------------------
+    # History
+    # ----------------------
+    def history(self) -> HistoryQueries:
+        """
+        Indexed queries over this Payroll's ledger (``by_payroll_id``,
+        ``by_job_id``, ``by_employee``, ``by_txid``, ``between``), including
+        rows still buffered in the audit writer. A queryable writer (such as
+        ``SQLiteHistory``) answers directly; a CSV ledger goes through a
+        ``PayrollHistory`` index.
+        """
+        self.audit_writer.flush()
+        if isinstance(self.audit_writer, HistoryQueries):
+            return self.audit_writer
+        if self._history is None:
+            self._history = PayrollHistory(self.history_file)
+        return self._history
+
     # ----------------------
     # Background Payroll Job
     # ----------------------
     def start_payroll_job(
-        self, interval_seconds: int, hours: float, note: str, job_id: str = None
+        self,
+        interval_seconds: int,
+        hours: float,
+        note: str,
+        job_id: str = None,
+        overrun: str = "skip",
+        scheduler: Optional[PayrollScheduler] = None,
+        prepare_dir: Optional[str] = None,
+        round_seconds: float = DEFAULT_ROUND_SECONDS,
     ):
-        if hasattr(self, "_job_running") and self._job_running:
+        """
+        Run payroll every ``interval_seconds`` on a shared ``PayrollScheduler``
+        (the process-wide default unless ``scheduler`` is given). ``overrun``
+        decides what happens when a run outlasts its interval.
+
+        With ``prepare_dir``, each run ends by preparing the next one
+        (``prepare_payroll``) as a bundle in that directory, so the next tick
+        only broadcasts it. The first run, and any run whose bundle is no
+        longer valid, is paid directly instead. A prepared run pays the
+        roster as it was when the bundle was signed.
+        """
+        if self._job is not None and self._job.active:
             print(f"[{self.department}] A payroll job is already running.")
             return
 
-        self._job_running = True
         if job_id is None:
             job_id = f"Job_{uuid.uuid4().hex[:6]}"
 
-        def job_loop():
-            while self._job_running:
-                try:
+        prepared: List[str] = []
+        stopped = threading.Event()
+
+        def run_job():
+            with self._prepared_lock:
+                bundle = prepared.pop() if prepared else None
+            try:
+                if bundle is not None:
+                    self._run_prepared(bundle, hours, note, job_id)
+                else:
                     self.run_payroll(hours, note=note, job_id=job_id)
-                except Exception as e:
-                    print(f"[{self.department}] Error in payroll job {job_id}: {e}")
-                time.sleep(interval_seconds)
+            except Exception as e:
+                print(f"[{self.department}] Error in payroll job {job_id}: {e}")
+            if prepare_dir is None or stopped.is_set():
+                return
+            try:
+                path = os.path.join(prepare_dir, uuid.uuid4().hex + BUNDLE_SUFFIX)
+                self.prepare_payroll(
+                    hours,
+                    path,
+                    run_at=datetime.now(timezone.utc)
+                    + timedelta(seconds=interval_seconds),
+                    note=note,
+                    job_id=job_id,
+                    round_seconds=round_seconds,
+                )
+            except Exception as e:
+                print(
+                    f"[{self.department}] Could not prepare the next run of {job_id}: {e}"
+                )
+                return
+            # The job may have been stopped while this run was preparing
+            with self._prepared_lock:
+                if not stopped.is_set():
+                    prepared.append(path)
+                    return
+            os.remove(path)
 
-        self._job_thread = threading.Thread(target=job_loop, daemon=True)
-        self._job_thread.start()
+        scheduler = scheduler or get_default_scheduler()
+        self._job = scheduler.schedule(
+            run_job,
+            interval_seconds,
+            job_id=f"{self.department}:{job_id}:{uuid.uuid4().hex[:6]}",
+            overrun=overrun,
+        )
+        self._scheduler = scheduler
+        self._prepared = prepared
+        self._job_stopped = stopped
         print(
             f"[{self.department}] Started payroll job {job_id}: every {interval_seconds}s, paying {hours}h"
         )
 
+    def _run_prepared(self, path: str, hours: float, note: str, job_id: str) -> None:
+        # Broadcast a bundle prepared by the previous tick; one the chain has
+        # moved past (or not reached) was never sent, so pay directly instead
+        try:
+            self.broadcast_payroll(path)
+        except BundleNotValid as e:
+            print(f"[{self.department}] {e}; paying {job_id} directly")
+            os.remove(path)
+            self.run_payroll(hours, note=note, job_id=job_id)
+        except Exception:
+            # Possibly part-sent: keep it for inspection (rebroadcasting it
+            # pays nobody twice), but never where it could be sent as new
+            failed_dir = os.path.join(os.path.dirname(path), FAILED_BUNDLE_DIR)
+            os.makedirs(failed_dir, exist_ok=True)
+            failed = os.path.join(failed_dir, os.path.basename(path))
+            os.replace(path, failed)
+            print(
+                f"[{self.department}] Broadcast of {job_id} failed; "
+                f"bundle moved to {failed}"
+            )
+            raise
+        else:
+            os.remove(path)
+
     def stop_payroll_job(self):
-        if not hasattr(self, "_job_running") or not self._job_running:
+        if self._job is None or not self._job.active:
             print(f"[{self.department}] No payroll job running.")
             return
-        self._job_running = False
-        if hasattr(self, "_job_thread"):
-            self._job_thread.join(timeout=2)
+        self._scheduler.cancel(self._job, timeout=2)
+        self._job = None
+        # Bundles for runs that will not happen were never sent; a run still
+        # preparing one sees the flag and removes its own
+        with self._prepared_lock:
+            self._job_stopped.set()
+            stale = list(self._prepared)
+            self._prepared.clear()
+        for path in stale:
+            os.remove(path)
         print(f"[{self.department}] Stopped payroll job.")
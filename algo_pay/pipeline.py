@@ -0,0 +1,233 @@
+# algo_pay/pipeline.py
+
+import base64
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import msgpack
+from algosdk.v2client import algod
+
+from . import metrics
+from .params_cache import SuggestedParamsCache, default_params_cache
+
+# algod's answer to a transaction it has already committed
+ALREADY_IN_LEDGER = "already in ledger"
+
+
+class UnitResult(NamedTuple):
+    """
+    Outcome of one submitted unit (a single payment or an atomic group).
+
+    ``pending`` marks a unit that was sent but not seen confirmed while the
+    pipeline waited, and that may still land: its outcome is unknown, not
+    failed.
+    """
+
+    txids: List[str]
+    confirmed_round: Optional[int]
+    error: Optional[str]
+    pending: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RawUnit(NamedTuple):
+    """A unit already encoded for the wire, e.g. by ``signing.BatchSigner``."""
+
+    txids: List[str]
+    data: bytes  # concatenated msgpack signed transactions
+
+
+def _unit_txids(unit) -> List[str]:
+    if isinstance(unit, RawUnit):
+        return unit.txids
+    return [stxn.get_txid() for stxn in unit]
+
+
+def _unit_last_valid(unit) -> int:
+    # Last round in which any transaction of the unit can still be confirmed
+    if isinstance(unit, RawUnit):
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(unit.data)
+        return max(stxn["txn"]["lv"] for stxn in unpacker)
+    return max(stxn.transaction.last_valid_round for stxn in unit)
+
+
+class PaymentPipeline:
+    """
+    Submit signed transactions continuously and confirm them in bulk.
+
+    Instead of blocking on ``wait_for_confirmation`` after every send, the
+    pipeline keeps up to ``window`` units in flight. Once the window is full
+    (or everything has been submitted) it waits for the next block and checks
+    every in-flight txid against that round, freeing slots for the next
+    submissions.
+
+    A unit still unconfirmed ``wait_rounds`` after it was sent is settled
+    against its ``last_valid`` round: once the chain is past it (and the
+    node still has the transaction, unconfirmed) it can never land and is
+    reported as expired; before that it is reported as ``pending``. Errors
+    while waiting for blocks are retried ``status_retries`` times; after
+    that, in-flight units are reported as pending and unsent ones as failed.
+    Every unit gets a result, so callers can log every submitted txid. A
+    unit algod refuses as already in its ledger (resent after it landed) is
+    confirmed, with no round if the node no longer lists it.
+
+    Results are returned in the order the units were given, regardless of the
+    order in which they were confirmed. ``run`` can also report progress as it
+    goes (e.g. to a ``PayrollJournal``): ``on_send(i)`` is called just before
+    unit ``i`` is submitted, and ``on_results`` with the ``(i, result)`` pairs
+    settled by each submission pass and each confirmed round.
+    """
+
+    def __init__(
+        self,
+        client: algod.AlgodClient,
+        window: int = 64,
+        wait_rounds: int = 10,
+        params_cache: Optional[SuggestedParamsCache] = None,
+        status_retries: int = 3,
+        retry_delay: float = 0.5,
+    ):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.client = client
+        self.params_cache = params_cache or default_params_cache
+        self.window = window
+        self.wait_rounds = wait_rounds
+        self.status_retries = status_retries
+        self.retry_delay = retry_delay
+
+    def run(
+        self,
+        units: Sequence[list],
+        on_send: Optional[Callable[[int], None]] = None,
+        on_results: Optional[Callable[[List[Tuple[int, UnitResult]]], None]] = None,
+    ) -> List[UnitResult]:
+        """Submit and confirm ``units`` (lists of signed transactions or ``RawUnit``)."""
+        results: List[Optional[UnitResult]] = [None] * len(units)
+        # first txid of each in-flight unit -> (unit index, round it was sent in, txids)
+        in_flight: Dict[str, tuple] = {}
+        # first txids of units algod said are already in its ledger
+        in_ledger = set()
+        last_round = self.client.status()["last-round"]
+        next_unit = 0
+        status_errors = 0
+
+        while next_unit < len(units) or in_flight:
+            settled = []
+            while next_unit < len(units) and len(in_flight) < self.window:
+                unit = units[next_unit]
+                txids = _unit_txids(unit)
+                if on_send is not None:
+                    on_send(next_unit)
+                try:
+                    with metrics.stage("send", items=len(txids)):
+                        if isinstance(unit, RawUnit):
+                            self.client.send_raw_transaction(
+                                base64.b64encode(unit.data)
+                            )
+                        else:
+                            self.client.send_transactions(unit)
+                    in_flight[txids[0]] = (next_unit, last_round, txids)
+                except Exception as e:
+                    if ALREADY_IN_LEDGER in str(e):
+                        # Resent byte for byte (e.g. on resume) after it landed:
+                        # look up its round like any other in-flight unit
+                        in_flight[txids[0]] = (next_unit, last_round, txids)
+                        in_ledger.add(txids[0])
+                    else:
+                        results[next_unit] = UnitResult(txids, None, str(e))
+                        settled.append(next_unit)
+                next_unit += 1
+
+            if in_flight:
+                with metrics.stage(
+                    "confirm", items=sum(len(t) for _, _, t in in_flight.values())
+                ):
+                    try:
+                        # Returns as soon as a block after ``last_round`` is committed
+                        status = self.client.status_after_block(last_round)
+                    except Exception as e:
+                        status_errors += 1
+                        metrics.increment("algod_retries_total", reason="status")
+                        if status_errors <= self.status_retries:
+                            time.sleep(self.retry_delay * status_errors)
+                        else:
+                            # Payments are on the wire: give up waiting, but
+                            # report every unit rather than raising
+                            settled += self._abandon(
+                                units, in_flight, results, next_unit, e
+                            )
+                            next_unit = len(units)
+                    else:
+                        status_errors = 0
+                        last_round = status["last-round"]
+                        self.params_cache.observe_round(self.client, last_round)
+                        settled += self._confirm(
+                            units, in_flight, results, last_round, in_ledger
+                        )
+            if on_results is not None and settled:
+                on_results([(i, results[i]) for i in settled])
+
+        return results
+
+    def _confirm(
+        self, units, in_flight, results, last_round, in_ledger=()
+    ) -> List[int]:
+        settled = []
+        for txid, (index, sent_round, txids) in list(in_flight.items()):
+            try:
+                info = self.client.pending_transaction_info(txid)
+            except Exception:
+                # A load-balanced algod may not know the txid yet; retry next round
+                metrics.increment("algod_retries_total", reason="pending_info")
+                info = None
+
+            if info and info.get("confirmed-round"):
+                results[index] = UnitResult(txids, info["confirmed-round"], None)
+            elif info is None and txid in in_ledger:
+                # Committed long enough ago that the node no longer lists it:
+                # paid, in a round only an indexer could tell
+                results[index] = UnitResult(txids, None, None)
+            elif info and info.get("pool-error"):
+                results[index] = UnitResult(
+                    txids, None, f"Transaction rejected: {info['pool-error']}"
+                )
+            elif last_round > sent_round + self.wait_rounds:
+                last_valid = _unit_last_valid(units[index])
+                if info is not None and last_round > last_valid:
+                    results[index] = UnitResult(
+                        txids, None, f"Expired after round {last_valid}"
+                    )
+                else:
+                    # Unknown to this node, or still valid: it may yet land
+                    results[index] = UnitResult(
+                        txids,
+                        None,
+                        f"Not confirmed after {self.wait_rounds} rounds "
+                        f"(valid until round {last_valid})",
+                        pending=True,
+                    )
+            else:
+                continue
+            del in_flight[txid]
+            settled.append(index)
+        return settled
+
+    def _abandon(self, units, in_flight, results, next_unit, error) -> List[int]:
+        settled = []
+        for index, _, txids in in_flight.values():
+            results[index] = UnitResult(
+                txids, None, f"Confirmation unknown: {error}", pending=True
+            )
+            settled.append(index)
+        in_flight.clear()
+        for index in range(next_unit, len(units)):
+            results[index] = UnitResult(
+                _unit_txids(units[index]), None, f"Not sent: {error}"
+            )
+            settled.append(index)
+        return settled
@@ -0,0 +1,186 @@
+# algo_pay/roster.py
+
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class RosterSnapshot(NamedTuple):
+    """Immutable view of a roster taken at the start of a payroll run."""
+
+    addresses: tuple
+    names: tuple
+    rates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+
+class Roster(Mapping):
+    """
+    Columnar employee roster.
+
+    Rates live in a growable float64 array, addresses in a flat list with an
+    address-to-index map, and names are interned (and not stored at all when
+    an employee is named after their address). Insertion order is preserved
+    and is the order payroll runs pay in.
+
+    ``Roster`` is a read-only ``Mapping`` of ``address -> {"rate", "name"}``
+    so code written against the old ``Payroll.employees`` dict keeps working;
+    mutate it through ``add``/``remove`` and the bulk variants.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._addresses: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._rates = np.empty(max(capacity, 1), dtype=np.float64)
+        self._index: Dict[str, int] = {}
+        # Guards mutations against snapshots taken by a running payroll job
+        self._lock = threading.RLock()
+
+    # ----------------------
+    # Mapping interface
+    # ----------------------
+    def __getitem__(self, address: str) -> dict:
+        i = self._index[address]
+        return {"rate": float(self._rates[i]), "name": self._name_at(i)}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._addresses))
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def __contains__(self, address) -> bool:
+        return address in self._index
+
+    def __repr__(self) -> str:
+        return f"Roster({len(self)} employees)"
+
+    # ----------------------
+    # Columns
+    # ----------------------
+    @property
+    def addresses(self) -> tuple:
+        return tuple(self._addresses)
+
+    @property
+    def names(self) -> tuple:
+        return tuple(self._name_at(i) for i in range(len(self)))
+
+    @property
+    def rates(self) -> np.ndarray:
+        """Read-only view of hourly rates (ALGO/hr) in roster order."""
+        view = self._rates[: len(self)]
+        view.flags.writeable = False
+        return view
+
+    def snapshot(self) -> RosterSnapshot:
+        """Copy the roster so a run is unaffected by concurrent changes."""
+        with self._lock:
+            return RosterSnapshot(
+                self.addresses, self.names, self._rates[: len(self)].copy()
+            )
+
+    # ----------------------
+    # Mutation
+    # ----------------------
+    def add(self, address: str, rate: float, name: Optional[str] = None) -> None:
+        """Add an employee, or update their rate and name if already present."""
+        self.add_many([address], [rate], None if name is None else [name])
+
+    def add_many(
+        self,
+        addresses: Sequence[str],
+        rates: Sequence[float],
+        names: Optional[Sequence[Optional[str]]] = None,
+    ) -> int:
+        """Add or update many employees at once; returns how many were new."""
+        rates = _checked_rates(rates)
+        if len(addresses) != len(rates) or (
+            names is not None and len(names) != len(addresses)
+        ):
+            raise ValueError("addresses, rates and names must have the same length")
+
+        with self._lock:
+            self._reserve(len(self) + len(addresses))
+            added = 0
+            for j, address in enumerate(addresses):
+                name = names[j] if names is not None else None
+                stored = None if name is None or name == address else sys.intern(name)
+                i = self._index.get(address)
+                if i is None:
+                    i = len(self._addresses)
+                    self._index[address] = i
+                    self._addresses.append(address)
+                    self._names.append(stored)
+                    added += 1
+                elif name is not None:
+                    self._names[i] = stored
+                self._rates[i] = rates[j]
+            return added
+
+    def update_rates(self, addresses: Sequence[str], rates: Sequence[float]) -> None:
+        """Change the rates of existing employees (``KeyError`` if unknown)."""
+        rates = _checked_rates(rates)
+        with self._lock:
+            idx = np.fromiter(
+                (self._index[a] for a in addresses), dtype=np.intp, count=len(addresses)
+            )
+            self._rates[idx] = rates
+
+    def remove(self, address: str) -> Optional[str]:
+        """Remove one employee; returns their name, or None if absent."""
+        with self._lock:
+            if address not in self._index:
+                return None
+            name = self._name_at(self._index[address])
+            self.remove_many([address])
+            return name
+
+    def remove_many(self, addresses: Iterable[str]) -> int:
+        """Remove many employees in one compaction pass; returns how many."""
+        with self._lock:
+            drop = {self._index[a] for a in addresses if a in self._index}
+            if not drop:
+                return 0
+            keep = np.ones(len(self), dtype=bool)
+            keep[list(drop)] = False
+            kept = np.flatnonzero(keep)
+
+            self._rates[: len(kept)] = self._rates[: len(self)][keep]
+            self._addresses = [self._addresses[i] for i in kept]
+            self._names = [self._names[i] for i in kept]
+            self._index = {a: i for i, a in enumerate(self._addresses)}
+            return len(drop)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._addresses = []
+            self._names = []
+            self._index = {}
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    def _name_at(self, i: int) -> str:
+        name = self._names[i]
+        return self._addresses[i] if name is None else name
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._rates):
+            return
+        grown = np.empty(max(size, 2 * len(self._rates)), dtype=np.float64)
+        grown[: len(self)] = self._rates[: len(self)]
+        self._rates = grown
+
+
+def _checked_rates(rates: Sequence[float]) -> np.ndarray:
+    # NaN and inf would later cast to garbage microAlgo amounts
+    rates = np.asarray(rates, dtype=np.float64)
+    if np.any(~np.isfinite(rates) | (rates < 0)):
+        raise ValueError("Hourly rates must be finite and non-negative")
+    return rates
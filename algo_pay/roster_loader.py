@@ -0,0 +1,152 @@
+# algo_pay/roster_loader.py
+
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+from algosdk import encoding
+
+from .roster import Roster
+
+ROSTER_COLUMNS = ("employee_address", "hourly_rate")
+NAME_COLUMNS = ("employee_name", "name")
+
+# Keep the first N rejected rows for the report; the rest are only counted
+MAX_REPORTED_REJECTS = 1000
+
+
+class RosterLoadReport(NamedTuple):
+    added: int
+    updated: int
+    duplicates: int
+    rejected: int
+    # (row, employee_address, reason); row is the file line for CSV (the
+    # header is line 1) and the 1-based record number for Parquet
+    rejects: List[tuple]
+
+    @property
+    def ok(self) -> bool:
+        return self.rejected == 0
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def iter_roster_chunks(
+    path: Union[str, Path], chunksize: int = 50_000
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or Parquet roster in chunks of at most ``chunksize`` rows.
+
+    Only the roster columns (plus an optional ``employee_name``/``name``)
+    are read, and the whole file is never held in memory at once.
+    """
+    path = Path(path)
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Loading Parquet rosters requires pyarrow: pip install pyarrow"
+            ) from e
+        parquet = pq.ParquetFile(path)
+        columns = [
+            c
+            for c in parquet.schema_arrow.names
+            if c in ROSTER_COLUMNS or c in NAME_COLUMNS
+        ]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    yield from pd.read_csv(
+        path,
+        chunksize=chunksize,
+        dtype={"employee_address": str, "employee_name": str, "name": str},
+        usecols=lambda c: c in ROSTER_COLUMNS or c in NAME_COLUMNS,
+        skipinitialspace=True,
+    )
+
+
+def validate_addresses(addresses: pd.Series) -> np.ndarray:
+    """
+    Boolean mask of valid Algorand addresses.
+
+    Shape (58 base32 characters) is checked for the whole column at once;
+    only addresses that pass are decoded and have their checksum verified,
+    once per distinct value.
+    """
+    addresses = addresses.fillna("").astype(str).str.strip()
+    mask = addresses.str.fullmatch(r"[A-Z2-7]{58}").to_numpy(dtype=bool)
+    candidates = addresses[mask].unique()
+    valid = {a for a in candidates if encoding.is_valid_address(a)}
+    if len(valid) != len(candidates):
+        mask = mask & addresses.isin(valid).to_numpy(dtype=bool)
+    return mask
+
+
+def load_roster(
+    roster: Roster, path: Union[str, Path], chunksize: int = 50_000
+) -> RosterLoadReport:
+    """
+    Bulk-load ``path`` into ``roster``, validating each chunk as a whole.
+
+    Rows with an invalid address (bad shape or checksum) or a missing,
+    non-numeric or negative ``hourly_rate`` are rejected. Repeated addresses
+    within the file keep their first occurrence. Employees already on the
+    roster are updated in place.
+    """
+    added = updated = duplicates = rejected = 0
+    rejects: List[tuple] = []
+    seen = set()
+    # Number of the first data row: CSV rows are reported as file lines
+    # (after the header), Parquet rows as 1-based record numbers
+    row_offset = 1 if _is_parquet(Path(path)) else 2
+
+    for chunk in iter_roster_chunks(path, chunksize):
+        missing = [c for c in ROSTER_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Roster file is missing required columns: {missing}")
+
+        addresses = chunk["employee_address"].fillna("").astype(str).str.strip()
+        rates = pd.to_numeric(chunk["hourly_rate"], errors="coerce").to_numpy(
+            dtype=np.float64
+        )
+        name_col = next((c for c in NAME_COLUMNS if c in chunk.columns), None)
+
+        good_address = validate_addresses(addresses)
+        good_rate = np.isfinite(rates) & (rates >= 0)
+        valid = good_address & good_rate
+
+        # First valid occurrence wins, within the chunk and across chunks
+        unique = np.zeros(len(chunk), dtype=bool)
+        unique[valid] = ~addresses[valid].duplicated().to_numpy()
+        unique &= ~addresses.isin(seen).to_numpy()
+
+        bad = ~valid
+        dup = valid & ~unique
+        keep = valid & unique
+
+        rejected += int(bad.sum())
+        duplicates += int(dup.sum())
+        if bad.any() and len(rejects) < MAX_REPORTED_REJECTS:
+            for i in np.flatnonzero(bad)[: MAX_REPORTED_REJECTS - len(rejects)]:
+                reason = "invalid address" if not good_address[i] else "invalid rate"
+                rejects.append((row_offset + int(i), addresses.iat[i], reason))
+
+        kept_addresses = addresses[keep].tolist()
+        names: Optional[list] = None
+        if name_col is not None:
+            names = [
+                n if isinstance(n, str) and n else None
+                for n in chunk[name_col][keep].tolist()
+            ]
+        new = roster.add_many(kept_addresses, rates[keep], names)
+        added += new
+        updated += len(kept_addresses) - new
+        seen.update(kept_addresses)
+        row_offset += len(chunk)
+
+    return RosterLoadReport(added, updated, duplicates, rejected, rejects)
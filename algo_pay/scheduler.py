@@ -0,0 +1,265 @@
+# algo_pay/scheduler.py
+
+import heapq
+import itertools
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# What to do when a job comes due while its previous run is still going:
+# - "skip": drop the tick, run again at the next slot
+# - "coalesce": remember at most one missed tick, run it as soon as the
+#   current run finishes
+# - "queue": remember every missed tick and run them back to back
+OVERRUN_POLICIES = ("skip", "coalesce", "queue")
+
+
+class ScheduledJob:
+    """Handle for a job registered with a ``PayrollScheduler``."""
+
+    def __init__(
+        self,
+        job_id: str,
+        func: Callable[[], object],
+        interval: float,
+        overrun: str,
+        first_run: float,
+    ):
+        self.job_id = job_id
+        self.func = func
+        self.interval = interval
+        self.overrun = overrun
+        self.next_run = first_run
+        self.runs = 0
+        self.skipped = 0
+        self.pending = 0
+        self.running = False
+        self.cancelled = False
+        self._idle = threading.Event()
+        self._idle.set()
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no run of this job is in progress."""
+        return self._idle.wait(timeout)
+
+    def __repr__(self) -> str:
+        return (
+            f"ScheduledJob({self.job_id!r}, every {self.interval}s, "
+            f"overrun={self.overrun!r}, runs={self.runs})"
+        )
+
+
+class PayrollScheduler:
+    """
+    One timer thread and a bounded worker pool for any number of jobs.
+
+    Jobs are kept in a single heap ordered by their next due time. Due
+    times are computed from the job's start (``start + k * interval``), so
+    the time a run takes does not push later runs back. Runs execute on a
+    ``ThreadPoolExecutor`` of ``max_workers`` threads; ``overrun`` decides
+    what happens to ticks that fall due while a job's previous run is still
+    in progress (see ``OVERRUN_POLICIES``).
+    """
+
+    def __init__(self, max_workers: int = 8, name: str = "scheduler"):
+        self.max_workers = max_workers
+        self.name = name
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ----------------------
+    # Lifecycle
+    # ----------------------
+    def start(self) -> "PayrollScheduler":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+            self._thread = threading.Thread(
+                target=self._timer_loop, name=f"{self.name}-timer", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel every job and stop the timer thread and worker pool."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            for job in self._jobs.values():
+                job.cancelled = True
+                job.pending = 0
+            self._jobs.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+            executor, thread = self._executor, self._thread
+        thread.join()
+        executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # ----------------------
+    # Jobs
+    # ----------------------
+    @property
+    def jobs(self) -> List[ScheduledJob]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def schedule(
+        self,
+        func: Callable[[], object],
+        interval_seconds: float,
+        job_id: Optional[str] = None,
+        overrun: str = "skip",
+        start_delay: float = 0.0,
+    ) -> ScheduledJob:
+        """
+        Run ``func`` every ``interval_seconds``, first after ``start_delay``.
+
+        Starts the scheduler if it is not running yet.
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(
+                f"Unknown overrun policy {overrun!r}; expected one of {OVERRUN_POLICIES}"
+            )
+        if job_id is None:
+            job_id = f"Job_{uuid.uuid4().hex[:6]}"
+
+        self.start()
+        with self._cond:
+            if job_id in self._jobs:
+                raise ValueError(f"Job {job_id} is already scheduled")
+            job = ScheduledJob(
+                job_id,
+                func,
+                interval_seconds,
+                overrun,
+                time.monotonic() + start_delay,
+            )
+            self._jobs[job_id] = job
+            self._push(job)
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, job, timeout: Optional[float] = None) -> bool:
+        """
+        Unschedule a job (by handle or id) and drop its pending ticks.
+
+        A run already in progress is not interrupted; with a ``timeout`` this
+        waits up to that long for it to finish. Returns False if the job was
+        not scheduled.
+        """
+        job_id = job.job_id if isinstance(job, ScheduledJob) else job
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            job.cancelled = True
+            job.pending = 0
+            self._cond.notify_all()
+        if timeout:
+            job.wait_idle(timeout)
+        return True
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    def _push(self, job: ScheduledJob) -> None:
+        heapq.heappush(self._heap, (job.next_run, next(self._seq), job))
+
+    def _timer_loop(self) -> None:
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, job = self._heap[0]
+                if job.cancelled or due != job.next_run:
+                    heapq.heappop(self._heap)  # stale entry
+                    continue
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                self._fire(job, now)
+
+    def _fire(self, job: ScheduledJob, now: float) -> None:
+        # Next slot on the job's own grid; ticks missed while the timer was
+        # late count as overruns too
+        missed = max(0, math.floor((now - job.next_run) / job.interval))
+        job.next_run += (missed + 1) * job.interval
+        self._push(job)
+
+        ticks = missed + 1
+        if not job.running:
+            ticks -= 1
+            self._dispatch(job)
+        if ticks:
+            if job.overrun == "queue":
+                job.pending += ticks
+            elif job.overrun == "coalesce":
+                job.skipped += ticks - (0 if job.pending else 1)
+                job.pending = 1
+            else:
+                job.skipped += ticks
+
+    def _dispatch(self, job: ScheduledJob) -> None:
+        job.running = True
+        job._idle.clear()
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: ScheduledJob) -> None:
+        try:
+            job.func()
+        except Exception as e:
+            print(f"[{self.name}] Job {job.job_id} failed: {e}")
+        finally:
+            with self._cond:
+                job.runs += 1
+                if job.pending and not job.cancelled and self._running:
+                    job.pending -= 1
+                    self._dispatch(job)
+                else:
+                    job.running = False
+                    job._idle.set()
+
+
+_default_scheduler: Optional[PayrollScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> PayrollScheduler:
+    """Process-wide scheduler used by ``Payroll.start_payroll_job``."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None or not _default_scheduler.running:
+            _default_scheduler = PayrollScheduler(name="payroll").start()
+        return _default_scheduler
@@ -0,0 +1,147 @@
+# algo_pay/signing.py
+
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from algosdk import encoding, transaction
+from nacl.signing import SigningKey
+
+from . import metrics
+
+# Below this many transactions a process pool costs more than it saves
+SERIAL_THRESHOLD = 2_000
+DEFAULT_CHUNK_SIZE = 1_000
+
+# Algorand private keys are the 32-byte Ed25519 seed followed by the public key
+SEED_SIZE = 32
+
+
+class _Signer:
+    """Ed25519 key decoded once; signs transactions into ``(txid, wire bytes)``."""
+
+    def __init__(self, private_key: str):
+        key = base64.b64decode(private_key)
+        self.signing_key = SigningKey(key[:SEED_SIZE])
+        self.address = encoding.encode_address(key[SEED_SIZE:])
+
+    def sign(self, txns: Sequence[transaction.Transaction]) -> List[Tuple[str, bytes]]:
+        signed_txns = []
+        for txn in txns:
+            to_sign = txn.bytes_to_sign()
+            # Same digest Transaction.get_txid computes, without re-encoding
+            txid = base64.b32encode(encoding.checksum(to_sign)).decode().rstrip("=")
+            signature = self.signing_key.sign(to_sign).signature
+            signed = transaction.SignedTransaction(
+                txn,
+                base64.b64encode(signature).decode(),
+                # Same rule as Transaction.sign: a rekeyed sender names its signer
+                self.address if txn.sender != self.address else None,
+            )
+            signed_txns.append(
+                (txid, base64.b64decode(encoding.msgpack_encode(signed)))
+            )
+        return signed_txns
+
+
+# Set in each pool worker by _init_worker, so the key crosses once per process
+_worker_signer: Optional[_Signer] = None
+
+
+def _init_worker(private_key: str) -> None:
+    global _worker_signer
+    _worker_signer = _Signer(private_key)
+
+
+def _sign_chunk(txns: Sequence[transaction.Transaction]) -> List[Tuple[str, bytes]]:
+    return _worker_signer.sign(txns)
+
+
+class BatchSigner:
+    """
+    Sign large batches of transactions with one key across a process pool.
+
+    ``sign`` returns one msgpack-encoded signed transaction per input, in
+    order, ready to be sent (concatenated for a group) with
+    ``transactions.broadcast_raw``. Everything is signed in-process unless
+    ``processes`` is 2 or more; even then, batches smaller than
+    ``serial_threshold`` are. The pool is started on the first large batch
+    and reused until ``close``; each worker receives the key once, through
+    its initializer, never per chunk.
+
+    Workers are spawned rather than forked, so they do not inherit the
+    scheduler's and notifiers' threads. Spawning re-imports the main module
+    in every worker: a script that opts into a pool must keep its top-level
+    code (anything that sends payments) under
+    ``if __name__ == "__main__":``.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        processes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        serial_threshold: int = SERIAL_THRESHOLD,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self._private_key = private_key
+        self._signer = _Signer(private_key)
+        self.processes = processes or 1
+        self.chunk_size = chunk_size
+        self.serial_threshold = serial_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def sign(self, txns: Sequence[transaction.Transaction]) -> List[bytes]:
+        return [blob for _, blob in self.sign_with_txids(txns)]
+
+    def sign_with_txids(
+        self, txns: Sequence[transaction.Transaction]
+    ) -> List[Tuple[str, bytes]]:
+        """Like ``sign``, but pairs each encoded transaction with its txid."""
+        txns = list(txns)
+        with metrics.stage("sign", items=len(txns)):
+            if len(txns) < self.serial_threshold or self.processes < 2:
+                return self._signer.sign(txns)
+            chunks = [
+                txns[start : start + self.chunk_size]
+                for start in range(0, len(txns), self.chunk_size)
+            ]
+            signed_txns = []
+            for signed in self._get_pool().map(_sign_chunk, chunks):
+                signed_txns.extend(signed)
+            return signed_txns
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._private_key,),
+            )
+        return self._pool
+
+
+def sign_batch(
+    txns: Sequence[transaction.Transaction],
+    private_key: str,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    serial_threshold: int = SERIAL_THRESHOLD,
+) -> List[bytes]:
+    """One-off ``BatchSigner.sign``; the pool (if any) is shut down afterwards."""
+    with BatchSigner(private_key, processes, chunk_size, serial_threshold) as signer:
+        return signer.sign(txns)
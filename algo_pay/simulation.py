@@ -0,0 +1,118 @@
+# algo_pay/simulation.py
+
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence
+
+from algosdk import transaction
+from algosdk.v2client import algod, models
+
+from . import metrics
+from .transactions import MAX_GROUP_SIZE, group_and_assign_id
+
+
+class SimulatedFailure(NamedTuple):
+    """A payment the run would not make, and why."""
+
+    position: int  # in the run's rows (roster order)
+    employee_address: str
+    employee_name: str
+    amount: int  # microAlgos
+    reason: str
+
+
+class SimulationReport(NamedTuple):
+    """
+    Outcome of ``Payroll.simulate_payroll``: nothing was sent. Amounts are
+    in microAlgos; ``amount`` and ``fees`` count only the payments that
+    would go through.
+    """
+
+    payments: int
+    failures: List[SimulatedFailure]
+    amount: int
+    fees: int
+    balance_before: int
+    balance_after: int
+    min_balance: int
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def total_cost(self) -> int:
+        return self.amount + self.fees
+
+
+def simulate_payments(
+    client: algod.AlgodClient,
+    txns: Sequence[transaction.Transaction],
+    group_size: int = MAX_GROUP_SIZE,
+    max_workers: int = 8,
+) -> Dict[int, str]:
+    """
+    Check unsigned ``txns`` against algod's simulate endpoint, ``group_size``
+    at a time (one group per request, several requests in flight). Returns
+    the failure message for every transaction that would be rejected, by
+    index in ``txns``.
+
+    Each chunk is simulated against the current ledger on its own, so
+    effects that build up across chunks (the sender's balance running down)
+    are not seen here; see ``Payroll.simulate_payroll``.
+    """
+    if not 1 <= group_size <= MAX_GROUP_SIZE:
+        raise ValueError(f"group_size must be between 1 and {MAX_GROUP_SIZE}")
+    chunks = [
+        list(range(start, min(start + group_size, len(txns))))
+        for start in range(0, len(txns), group_size)
+    ]
+    failures: Dict[int, str] = {}
+    if not chunks:
+        return failures
+    with metrics.stage("simulate", items=len(txns)):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for chunk_failures in pool.map(
+                lambda chunk: _simulate_chunk(client, txns, chunk), chunks
+            ):
+                failures.update(chunk_failures)
+    return failures
+
+
+def _simulate_chunk(client, txns, indices: List[int]) -> Dict[int, str]:
+    # A group stops at its first failure: note it, drop it and simulate the
+    # rest again. A failure algod cannot pin on one transaction is narrowed
+    # down by simulating the chunk's payments one at a time.
+    failures: Dict[int, str] = {}
+    remaining = list(indices)
+    while remaining:
+        group = _simulate_group(client, [txns[i] for i in remaining])
+        message = group.get("failure-message")
+        if not message:
+            break
+        failed_at = group.get("failed-at")
+        if failed_at:
+            failures[remaining.pop(failed_at[0])] = message
+        elif len(remaining) == 1:
+            failures[remaining.pop()] = message
+        else:
+            for i in remaining:
+                failures.update(_simulate_chunk(client, txns, [i]))
+            break
+    return failures
+
+
+def _simulate_group(client, txns: List[transaction.Transaction]) -> dict:
+    # Copies, so the caller's transactions keep no group id
+    txns = [copy.copy(txn) for txn in txns]
+    if len(txns) > 1:
+        group_and_assign_id(txns)
+    request = models.SimulateRequest(
+        txn_groups=[
+            models.SimulateRequestTransactionGroup(
+                txns=[transaction.SignedTransaction(txn, None) for txn in txns]
+            )
+        ],
+        allow_empty_signatures=True,
+    )
+    return client.simulate_transactions(request)["txn-groups"][0]
@@ -0,0 +1,145 @@
+# algo_pay/sqlite_history.py
+
+import csv
+import sqlite3
+from typing import List, Optional, Sequence
+
+from .audit import AUDIT_HEADER, AuditBackend, FlushPolicy
+from .history import HistoryQueries, TimeBound, _where
+
+_REAL_COLUMNS = ("amount_ALGO", "employer_balance_before", "employer_balance_after")
+_INDEXED_COLUMNS = ("payroll_id", "job_id", "employee_address", "txid", "timestamp")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS payroll_history (id INTEGER PRIMARY KEY, "
+    + ", ".join(
+        f"{column} {'REAL' if column in _REAL_COLUMNS else 'TEXT'}"
+        for column in AUDIT_HEADER
+    )
+    + ");\n"
+    + "".join(
+        f"CREATE INDEX IF NOT EXISTS payroll_history_{column} "
+        f"ON payroll_history ({column});\n"
+        for column in _INDEXED_COLUMNS
+    )
+)
+_FILTERS = {
+    "payroll_id",
+    "job_id",
+    "employee_address",
+    "txid",
+    "department",
+    "start",
+    "end",
+}
+_INSERT = (
+    f"INSERT INTO payroll_history ({', '.join(AUDIT_HEADER)}) "
+    f"VALUES ({', '.join('?' * len(AUDIT_HEADER))})"
+)
+
+
+class SQLiteHistory(AuditBackend, HistoryQueries):
+    """
+    Payroll history in a SQLite database, written and queried in place.
+
+    A drop-in for the CSV ``AuditLogWriter``: rows are buffered per the
+    ``flush`` policy and each flush (by default, each payroll run) is
+    inserted in a single transaction. The database runs in WAL mode, so
+    readers never block the writer, and writers in other threads or
+    processes wait up to ``timeout`` seconds for the lock rather than fail.
+    ``payroll_id``, ``job_id``, ``employee_address``, ``txid`` and
+    ``timestamp`` are indexed for the ``HistoryQueries`` lookups, and
+    ``export_csv`` writes the ledger back out in the CSV column layout.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        flush: FlushPolicy = "run",
+        fsync: bool = False,
+        max_buffered_rows: int = 10_000,
+        timeout: float = 30.0,
+    ):
+        super().__init__(filename, flush=flush, max_buffered_rows=max_buffered_rows)
+        # Autocommit mode: transactions are opened explicitly in _write_rows
+        self._db = sqlite3.connect(
+            filename, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL survives an application crash in WAL mode; FULL also a power loss
+        self._db.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._db.executescript(_SCHEMA)
+
+    def query(
+        self,
+        payroll_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        employee_address: Optional[str] = None,
+        txid: Optional[str] = None,
+        department: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Rows matching every filter given, in the order they were logged."""
+        with self._lock:
+            self._flush_locked()
+            cursor = self._select(
+                payroll_id=payroll_id,
+                job_id=job_id,
+                employee_address=employee_address,
+                txid=txid,
+                department=department,
+                start=start,
+                end=end,
+                limit=limit,
+            )
+            return [dict(zip(AUDIT_HEADER, row)) for row in cursor]
+
+    def export_csv(self, path: str, **filters) -> int:
+        """
+        Write matching rows (all by default) to ``path`` as a CSV ledger with
+        the usual header; returns the number of rows written.
+        """
+        count = 0
+        with self._lock:
+            self._flush_locked()
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(AUDIT_HEADER)
+                for row in self._select(**filters):
+                    writer.writerow(row)
+                    count += 1
+        return count
+
+    def _select(self, limit: Optional[int] = None, **filters):
+        unknown = set(filters) - _FILTERS
+        if unknown:
+            raise TypeError(f"Unknown history filters: {', '.join(sorted(unknown))}")
+        where, params = _where(**filters)
+        sql = (
+            f"SELECT {', '.join(AUDIT_HEADER)} FROM payroll_history{where} ORDER BY id"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._db.execute(sql, params)
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on the busy timeout instead of deadlocking on a lock upgrade
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(_INSERT, rows)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
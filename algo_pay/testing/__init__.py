@@ -0,0 +1,6 @@
+# algo_pay/testing/__init__.py
+"""Offline test and benchmark helpers (no network access needed)."""
+
+from .accounts import random_addresses as random_addresses
+from .fake_algod import FakeAlgod as FakeAlgod
+from .fake_algod import GENESIS_HASH as GENESIS_HASH
@@ -0,0 +1,13 @@
+# algo_pay/testing/accounts.py
+
+from typing import List
+
+import numpy as np
+from algosdk import encoding
+
+
+def random_addresses(count: int, seed: int = 0) -> List[str]:
+    """Valid Algorand addresses without the cost of generating key pairs."""
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, 256, size=(count, 32), dtype=np.uint8)
+    return [encoding.encode_address(bytes(k)) for k in keys]
@@ -0,0 +1,611 @@
+# algo_pay/testing/fake_algod.py
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+
+import msgpack
+from algosdk import encoding, logic, transaction
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from ..clients import PooledAlgodClient
+from .teal import assemble
+
+GENESIS_ID = "fakenet-v1"
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+CONSENSUS_VERSION = "future"
+
+MIN_FEE = 1000
+MIN_BALANCE = 100_000
+# Extra minimum balance for each asset an account holds
+ASSET_MIN_BALANCE = 100_000
+# algod gives up on wait-for-block-after after about a minute
+MAX_BLOCK_WAIT = 60.0
+
+
+class TransactionRejected(Exception):
+    """A submission the fake ledger refuses; surfaced as an HTTP 400."""
+
+    def __init__(self, message: str, index: Optional[int] = None):
+        super().__init__(message)
+        # Position in the group of the transaction at fault, if it is one
+        self.index = index
+
+
+class FakeAlgod:
+    """
+    In-process algod stand-in with a real in-memory ledger.
+
+    Serves the endpoints payroll uses over HTTP on ``127.0.0.1``:
+    ``/v2/transactions/params``, ``POST /v2/transactions``,
+    ``/v2/transactions/pending/{txid}``, ``/v2/accounts/{address}``,
+    ``/v2/status``, ``/v2/status/wait-for-block-after/{round}``,
+    ``POST /v2/transactions/simulate`` and ``POST /v2/teal/compile``.
+
+    Submissions are checked the way algod checks them (signature, genesis
+    hash, validity window, fee, balance and minimum balance, duplicate txids
+    and leases) and a group is applied all-or-nothing. Simulation runs the
+    same checks against the current ledger without applying anything; like
+    algod it takes one group per request. Compilation covers only the TEAL
+    simple escrows use (see ``teal.assemble``).
+
+    Block timing:
+
+    - ``round_time=0`` (the default, like a dev-mode node): every submission
+      is committed in its own block right away, and waiting for a block
+      past the current round produces an empty one.
+    - ``round_time > 0``: a block is produced every ``round_time`` seconds
+      containing everything submitted since the last one.
+
+    Load shaping: ``latency`` seconds are added to every request,
+    ``error_rate`` makes that fraction of requests fail with a 500
+    (``fail_next`` injects failures deterministically), and ``rate_limit``
+    caps requests per second, answering 429 with ``Retry-After`` beyond it.
+
+    Use as a context manager or call ``start``/``stop``; ``client()`` returns
+    an ``AlgodClient`` pointed at the server.
+    """
+
+    def __init__(
+        self,
+        round_time: float = 0.0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        verify_signatures: bool = True,
+        token: str = "a" * 64,
+        start_round: int = 1000,
+        seed: Optional[int] = None,
+    ):
+        self.round_time = round_time
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.verify_signatures = verify_signatures
+        self.token = token
+
+        self.round = start_round
+        self.round_started = time.monotonic()
+        self.balances: Dict[str, int] = {}
+        self.assets: Dict[Tuple[str, int], int] = {}
+        self.confirmed: Dict[str, int] = {}
+        # Confirmed txids pending lookups no longer answer for
+        self.forgotten: Set[str] = set()
+
+        self.requests: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rate_limited = 0
+
+        self._pool_txids: List[str] = []
+        self._leases: Dict[Tuple[str, bytes], int] = {}
+        self._failures: List[Tuple[Optional[str], int]] = []
+        self._random = random.Random(seed)
+        self._bucket = (rate_limit or 0.0, time.monotonic())
+        self._lock = threading.Condition()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    # ----------------------
+    # Lifecycle
+    # ----------------------
+    def start(self) -> "FakeAlgod":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.algod = self
+        self._stopping.clear()
+        serve = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        serve.start()
+        self._threads = [serve]
+        if self.round_time > 0:
+            producer = threading.Thread(target=self._produce_blocks, daemon=True)
+            producer.start()
+            self._threads.append(producer)
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._lock:
+            self._lock.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def address(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def client(self, **pool_options) -> PooledAlgodClient:
+        """A client for this server (not shared through the registry)."""
+        return PooledAlgodClient(self.token, self.address, **pool_options)
+
+    # ----------------------
+    # Ledger setup and inspection
+    # ----------------------
+    def fund(self, address: str, microalgos: int) -> None:
+        with self._lock:
+            self.balances[address] = self.balances.get(address, 0) + microalgos
+
+    def opt_in(self, address: str, asset_id: int, amount: int = 0) -> None:
+        with self._lock:
+            self.assets[(address, asset_id)] = amount
+
+    def balance(self, address: str) -> int:
+        with self._lock:
+            return self.balances.get(address, 0)
+
+    def asset_balance(self, address: str, asset_id: int) -> Optional[int]:
+        with self._lock:
+            return self.assets.get((address, asset_id))
+
+    def fail_next(
+        self, count: int = 1, status: int = 500, path: Optional[str] = None
+    ) -> None:
+        """Fail the next ``count`` requests (whose path starts with ``path``)."""
+        with self._lock:
+            self._failures.extend([(path, status)] * count)
+
+    def forget_confirmed(self) -> None:
+        """
+        Stop answering pending lookups for everything confirmed so far, as
+        algod does once a transaction is no longer recent. The ledger still
+        refuses them as already in ledger.
+        """
+        with self._lock:
+            self.forgotten.update(self.confirmed)
+
+    def advance(self, rounds: int = 1) -> int:
+        """Commit ``rounds`` blocks immediately; returns the new round."""
+        with self._lock:
+            for _ in range(rounds):
+                self._commit_block()
+            return self.round
+
+    # ----------------------
+    # Request handling
+    # ----------------------
+    def handle(self, method: str, path: str, body: bytes, headers) -> tuple:
+        """Return ``(status, payload, extra_headers)`` for one request."""
+        if headers.get("X-Algo-API-Token") != self.token:
+            return 401, {"message": "Invalid API Token"}, {}
+
+        with self._lock:
+            self.requests[_route_name(method, path)] += 1
+            limited = self._take_token()
+            failure = None if limited else self._injected_failure(path)
+        if limited:
+            return 429, {"message": "rate limit exceeded"}, {"Retry-After": "1"}
+        if self.latency:
+            time.sleep(self.latency)
+        if failure is not None:
+            return failure, {"message": "injected failure"}, {}
+
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/v2/transactions/params":
+            return 200, self._params(), {}
+        if method == "POST" and path == "/v2/transactions":
+            return self._submit(body)
+        if method == "POST" and path == "/v2/transactions/simulate":
+            return self._simulate(body)
+        if method == "POST" and path == "/v2/teal/compile":
+            return self._compile(body)
+        if method == "GET" and path == "/v2/status":
+            return 200, self._status(), {}
+        match = re.fullmatch(r"/v2/status/wait-for-block-after/(\d+)", path)
+        if method == "GET" and match:
+            return 200, self._wait_for_block_after(int(match.group(1))), {}
+        match = re.fullmatch(r"/v2/transactions/pending/(\w+)", path)
+        if method == "GET" and match:
+            return self._pending(match.group(1))
+        match = re.fullmatch(r"/v2/accounts/(\w+)", path)
+        if method == "GET" and match:
+            return self._account(match.group(1))
+        return 404, {"message": f"unknown endpoint {method} {path}"}, {}
+
+    def _take_token(self) -> bool:
+        if not self.rate_limit:
+            return False
+        tokens, last = self._bucket
+        now = time.monotonic()
+        tokens = min(self.rate_limit, tokens + (now - last) * self.rate_limit)
+        if tokens < 1:
+            self._bucket = (tokens, now)
+            self.rate_limited += 1
+            return True
+        self._bucket = (tokens - 1, now)
+        return False
+
+    def _injected_failure(self, path: str) -> Optional[int]:
+        for i, (prefix, status) in enumerate(self._failures):
+            if prefix is None or path.startswith(prefix):
+                del self._failures[i]
+                return status
+        if self.error_rate and self._random.random() < self.error_rate:
+            return 500
+        return None
+
+    def _params(self) -> dict:
+        with self._lock:
+            return {
+                "consensus-version": CONSENSUS_VERSION,
+                "fee": 0,
+                "genesis-hash": GENESIS_HASH,
+                "genesis-id": GENESIS_ID,
+                "last-round": self.round,
+                "min-fee": MIN_FEE,
+            }
+
+    def _status(self) -> dict:
+        with self._lock:
+            return {
+                "last-round": self.round,
+                "last-version": CONSENSUS_VERSION,
+                "time-since-last-round": int(
+                    (time.monotonic() - self.round_started) * 1e9
+                ),
+                "catchup-time": 0,
+            }
+
+    def _wait_for_block_after(self, rnd: int) -> dict:
+        with self._lock:
+            if self.round_time <= 0 and self.round <= rnd:
+                # Dev mode: nothing will produce a block, so make one
+                while self.round <= rnd:
+                    self._commit_block()
+            self._lock.wait_for(
+                lambda: self.round > rnd or self._stopping.is_set(), MAX_BLOCK_WAIT
+            )
+        return self._status()
+
+    def _pending(self, txid: str) -> tuple:
+        with self._lock:
+            if txid in self.confirmed and txid not in self.forgotten:
+                info = {"confirmed-round": self.confirmed[txid], "pool-error": ""}
+            elif txid in self._pool_txids:
+                info = {"confirmed-round": 0, "pool-error": ""}
+            else:
+                return 404, {"message": "txn does not exist"}, {}
+        return 200, info, {}
+
+    def _compile(self, body: bytes) -> tuple:
+        try:
+            program = assemble(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as e:
+            return 400, {"message": f"compile error: {e}"}, {}
+        result = base64.b64encode(program).decode()
+        return 200, {"hash": logic.address(program), "result": result}, {}
+
+    def _account(self, address: str) -> tuple:
+        if not encoding.is_valid_address(address):
+            return 400, {"message": "failed to parse the address"}, {}
+        with self._lock:
+            holdings = [
+                {"asset-id": asset_id, "amount": amount, "is-frozen": False}
+                for (holder, asset_id), amount in self.assets.items()
+                if holder == address
+            ]
+            return (
+                200,
+                {
+                    "address": address,
+                    "amount": self.balances.get(address, 0),
+                    "min-balance": self._min_balance(address),
+                    "assets": holdings,
+                    "round": self.round,
+                    "status": "Offline",
+                },
+                {},
+            )
+
+    # ----------------------
+    # Submission and blocks
+    # ----------------------
+    def _submit(self, body: bytes) -> tuple:
+        try:
+            signed = _decode_signed(body)
+        except Exception as e:
+            return 400, {"message": f"could not decode transactions: {e}"}, {}
+        if not signed:
+            return 400, {"message": "empty transaction group"}, {}
+
+        txids = [stxn.get_txid() for stxn in signed]
+        with self._lock:
+            try:
+                self._check_and_apply(signed, txids)
+            except TransactionRejected as e:
+                return 400, {"message": str(e)}, {}
+            self._pool_txids.extend(txids)
+            if self.round_time <= 0:
+                self._commit_block()
+        return 200, {"txId": txids[0]}, {}
+
+    def _simulate(self, body: bytes) -> tuple:
+        try:
+            request = msgpack.unpackb(body, raw=False, strict_map_key=False)
+            groups = [
+                [transaction.SignedTransaction.undictify(d) for d in group["txns"]]
+                for group in request["txn-groups"]
+            ]
+        except Exception as e:
+            return 400, {"message": f"could not decode request: {e}"}, {}
+        if len(groups) != 1:
+            return (
+                400,
+                {"message": f"expected 1 transaction group, got {len(groups)}"},
+                {},
+            )
+        (signed,) = groups
+        txids = [stxn.get_txid() for stxn in signed]
+        result = {"txn-results": [{"txn-result": {}} for _ in signed]}
+        with self._lock:
+            try:
+                self._evaluate(
+                    signed,
+                    txids,
+                    allow_empty_signatures=request.get("allow-empty-signatures", False),
+                )
+            except TransactionRejected as e:
+                result["failure-message"] = str(e)
+                if e.index is not None:
+                    result["failed-at"] = [e.index]
+            last_round = self.round
+        return 200, {"version": 2, "last-round": last_round, "txn-groups": [result]}, {}
+
+    def _check_and_apply(self, signed: list, txids: List[str]) -> None:
+        self.balances, self.assets = self._evaluate(signed, txids)
+        for stxn in signed:
+            txn = stxn.transaction
+            if txn.lease:
+                self._leases[(txn.sender, txn.lease)] = txn.last_valid_round
+
+    def _evaluate(
+        self, signed: list, txids: List[str], allow_empty_signatures: bool = False
+    ) -> tuple:
+        # The ledger's balances and assets after the group, or TransactionRejected
+        txns = [stxn.transaction for stxn in signed]
+        for i, (stxn, txid) in enumerate(zip(signed, txids)):
+            txn = stxn.transaction
+            if txid in self.confirmed or txid in self._pool_txids:
+                raise TransactionRejected(
+                    f"transaction already in ledger: {txid}", index=i
+                )
+            if txn.genesis_hash != GENESIS_HASH:
+                raise TransactionRejected(
+                    f"txn {txid} has the wrong genesis hash", index=i
+                )
+            if not txn.first_valid_round <= self.round + 1 <= txn.last_valid_round:
+                raise TransactionRejected(
+                    f"txn dead: round {self.round + 1} outside "
+                    f"{txn.first_valid_round}-{txn.last_valid_round}",
+                    index=i,
+                )
+            unsigned = allow_empty_signatures and not stxn.signature
+            if self.verify_signatures and not unsigned and not _signature_ok(stxn):
+                raise TransactionRejected(f"txn {txid}: invalid signature", index=i)
+            if txn.lease:
+                held = self._leases.get((txn.sender, txn.lease))
+                if held is not None and held >= self.round + 1:
+                    raise TransactionRejected(
+                        f"transaction {txid} using an overlapping lease", index=i
+                    )
+
+        if len(txns) > 1:
+            group = transaction.calculate_group_id([_without_group(t) for t in txns])
+            if any(t.group != group for t in txns):
+                raise TransactionRejected("transaction group has an incorrect id")
+        if sum(t.fee for t in txns) < MIN_FEE * len(txns):
+            raise TransactionRejected("txn fee below threshold")
+
+        # Evaluate against a scratch copy so a failing group leaves no trace
+        balances = dict(self.balances)
+        assets = dict(self.assets)
+        touched = set()
+        for i, (txn, txid) in enumerate(zip(txns, txids)):
+            try:
+                _apply(txn, txid, balances, assets, touched)
+            except TransactionRejected as e:
+                raise TransactionRejected(str(e), index=i) from None
+        for address in touched:
+            needed = MIN_BALANCE + ASSET_MIN_BALANCE * sum(
+                1 for holder, _ in assets if holder == address
+            )
+            if balances.get(address, 0) and balances[address] < needed:
+                raise TransactionRejected(
+                    f"account {address} balance {balances[address]} below min {needed}"
+                )
+        return balances, assets
+
+    def _commit_block(self) -> None:
+        self.round += 1
+        self.round_started = time.monotonic()
+        for txid in self._pool_txids:
+            self.confirmed[txid] = self.round
+        self._pool_txids = []
+        self._lock.notify_all()
+
+    def _produce_blocks(self) -> None:
+        next_block = time.monotonic() + self.round_time
+        while not self._stopping.wait(max(0.0, next_block - time.monotonic())):
+            with self._lock:
+                self._commit_block()
+            next_block += self.round_time
+
+    def _min_balance(self, address: str) -> int:
+        held = sum(1 for holder, _ in self.assets if holder == address)
+        return MIN_BALANCE + ASSET_MIN_BALANCE * held
+
+
+# ----------------------
+# Transaction helpers
+# ----------------------
+def _decode_signed(body: bytes) -> list:
+    unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+    unpacker.feed(body)
+    signed = []
+    for d in unpacker:
+        if "lsig" in d:
+            signed.append(transaction.LogicSigTransaction.undictify(d))
+        elif "msig" in d:
+            signed.append(transaction.MultisigTransaction.undictify(d))
+        else:
+            signed.append(transaction.SignedTransaction.undictify(d))
+    return signed
+
+
+def _signature_ok(stxn) -> bool:
+    # Logic signatures and multisig are accepted as-is
+    if not isinstance(stxn, transaction.SignedTransaction):
+        return True
+    if not stxn.signature:
+        return False
+    # Accounts on the fake ledger are never rekeyed
+    if stxn.authorizing_address not in (None, stxn.transaction.sender):
+        return False
+    try:
+        VerifyKey(encoding.decode_address(stxn.transaction.sender)).verify(
+            stxn.transaction.bytes_to_sign(), base64.b64decode(stxn.signature)
+        )
+    except BadSignatureError:
+        return False
+    return True
+
+
+def _without_group(txn):
+    d = txn.dictify()
+    d.pop("grp", None)
+    return transaction.Transaction.undictify(d)
+
+
+def _apply(txn, txid, balances, assets, touched) -> None:
+    sender = txn.sender
+    touched.add(sender)
+    balances[sender] = balances.get(sender, 0) - txn.fee
+
+    if txn.type == "pay":
+        balances[sender] -= txn.amt
+        balances[txn.receiver] = balances.get(txn.receiver, 0) + txn.amt
+        touched.add(txn.receiver)
+        if txn.close_remainder_to:
+            rest = balances.pop(sender)
+            if rest < 0:
+                balances[sender] = rest
+            else:
+                balances[txn.close_remainder_to] = (
+                    balances.get(txn.close_remainder_to, 0) + rest
+                )
+                touched.add(txn.close_remainder_to)
+    elif txn.type == "axfer":
+        source = txn.revocation_target or sender
+        receiver = txn.receiver
+        if (source, txn.index) not in assets:
+            raise TransactionRejected(
+                f"txn {txid}: {source} is not opted in to asset {txn.index}"
+            )
+        if (receiver, txn.index) not in assets:
+            if receiver == sender and txn.amount == 0:
+                assets[(receiver, txn.index)] = 0  # opt-in
+            else:
+                raise TransactionRejected(
+                    f"txn {txid}: {receiver} is not opted in to asset {txn.index}"
+                )
+        if assets[(source, txn.index)] < txn.amount:
+            raise TransactionRejected(f"txn {txid}: asset {txn.index} underflow")
+        assets[(source, txn.index)] -= txn.amount
+        assets[(receiver, txn.index)] += txn.amount
+    else:
+        raise TransactionRejected(f"txn {txid}: unsupported type {txn.type}")
+
+    if balances[sender] < 0:
+        raise TransactionRejected(
+            f"TransactionPool.Remember: transaction {txid}: overspend "
+            f"(account {sender}, tried to spend {-balances[sender]} more than it has)"
+        )
+
+
+def _route_name(method: str, path: str) -> str:
+    path = path.split("?", 1)[0]
+    for prefix in (
+        "/v2/transactions/pending/",
+        "/v2/accounts/",
+        "/v2/status/wait-for-block-after/",
+    ):
+        if path.startswith(prefix):
+            return f"{method} {prefix}{{}}"
+    return f"{method} {path}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        algod = self.server.algod
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        with algod._lock:
+            algod.in_flight += 1
+            algod.max_in_flight = max(algod.max_in_flight, algod.in_flight)
+        try:
+            status, payload, extra = algod.handle(method, self.path, body, self.headers)
+        finally:
+            with algod._lock:
+                algod.in_flight -= 1
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
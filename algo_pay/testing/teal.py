@@ -0,0 +1,119 @@
+# algo_pay/testing/teal.py
+
+from algosdk import encoding
+
+# Opcodes of the stateless programs PyTeal emits for simple escrows
+OPCODES = {
+    "<": 0x0C,
+    ">": 0x0D,
+    "<=": 0x0E,
+    ">=": 0x0F,
+    "&&": 0x10,
+    "||": 0x11,
+    "==": 0x12,
+    "!=": 0x13,
+    "!": 0x14,
+    "return": 0x43,
+}
+TXN = 0x31
+PUSHBYTES = 0x80
+PUSHINT = 0x81
+
+# Scalar transaction fields readable with ``txn``
+TXN_FIELDS = {
+    name: index
+    for index, name in enumerate(
+        [
+            "Sender",
+            "Fee",
+            "FirstValid",
+            "FirstValidTime",
+            "LastValid",
+            "Note",
+            "Lease",
+            "Receiver",
+            "Amount",
+            "CloseRemainderTo",
+            "VotePK",
+            "SelectionPK",
+            "VoteFirst",
+            "VoteLast",
+            "VoteKeyDilution",
+            "Type",
+            "TypeEnum",
+            "XferAsset",
+            "AssetAmount",
+            "AssetSender",
+            "AssetReceiver",
+            "AssetCloseTo",
+            "GroupIndex",
+            "TxID",
+            "ApplicationID",
+            "OnCompletion",
+        ]
+    )
+}
+TXN_FIELDS["RekeyTo"] = 32
+
+# goal switches to pushint/pushbytes for single-use constants from v4 on
+MIN_VERSION = 4
+
+
+def varuint(value: int) -> bytes:
+    """TEAL's unsigned LEB128 encoding of an int constant."""
+    if value < 0:
+        raise ValueError(f"TEAL ints are unsigned, got {value}")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def assemble(teal: str) -> bytes:
+    """
+    Bytecode of ``teal``, as ``FakeAlgod`` serves it from ``/v2/teal/compile``.
+
+    A stand-in for algod's assembler covering only what simple signature
+    escrows use (``txn`` fields, ``addr``/``int`` constants, comparisons,
+    ``&&``/``||``/``!`` and ``return``). Every constant must appear once,
+    which is when goal emits it inline (``pushbytes``/``pushint``) rather
+    than through a constant block. Anything else raises ``ValueError``.
+    """
+    code = bytearray()
+    seen = set()
+    version = None
+    for number, raw in enumerate(teal.splitlines(), 1):
+        line = raw.split("//", 1)[0].strip()
+        if not line:
+            continue
+        op, *args = line.split()
+
+        if op == "#pragma":
+            if len(args) != 2 or args[0] != "version" or version is not None:
+                raise ValueError(f"line {number}: unexpected pragma {line!r}")
+            version = int(args[1])
+            if version < MIN_VERSION:
+                raise ValueError(f"TEAL version {version} < {MIN_VERSION}")
+            code.append(version)
+        elif version is None:
+            raise ValueError("Program must start with #pragma version")
+        elif op in OPCODES and not args:
+            code.append(OPCODES[op])
+        elif op == "txn" and len(args) == 1 and args[0] in TXN_FIELDS:
+            code += bytes([TXN, TXN_FIELDS[args[0]]])
+        elif op in ("addr", "int") and len(args) == 1:
+            if (op, args[0]) in seen:
+                raise ValueError(f"line {number}: {line!r} repeats a constant")
+            seen.add((op, args[0]))
+            if op == "addr":
+                code += bytes([PUSHBYTES, 32]) + encoding.decode_address(args[0])
+            else:
+                code += bytes([PUSHINT]) + varuint(int(args[0], 0))
+        else:
+            raise ValueError(f"line {number}: unsupported TEAL {line!r}")
+    return bytes(code)
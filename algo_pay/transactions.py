@@ -1,37 +1,75 @@
 # algo_pay/transactions.py
 
-from typing import List
+import base64
+from typing import List, Optional, Sequence, Union
 from algosdk.v2client import algod
 from algosdk import transaction
 
+from . import metrics
+from .clients import client_for_network, resolve_client
+from .params_cache import get_suggested_params
+from .paycalc import algos_to_microalgos
+
+# Helpers take an AlgodClient (e.g. a shared one from algo_pay.clients) or a
+# network name, which resolves to the process-wide pooled client
+ClientLike = Union[algod.AlgodClient, str]
+
+# Algorand caps atomic groups at 16 transactions
+MAX_GROUP_SIZE = 16
+
+
+# ----------------------
+# Clients
+# ----------------------
+def get_client(network: str, **pool_options) -> algod.AlgodClient:
+    """Shared keep-alive client for ``localnet``, ``testnet`` or ``mainnet``."""
+    return client_for_network(network, **pool_options)
+
 
 # ----------------------
 # Core Builders
 # ----------------------
 def build_payment_txn(
-    client: algod.AlgodClient, sender: str, receiver: str, amount: float, note: str = ""
+    client: ClientLike,
+    sender: str,
+    receiver: str,
+    amount: float,
+    note: str = "",
+    params: Optional[transaction.SuggestedParams] = None,
+    microalgos: bool = False,
+    lease: Optional[bytes] = None,
 ):
-    """Create a payment transaction (ALGOs)."""
-    params = client.suggested_params()
+    """
+    Create a payment transaction (ALGOs, or integer microAlgos with
+    ``microalgos=True``), optionally carrying a 32-byte ``lease``.
+    """
+    if params is None:
+        with metrics.stage("suggested_params"):
+            params = get_suggested_params(resolve_client(client))
     return transaction.PaymentTxn(
         sender=sender,
         sp=params,
         receiver=receiver,
-        amt=int(amount * 1e6),  # convert ALGO → microALGO
+        # convert ALGO → microALGO without float truncation
+        amt=int(amount) if microalgos else algos_to_microalgos(amount),
         note=note.encode() if note else None,
+        lease=lease,
     )
 
 
 def build_asset_transfer_txn(
-    client: algod.AlgodClient,
+    client: ClientLike,
     sender: str,
     receiver: str,
     asset_id: int,
     amount: int,
     note: str = "",
+    params: Optional[transaction.SuggestedParams] = None,
 ):
     """Create an ASA transfer transaction."""
-    params = client.suggested_params()
+    if params is None:
+        with metrics.stage("suggested_params"):
+            params = get_suggested_params(resolve_client(client))
     return transaction.AssetTransferTxn(
         sender=sender,
         sp=params,
@@ -49,6 +87,10 @@ def group_and_assign_id(
     txns: List[transaction.Transaction],
 ) -> List[transaction.Transaction]:
     """Group transactions atomically by assigning a group ID."""
+    if len(txns) > MAX_GROUP_SIZE:
+        raise ValueError(
+            f"Atomic groups are limited to {MAX_GROUP_SIZE} transactions, got {len(txns)}"
+        )
     gid = transaction.calculate_group_id(txns)
     for txn in txns:
         txn.group = gid
@@ -60,23 +102,54 @@ def group_and_assign_id(
 # ----------------------
 def sign_transaction(txn: transaction.Transaction, private_key: str):
     """Sign a transaction with a private key."""
-    return txn.sign(private_key)
+    with metrics.stage("sign"):
+        return txn.sign(private_key)
 
 
 # ----------------------
 # Broadcasting
 # ----------------------
-def broadcast_transaction(client: algod.AlgodClient, signed_txn):
+def broadcast_transaction(client: ClientLike, signed_txn):
     """Send a signed transaction and return txid."""
-    txid = client.send_transaction(signed_txn)
+    with metrics.stage("send"):
+        txid = resolve_client(client).send_transaction(signed_txn)
     return txid
 
 
+def broadcast_group(client: ClientLike, signed_txns: list) -> List[str]:
+    """Send a signed atomic group in a single request and return all txids."""
+    with metrics.stage("send", items=len(signed_txns)):
+        resolve_client(client).send_transactions(signed_txns)
+    return [stxn.get_txid() for stxn in signed_txns]
+
+
+def broadcast_raw(client: ClientLike, signed_blobs: Sequence[bytes]) -> str:
+    """
+    Send wire-encoded signed transactions (e.g. from ``signing.sign_batch``)
+    in a single request: one payment, or an atomic group in group order.
+    Returns the first txid.
+    """
+    with metrics.stage("send", items=len(signed_blobs)):
+        return resolve_client(client).send_raw_transaction(
+            base64.b64encode(b"".join(signed_blobs))
+        )
+
+
+def wait_for_confirmation(
+    client: ClientLike, txid: str, wait_rounds: int = 4, items: int = 1
+) -> dict:
+    """Block until ``txid`` (covering ``items`` transactions) is confirmed."""
+    with metrics.stage("confirm", items=items):
+        return transaction.wait_for_confirmation(
+            resolve_client(client), txid, wait_rounds
+        )
+
+
 # ----------------------
 # High-level helper
 # ----------------------
 def send_payment(
-    client: algod.AlgodClient,
+    client: ClientLike,
     sender: str,
     private_key: str,
     receiver: str,
@@ -84,6 +157,7 @@ def send_payment(
     note: str = "",
 ) -> str:
     """Convenience function: build, sign, and send a payment."""
+    client = resolve_client(client)
     txn = build_payment_txn(client, sender, receiver, amount, note)
     signed = sign_transaction(txn, private_key)
     txid = broadcast_transaction(client, signed)
@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Payroll throughput benchmarks against the in-process fake algod.
+
+    python -m benchmarks.run --profile quick --output before.json
+    python -m benchmarks.run --profile quick --baseline before.json
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+"""
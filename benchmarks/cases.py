@@ -0,0 +1,429 @@
+# benchmarks/cases.py
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+from unittest.mock import patch
+
+import pandas as pd
+from algosdk import account, mnemonic
+
+from algo_pay.archive import HistoryArchive, read_archive
+from algo_pay.audit import AuditLogWriter
+from algo_pay.journal import PayrollJournal, incomplete_payrolls
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll, log_transaction
+from algo_pay.scheduler import PayrollScheduler
+from algo_pay.testing import FakeAlgod, random_addresses
+from algo_pay.testing.fake_algod import MIN_BALANCE
+from contracts.compile_backends import AlgodBackend
+from contracts.generate_escrow import (
+    build_escrow,
+    build_escrow_template,
+    escrow_address,
+)
+from contracts.teal_template import TealTemplate
+
+from .harness import RecordingClient, peak_rss_mb, percentile_ms
+
+# Pay 1 hour at 0.001-0.01 ALGO/hr so even 100k employees fit in the budget
+RATES = [0.001 * (1 + i % 10) for i in range(10)]
+EMPLOYER_FUNDING = 10**15
+
+
+class Case(NamedTuple):
+    name: str
+    func: Callable[..., dict]
+    kwargs: dict
+
+
+class _Crash(BaseException):
+    """Stands in for the process dying mid-run."""
+
+
+def _payroll(
+    algod, workdir, department="Bench", roster_size=0, seed=0, journal_dir=None
+):
+    private_key, address = account.generate_account()
+    algod.fund(address, EMPLOYER_FUNDING)
+    client = RecordingClient(algod.token, algod.address)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department=department,
+        client=client,
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(os.path.join(workdir, f"{department}.csv")),
+        journal_dir=journal_dir,
+        quiet=True,
+    )
+    addresses = random_addresses(roster_size, seed=seed)
+    # Existing accounts, so small payments do not trip the minimum balance
+    for employee in addresses:
+        algod.fund(employee, MIN_BALANCE)
+    payroll.add_employees(
+        addresses, [RATES[i % len(RATES)] for i in range(roster_size)]
+    )
+    return payroll, client
+
+
+def _log_bytes(workdir: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(workdir, f))
+        for f in os.listdir(workdir)
+        if f.endswith(".csv")
+    )
+
+
+def _payment_metrics(payments, elapsed, latencies, algod, log_bytes) -> dict:
+    requests = sum(algod.requests.values())
+    return {
+        "payments": payments,
+        "seconds": round(elapsed, 4),
+        "payments_per_sec": round(payments / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": percentile_ms(latencies, 50),
+        "latency_p99_ms": percentile_ms(latencies, 99),
+        "algod_requests_per_payment": (
+            round(requests / payments, 3) if payments else None
+        ),
+        "peak_rss_mb": peak_rss_mb(),
+        "log_bytes": log_bytes,
+    }
+
+
+# ----------------------
+# Cases
+# ----------------------
+def bench_run_payroll(
+    roster_size: int, mode: str, latency: float = 0.0, round_time: float = 0.0
+) -> dict:
+    """
+    One ``run_payroll`` over ``roster_size`` employees in the given mode;
+    ``prepared`` times only ``broadcast_payroll`` of a run signed beforehand.
+    """
+    options = {
+        "sequential": {},
+        "batch": {"batch_size": 16},
+        "pipeline": {"pipeline_window": 64, "batch_size": 16},
+        "prepared": {"batch_size": 16},
+    }[mode]
+    with (
+        tempfile.TemporaryDirectory() as workdir,
+        FakeAlgod(latency=latency, round_time=round_time) as algod,
+    ):
+        with contextlib.redirect_stdout(io.StringIO()):
+            payroll, client = _payroll(algod, workdir, roster_size=roster_size)
+            if mode == "prepared":
+                bundle = os.path.join(workdir, "run.stxn")
+                payroll.prepare_payroll(1, bundle, **options)
+            client.latencies.clear()
+            algod.requests.clear()
+            start = time.perf_counter()
+            if mode == "prepared":
+                txids = payroll.broadcast_payroll(bundle, window=64)
+            else:
+                txids = payroll.run_payroll(1, **options)
+            elapsed = time.perf_counter() - start
+        return _payment_metrics(
+            len(txids), elapsed, client.latencies, algod, _log_bytes(workdir)
+        )
+
+
+def bench_scheduled_departments(
+    departments: int, roster_size: int, interval: float, duration: float
+) -> dict:
+    """Many departments paying on ``start_payroll_job`` for ``duration`` seconds."""
+    with tempfile.TemporaryDirectory() as workdir, FakeAlgod() as algod:
+        with contextlib.redirect_stdout(io.StringIO()):
+            payrolls = [
+                _payroll(algod, workdir, f"Dept{d}", roster_size, seed=d)
+                for d in range(departments)
+            ]
+            algod.requests.clear()
+            scheduler = PayrollScheduler(max_workers=8)
+            start = time.perf_counter()
+            for payroll, _ in payrolls:
+                payroll.start_payroll_job(interval, 1, "Bench", scheduler=scheduler)
+            jobs = scheduler.jobs
+            time.sleep(duration)
+            for payroll, _ in payrolls:
+                payroll.stop_payroll_job()
+            scheduler.shutdown()
+            elapsed = time.perf_counter() - start
+
+        latencies = [lat for _, client in payrolls for lat in client.latencies]
+        metrics = _payment_metrics(
+            len(latencies), elapsed, latencies, algod, _log_bytes(workdir)
+        )
+        metrics["runs"] = sum(job.runs for job in jobs)
+        metrics["skipped_ticks"] = sum(job.skipped for job in jobs)
+        return metrics
+
+
+def bench_log_transaction(rows: int) -> dict:
+    """Append ``rows`` audit rows through ``log_transaction``."""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "history.csv")
+        writer = AuditLogWriter(path)
+        addresses = random_addresses(min(rows, 1000))
+        start = time.perf_counter()
+        for i in range(rows):
+            log_transaction(
+                path,
+                "Bench",
+                "Job",
+                "Payroll_bench",
+                f"Employee {i}",
+                addresses[i % len(addresses)],
+                0.001,
+                "T" * 52,
+                addresses[0],
+                1000.0,
+                999.999,
+                "SUCCESS",
+                writer=writer,
+            )
+        writer.close()
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(rows / elapsed, 2),
+            "peak_rss_mb": peak_rss_mb(),
+            "log_bytes": os.path.getsize(path),
+        }
+
+
+def bench_history_archive(rows: int, departments: int = 5, days: int = 62) -> dict:
+    """
+    The same ledger as one CSV and as a ``HistoryArchive``: bytes on disk and
+    the time to pull one department's month out of each.
+    """
+    addresses = random_addresses(min(rows, 1000))
+    first_day = datetime(2026, 1, 1)
+    step = timedelta(days=days) / rows
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "history.csv")
+        csv_writer = AuditLogWriter(csv_path)
+        archive = HistoryArchive(os.path.join(workdir, "archive"))
+        for i in range(rows):
+            row = [
+                (first_day + step * i).isoformat(),
+                f"Dept{i % departments}",
+                "Weekly",
+                f"Payroll_{i // 1000}",
+                addresses[0],
+                f"Employee {i % 1000}",
+                addresses[i % len(addresses)],
+                0.001 * (1 + i % 10),
+                "T" * 52,
+                1000.0,
+                999.999,
+                "SUCCESS",
+            ]
+            csv_writer.write_row(row)
+            archive.write_row(row)
+            if i % 1000 == 999:
+                csv_writer.end_run()
+                archive.end_run()
+        csv_writer.close()
+        archive.close()
+
+        # Month-end report: one department, January
+        start = time.perf_counter()
+        frame = pd.read_csv(csv_path)
+        frame = frame[
+            (frame["department"] == "Dept0")
+            & (frame["timestamp"] >= "2026-01-01")
+            & (frame["timestamp"] < "2026-02-01")
+        ]
+        csv_scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = read_archive(
+            archive.directory, department="Dept0", start="2026-01-01", end="2026-02-01"
+        )
+        archive_scan = time.perf_counter() - start
+        assert len(report) == len(frame)
+
+        csv_bytes = os.path.getsize(csv_path)
+        archive_bytes = sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, files in os.walk(archive.directory)
+            for f in files
+        )
+    return {
+        "rows": rows,
+        "csv_bytes": csv_bytes,
+        "archive_bytes": archive_bytes,
+        "compression_ratio": round(csv_bytes / archive_bytes, 2),
+        "csv_scan_seconds": round(csv_scan, 4),
+        "archive_scan_seconds": round(archive_scan, 4),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_resume_payroll(roster_size: int) -> dict:
+    """Crash a journaled pipelined run halfway, then time ``resume_payroll``."""
+    real_record_results = PayrollJournal.record_results
+    recorded = []
+
+    def record_results(self, results):
+        results = list(results)
+        real_record_results(self, results)
+        recorded.extend(results)
+        if sum(len(r.txids) for _, r in recorded) >= roster_size // 2:
+            raise _Crash()
+
+    with tempfile.TemporaryDirectory() as workdir, FakeAlgod() as algod:
+        journal_dir = os.path.join(workdir, "journal")
+        with contextlib.redirect_stdout(io.StringIO()):
+            payroll, client = _payroll(
+                algod, workdir, roster_size=roster_size, journal_dir=journal_dir
+            )
+            with patch.object(PayrollJournal, "record_results", record_results):
+                try:
+                    payroll.run_payroll(1, pipeline_window=16, batch_size=16)
+                except _Crash:
+                    pass
+            (payroll_id,) = incomplete_payrolls(journal_dir)
+            algod.requests.clear()
+            start = time.perf_counter()
+            txids = payroll.resume_payroll(payroll_id)
+            elapsed = time.perf_counter() - start
+        return {
+            "payments": len(txids),
+            "settled_before_crash": sum(len(r.txids) for _, r in recorded),
+            "resume_seconds": round(elapsed, 4),
+            "algod_requests": sum(algod.requests.values()),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def bench_build_escrow(count: int) -> dict:
+    """Build ``count`` escrow programs with ``build_escrow``."""
+    addresses = random_addresses(count)
+    start = time.perf_counter()
+    for i, address in enumerate(addresses):
+        build_escrow(address, 1_000_000 + i)
+    elapsed = time.perf_counter() - start
+    return {
+        "escrows": count,
+        "seconds": round(elapsed, 4),
+        "escrows_per_sec": round(count / elapsed, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_escrow_template(count: int) -> dict:
+    """Derive ``count`` escrow addresses from the compiled-once template."""
+    addresses = random_addresses(count)
+    # Compiled by the fake algod, outside the timed loop
+    with FakeAlgod() as algod:
+        backend = AlgodBackend(algod.client())
+        template = TealTemplate(build_escrow_template(), backend)
+    start = time.perf_counter()
+    for i, address in enumerate(addresses):
+        escrow_address(address, 1_000_000 + i, template)
+    elapsed = time.perf_counter() - start
+    return {
+        "escrows": count,
+        "seconds": round(elapsed, 4),
+        "escrows_per_sec": round(count / elapsed, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ----------------------
+# Profiles
+# ----------------------
+PROFILES: Dict[str, dict] = {
+    # A couple of minutes at most; good for CI and before/after checks
+    "quick": {
+        "roster_sizes": [10, 100, 1000],
+        "sequential_max": 1000,
+        "departments": 20,
+        "log_rows": 50_000,
+        "archive_rows": 200_000,
+        "resume_sizes": [1000],
+        "escrows": 200,
+        "template_escrows": 10_000,
+    },
+    "full": {
+        "roster_sizes": [10, 100, 1000, 10_000, 100_000],
+        # Sequential runs confirm one payment per request round trip
+        "sequential_max": 10_000,
+        "departments": 500,
+        "log_rows": 1_000_000,
+        "archive_rows": 2_000_000,
+        "resume_sizes": [1000, 10_000],
+        "escrows": 5_000,
+        "template_escrows": 100_000,
+    },
+}
+
+
+def cases_for(profile: str) -> List[Case]:
+    settings = PROFILES[profile]
+    cases = []
+    for mode in ("sequential", "batch", "pipeline", "prepared"):
+        for size in settings["roster_sizes"]:
+            if mode == "sequential" and size > settings["sequential_max"]:
+                continue
+            cases.append(
+                Case(
+                    f"run_payroll[{mode},n={size}]",
+                    bench_run_payroll,
+                    {"roster_size": size, "mode": mode},
+                )
+            )
+    cases.append(
+        Case(
+            f"start_payroll_job[departments={settings['departments']}]",
+            bench_scheduled_departments,
+            {
+                "departments": settings["departments"],
+                "roster_size": 10,
+                "interval": 0.5,
+                "duration": 3.0,
+            },
+        )
+    )
+    cases.append(
+        Case(
+            f"log_transaction[rows={settings['log_rows']}]",
+            bench_log_transaction,
+            {"rows": settings["log_rows"]},
+        )
+    )
+    cases.append(
+        Case(
+            f"history_archive[rows={settings['archive_rows']}]",
+            bench_history_archive,
+            {"rows": settings["archive_rows"]},
+        )
+    )
+    for size in settings["resume_sizes"]:
+        cases.append(
+            Case(
+                f"resume_payroll[n={size}]", bench_resume_payroll, {"roster_size": size}
+            )
+        )
+    cases.append(
+        Case(
+            f"build_escrow[n={settings['escrows']}]",
+            bench_build_escrow,
+            {"count": settings["escrows"]},
+        )
+    )
+    cases.append(
+        Case(
+            f"escrow_template[n={settings['template_escrows']}]",
+            bench_escrow_template,
+            {"count": settings["template_escrows"]},
+        )
+    )
+    return cases
@@ -0,0 +1,104 @@
+# benchmarks/compare.py
+
+import argparse
+import json
+import sys
+from typing import List, NamedTuple, Optional
+
+# Which way is better for each metric; anything else is informational
+HIGHER_IS_BETTER = (
+    "payments_per_sec",
+    "rows_per_sec",
+    "escrows_per_sec",
+    "compression_ratio",
+)
+LOWER_IS_BETTER = (
+    "latency_p50_ms",
+    "latency_p99_ms",
+    "algod_requests_per_payment",
+    "peak_rss_mb",
+    "log_bytes",
+    "archive_bytes",
+    "archive_scan_seconds",
+    "resume_seconds",
+)
+
+
+class Regression(NamedTuple):
+    case: str
+    metric: str
+    baseline: float
+    current: float
+    change: float  # signed fraction, negative = worse
+
+    def __str__(self) -> str:
+        return (
+            f"{self.case} {self.metric}: {self.baseline} -> {self.current} "
+            f"({self.change:+.1%})"
+        )
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _change(metric: str, baseline: float, current: float) -> Optional[float]:
+    """Signed relative change where negative always means worse."""
+    if baseline in (None, 0) or current is None:
+        return None
+    delta = (current - baseline) / baseline
+    return delta if metric in HIGHER_IS_BETTER else -delta
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> List[Regression]:
+    """Metrics in ``current`` more than ``threshold`` worse than ``baseline``."""
+    before = {r["name"]: r["metrics"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            if metric not in old or metric not in result["metrics"]:
+                continue
+            change = _change(metric, old[metric], result["metrics"][metric])
+            if change is not None and change < -threshold:
+                regressions.append(
+                    Regression(
+                        result["name"],
+                        metric,
+                        old[metric],
+                        result["metrics"][metric],
+                        change,
+                    )
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark result files and fail on regressions."
+    )
+    parser.add_argument("baseline", help="Results JSON to compare against")
+    parser.add_argument("current", help="Results JSON of the new run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Allowed slowdown as a fraction (default 0.10 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    regressions = compare(
+        load_results(args.baseline), load_results(args.current), args.threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/harness.py
+
+import base64
+import io
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import msgpack
+import numpy as np
+
+# Make the repo importable when run as ``python -m benchmarks.run``
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.clients import PooledAlgodClient  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+class RecordingClient(PooledAlgodClient):
+    """
+    Pooled client that timestamps every submission and the moment its
+    confirmation is first observed, giving per-payment latency however the
+    caller waits (``wait_for_confirmation`` or the pipeline's bulk checks).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+        self._submitted: Dict[str, tuple] = {}
+        self._record_lock = threading.Lock()
+
+    def send_raw_transaction(self, txn, **kwargs):
+        # Every submission path (send_transaction(s), raw batches) ends here
+        started = time.perf_counter()
+        txid = super().send_raw_transaction(txn, **kwargs)
+        size = sum(1 for _ in msgpack.Unpacker(io.BytesIO(base64.b64decode(txn))))
+        with self._record_lock:
+            self._submitted[txid] = (started, size)
+        return txid
+
+    def pending_transaction_info(self, transaction_id, **kwargs):
+        info = super().pending_transaction_info(transaction_id, **kwargs)
+        if info.get("confirmed-round"):
+            now = time.perf_counter()
+            with self._record_lock:
+                sent = self._submitted.pop(transaction_id, None)
+            if sent is not None:
+                started, size = sent
+                self.latencies.extend([now - started] * size)
+        return info
+
+
+def percentile_ms(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def environment() -> dict:
+    """Where and on what code a set of results was produced."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
@@ -0,0 +1,96 @@
+# benchmarks/run.py
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+from .cases import PROFILES, cases_for
+from .compare import compare, load_results
+from .harness import environment
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def run_cases(cases, isolate: bool = True) -> list:
+    """
+    Run each case and collect its metrics.
+
+    With ``isolate`` every case runs in a fresh spawned process so peak RSS
+    and warm caches from one case do not leak into the next.
+    """
+    results = []
+    pool = None
+    if isolate:
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(processes=1, maxtasksperchild=1)
+    try:
+        for case in cases:
+            print(f"[bench] {case.name} ...", flush=True)
+            if pool is not None:
+                metrics = pool.apply(case.func, kwds=case.kwargs)
+            else:
+                metrics = case.func(**case.kwargs)
+            print(f"[bench]   {metrics}", flush=True)
+            results.append(
+                {"name": case.name, "params": case.kwargs, "metrics": metrics}
+            )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Algopay benchmark suite.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument(
+        "--only", default=None, help="Only run cases whose name contains this"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Results JSON path (default: benchmarks/results/)",
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="Results JSON to compare against"
+    )
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run every case in this process (faster, but RSS is cumulative)",
+    )
+    args = parser.parse_args(argv)
+
+    cases = [c for c in cases_for(args.profile) if not args.only or args.only in c.name]
+    report = {
+        "environment": environment(),
+        "profile": args.profile,
+        "results": run_cases(cases, isolate=not args.in_process),
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = report["environment"]["timestamp"][:19].replace(":", "")
+        commit = report["environment"]["commit"] or "nocommit"
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{commit}_{args.profile}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results saved to {output}")
+
+    if args.baseline:
+        regressions = compare(load_results(args.baseline), report, args.threshold)
+        for regression in regressions:
+            print(f"[bench] REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"[bench] No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import base64
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from algosdk import logic
+from algosdk.v2client import algod
+
+from algo_pay.clients import resolve_client
+
+DEFAULT_CONTAINER = "algokit_sandbox_algod"
+DEFAULT_CACHE_DIR = os.path.join("contracts", ".compile_cache")
+
+
+class CompileResult(NamedTuple):
+    """Escrow address of a TEAL program, plus its bytecode when the backend has it."""
+
+    address: str
+    program: Optional[bytes] = None
+
+
+def source_hash(teal: str) -> str:
+    """Content address of a TEAL source."""
+    return hashlib.sha256(teal.encode("utf-8")).hexdigest()
+
+
+# ----------------------
+# Backends
+# ----------------------
+class CompileBackend:
+    """Turns TEAL sources into ``CompileResult``s, one per source, in order."""
+
+    def compile_many(self, sources: Sequence[str]) -> List[CompileResult]:
+        raise NotImplementedError
+
+
+class DockerBackend(CompileBackend):
+    """
+    ``goal clerk compile`` inside a LocalNet container, batched.
+
+    Every source is staged in one local directory, copied into the
+    container with a single ``docker cp``, and compiled with a single
+    ``docker exec`` per ``batch_size`` files. goal only prints addresses, so
+    results carry no bytecode unless ``programs=True``, which has goal write
+    each program out and prints it base64-encoded instead.
+    """
+
+    def __init__(
+        self,
+        container: str = DEFAULT_CONTAINER,
+        workdir: str = "/root/algopay_escrows",
+        batch_size: int = 500,
+        programs: bool = False,
+    ):
+        self.container = container
+        self.workdir = workdir.rstrip("/")
+        self.batch_size = batch_size
+        self.programs = programs
+
+    def compile_many(self, sources: Sequence[str]) -> List[CompileResult]:
+        if not sources:
+            return []
+        names = [f"{source_hash(teal)}.teal" for teal in sources]
+        with tempfile.TemporaryDirectory() as staging:
+            for name, teal in zip(names, sources):
+                with open(os.path.join(staging, name), "w") as f:
+                    f.write(teal)
+            subprocess.run(
+                [
+                    "docker",
+                    "cp",
+                    os.path.join(staging, "."),
+                    f"{self.container}:{self.workdir}",
+                ],
+                check=True,
+            )
+
+        paths = [f"{self.workdir}/{name}" for name in dict.fromkeys(names)]
+        outputs: Dict[str, str] = {}
+        for start in range(0, len(paths), self.batch_size):
+            result = subprocess.run(
+                self._compile_command(paths[start : start + self.batch_size]),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            # One "<path>: <escrow_address or base64 program>" line per file
+            for line in result.stdout.splitlines():
+                path, sep, output = line.rpartition(":")
+                if sep:
+                    outputs[path.strip()] = output.strip()
+
+        missing = [p for p in paths if p not in outputs]
+        if missing:
+            raise RuntimeError(f"goal printed no address for {', '.join(missing)}")
+        results = []
+        for name in names:
+            output = outputs[f"{self.workdir}/{name}"]
+            if self.programs:
+                program = base64.b64decode(output)
+                results.append(CompileResult(logic.address(program), program))
+            else:
+                results.append(CompileResult(output))
+        return results
+
+    def _compile_command(self, paths: List[str]) -> List[str]:
+        if not self.programs:
+            return [
+                "docker",
+                "exec",
+                self.container,
+                "goal",
+                "clerk",
+                "compile",
+            ] + paths
+        script = (
+            'for f; do goal clerk compile -o "$f.tok" "$f" >/dev/null || exit 1; '
+            'echo "$f: $(base64 -w0 "$f.tok")"; done'
+        )
+        return ["docker", "exec", self.container, "sh", "-c", script, "sh"] + paths
+
+
+class AlgodBackend(CompileBackend):
+    """
+    algod's ``/v2/teal/compile`` endpoint, up to ``max_workers`` requests at a
+    time. The node must run with ``EnableDeveloperAPI``.
+    """
+
+    def __init__(
+        self, client: Union[algod.AlgodClient, str] = "localnet", max_workers: int = 8
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.client = resolve_client(client)
+        self.max_workers = max_workers
+
+    def compile_many(self, sources: Sequence[str]) -> List[CompileResult]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self._compile, sources))
+
+    def _compile(self, teal: str) -> CompileResult:
+        response = self.client.compile(teal)
+        return CompileResult(response["hash"], base64.b64decode(response["result"]))
+
+
+BACKENDS = {"docker": DockerBackend, "algod": AlgodBackend}
+
+
+# ----------------------
+# Cache
+# ----------------------
+class CompileCache:
+    """
+    On-disk results keyed by ``source_hash``; one small JSON file per
+    program under ``directory/<first two hex digits>/``.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def get(self, teal: str) -> Optional[CompileResult]:
+        try:
+            with open(self._path(source_hash(teal))) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        program = entry.get("program")
+        return CompileResult(
+            entry["address"], base64.b64decode(program) if program else None
+        )
+
+    def put(self, teal: str, result: CompileResult) -> None:
+        path = self._path(source_hash(teal))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "address": result.address,
+            "program": (
+                base64.b64encode(result.program).decode() if result.program else None
+            ),
+        }
+        # Write-then-rename so a crash never leaves a truncated entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+
+def compile_teal(
+    sources: Sequence[str],
+    backend: CompileBackend,
+    cache: Optional[CompileCache] = None,
+) -> List[CompileResult]:
+    """
+    Compile ``sources`` in order. Identical sources are compiled once, and
+    with a ``cache`` only sources it has never seen reach the backend.
+    """
+    results: Dict[str, CompileResult] = {}
+    misses = []
+    for teal in dict.fromkeys(sources):
+        cached = cache.get(teal) if cache is not None else None
+        if cached is not None:
+            results[teal] = cached
+        else:
+            misses.append(teal)
+
+    for teal, result in zip(misses, backend.compile_many(misses) if misses else []):
+        results[teal] = result
+        if cache is not None:
+            cache.put(teal, result)
+    return [results[teal] for teal in sources]
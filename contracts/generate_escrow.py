@@ -1,9 +1,36 @@
 import argparse
+import base64
+import contextlib
+import csv
+import functools
+import os
 import pandas as pd
-import subprocess
-from pyteal import And, Txn, Addr, Int, compileTeal, Mode
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
+from algosdk import logic
+from pyteal import And, Txn, Addr, Int, Tmpl, compileTeal, Mode
+
+# Runnable as ``python contracts/generate_escrow.py`` as well as a module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from contracts.compile_backends import (  # noqa: E402
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CONTAINER,
+    AlgodBackend,
+    CompileBackend,
+    CompileCache,
+    DockerBackend,
+    compile_teal,
+)
+from contracts.teal_template import TealTemplate  # noqa: E402
 
 CONTRACTS_DIR = "contracts"
+TEMPLATE_FILE = "escrow_template.teal"
+
+INPUT_COLUMNS = ("employee_address", "fixed_payout_microalgos")
+OUTPUT_COLUMNS = ("employee_address", "payout_microalgos", "escrow_address")
+TEMPLATE_OUTPUT_COLUMNS = OUTPUT_COLUMNS + ("escrow_program_b64",)
 
 
 def build_escrow(employee_addr: str, payout: int) -> str:
@@ -15,70 +42,308 @@ def build_escrow(employee_addr: str, payout: int) -> str:
     return compileTeal(program, mode=Mode.Signature, version=6)
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Generate escrow contracts from a CSV file."
+def build_escrow_template() -> str:
+    """The escrow program with ``TMPL_RECEIVER`` / ``TMPL_PAYOUT`` placeholders."""
+    program = And(
+        Txn.receiver() == Tmpl.Addr("TMPL_RECEIVER"),
+        Txn.amount() == Tmpl.Int("TMPL_PAYOUT"),
     )
-    parser.add_argument("csv_file", help="Path to the employee CSV file")
-    args = parser.parse_args()
-
-    df = pd.read_csv(args.csv_file)
-
-    results = []
+    return compileTeal(program, mode=Mode.Signature, version=6)
 
-    for _, row in df.iterrows():
-        employee = row["employee_address"]
-        payout = int(row["fixed_payout_microalgos"])
 
-        teal_code = build_escrow(employee, payout)
+@functools.lru_cache(maxsize=None)
+def get_escrow_template(
+    backend: Optional[CompileBackend] = None, cache: Optional[CompileCache] = None
+) -> TealTemplate:
+    """
+    The escrow template, compiled once per process by ``backend`` (goal in
+    the LocalNet container by default). Results land in ``cache`` (the
+    default compile cache unless given), so later runs need no compiler.
+    """
+    return TealTemplate(
+        build_escrow_template(),
+        backend or DockerBackend(programs=True),
+        cache or CompileCache(),
+    )
 
-        teal_file = f"{CONTRACTS_DIR}/escrow_{employee[:6]}.teal"
-        with open(teal_file, "w") as f:
-            f.write(teal_code)
 
-        print(f"Generated {teal_file}")
+def escrow_program(
+    employee_addr: str, payout: int, template: Optional[TealTemplate] = None
+) -> bytes:
+    """Compiled escrow bytes for one employee, patched from the template."""
+    return (template or get_escrow_template()).program(
+        TMPL_RECEIVER=employee_addr, TMPL_PAYOUT=payout
+    )
 
-        # Copy into container
-        container_path = f"/root/escrow_{employee[:6]}.teal"
-        subprocess.run(
-            ["docker", "cp", teal_file, f"algokit_sandbox_algod:{container_path}"],
-            check=True,
-        )
 
-        # Compile inside container
-        result = subprocess.run(
-            [
-                "docker",
-                "exec",
-                "algokit_sandbox_algod",
-                "goal",
-                "clerk",
-                "compile",
-                container_path,
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+def escrow_address(
+    employee_addr: str, payout: int, template: Optional[TealTemplate] = None
+) -> str:
+    """Escrow address for one employee, computed locally from the program hash."""
+    return (template or get_escrow_template()).address(
+        TMPL_RECEIVER=employee_addr, TMPL_PAYOUT=payout
+    )
 
-        # Output format: /root/escrow_3M4B53.teal: <escrow_address>
-        compiled_output = result.stdout.strip()
-        escrow_address = compiled_output.split(":")[-1].strip()
 
+def generate_from_template(
+    df: pd.DataFrame, template: Optional[TealTemplate] = None
+) -> pd.DataFrame:
+    """Escrow address and program for every row, patched from the template."""
+    template = template or get_escrow_template()
+    results = []
+    for employee, payout in zip(
+        df["employee_address"], df["fixed_payout_microalgos"].astype("int64")
+    ):
+        program = template.program(TMPL_RECEIVER=employee, TMPL_PAYOUT=int(payout))
         results.append(
             {
                 "employee_address": employee,
-                "payout_microalgos": payout,
-                "escrow_address": escrow_address,
+                "payout_microalgos": int(payout),
+                "escrow_address": logic.address(program),
+                "escrow_program_b64": base64.b64encode(program).decode(),
             }
         )
+    return pd.DataFrame(results)
+
+
+# ----------------------
+# Streaming pipeline
+# ----------------------
+def iter_employee_chunks(csv_file: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """The input CSV ``chunksize`` rows at a time, payouts as int64."""
+    for chunk in pd.read_csv(
+        csv_file,
+        usecols=list(INPUT_COLUMNS),
+        dtype={"employee_address": str, "fixed_payout_microalgos": "int64"},
+        chunksize=chunksize,
+    ):
+        yield chunk
+
+
+def completed_employees(out_csv: str) -> Set[Tuple[str, int]]:
+    """
+    ``(employee_address, payout)`` pairs already in ``out_csv``.
+
+    A row cut short by a crash (no trailing newline) is dropped from the
+    file first, so that employee is generated again.
+    """
+    if not os.path.exists(out_csv):
+        return set()
+    _drop_partial_row(out_csv)
+    if os.path.getsize(out_csv) == 0:
+        return set()
+
+    done = set()
+    for chunk in pd.read_csv(
+        out_csv,
+        usecols=["employee_address", "payout_microalgos"],
+        dtype={"employee_address": str, "payout_microalgos": "int64"},
+        chunksize=100_000,
+    ):
+        done.update(zip(chunk["employee_address"], chunk["payout_microalgos"].tolist()))
+    return done
+
+
+def _existing_header(out_csv: str) -> Optional[List[str]]:
+    # None for a missing or empty file, which gets a fresh header
+    if not os.path.exists(out_csv) or os.path.getsize(out_csv) == 0:
+        return None
+    with open(out_csv, newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def _drop_partial_row(path: str, block: int = 64 * 1024) -> None:
+    # Truncate after the last newline, reading backwards a block at a time
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline != -1:
+                if start + newline + 1 != end:
+                    f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
 
-        print(f"Compiled escrow for {employee[:10]}... → {escrow_address}")
+def generate_escrows(
+    csv_file: str,
+    out_csv: str,
+    backend: Optional[CompileBackend] = None,
+    cache: Optional[CompileCache] = None,
+    chunksize: int = 10_000,
+    processes: Optional[int] = None,
+    template: bool = False,
+) -> int:
+    """
+    Stream ``csv_file`` into ``out_csv`` one chunk at a time and return the
+    number of escrows written.
+
+    Each chunk's TEAL is generated on ``processes`` worker processes
+    (in-process when 1), written to ``contracts/``, compiled with
+    ``backend`` and appended to ``out_csv`` before the next chunk is read,
+    so memory is bounded by the chunk (plus the keys of finished employees)
+    and a crash loses at most one chunk. Employees already in ``out_csv``
+    are skipped, which makes re-running resume; an existing ``out_csv``
+    written in the other mode raises ``ValueError`` rather than mixing
+    three- and four-column rows.
+
+    With ``template=True`` only the escrow template goes through
+    ``backend`` (and ``cache``); each program is patched from it instead
+    (no TEAL files) and ``out_csv`` gains the program bytes.
+    """
+    columns = TEMPLATE_OUTPUT_COLUMNS if template else OUTPUT_COLUMNS
+    done = completed_employees(out_csv)
+    header = _existing_header(out_csv)
+    if header is not None and header != list(columns):
+        raise ValueError(
+            f"{out_csv} has columns {', '.join(header)}; this run writes "
+            f"{', '.join(columns)}. Re-run with the same --template setting "
+            "or write to a new file"
+        )
+    processes = processes or os.cpu_count() or 1
+    escrow_template = get_escrow_template(backend, cache) if template else None
+    written = 0
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if not template and processes > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=processes))
+        out = stack.enter_context(open(out_csv, "a", newline=""))
+        writer = csv.writer(out)
+        if out.tell() == 0:
+            writer.writerow(columns)
+
+        for number, chunk in enumerate(iter_employee_chunks(csv_file, chunksize), 1):
+            rows = [
+                (employee, payout)
+                for employee, payout in zip(
+                    chunk["employee_address"],
+                    chunk["fixed_payout_microalgos"].tolist(),
+                )
+                if (employee, payout) not in done
+            ]
+            skipped = len(chunk) - len(rows)
+            if rows:
+                writer.writerows(
+                    _template_rows(rows, escrow_template)
+                    if template
+                    else _compiled_rows(
+                        rows, backend or DockerBackend(), cache, pool, processes
+                    )
+                )
+                # Durable before moving on, so a resume never redoes this chunk
+                out.flush()
+                os.fsync(out.fileno())
+                done.update(rows)
+                written += len(rows)
+            print(
+                f"Chunk {number}: {len(rows)} escrows written"
+                + (f", {skipped} already done" if skipped else "")
+            )
+    return written
+
+
+def _template_rows(rows: List[Tuple[str, int]], template: TealTemplate) -> List[tuple]:
+    df = pd.DataFrame(rows, columns=list(INPUT_COLUMNS))
+    return list(generate_from_template(df, template).itertuples(index=False, name=None))
+
+
+def _compiled_rows(rows, backend, cache, pool, processes) -> List[tuple]:
+    employees = [employee for employee, _ in rows]
+    payouts = [payout for _, payout in rows]
+    if pool is None:
+        teal_sources = list(map(build_escrow, employees, payouts))
+    else:
+        teal_sources = list(
+            pool.map(
+                build_escrow,
+                employees,
+                payouts,
+                chunksize=max(1, len(rows) // (4 * processes)),
+            )
+        )
+
+    for employee, teal_code in zip(employees, teal_sources):
+        with open(f"{CONTRACTS_DIR}/escrow_{employee[:6]}.teal", "w") as f:
+            f.write(teal_code)
+
+    # Unchanged programs come straight from the cache; the rest are compiled
+    # in one batch by the backend
+    compiled = compile_teal(teal_sources, backend, cache)
+    return [
+        (employee, payout, result.address)
+        for (employee, payout), result in zip(rows, compiled)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate escrow contracts from a CSV file."
+    )
+    parser.add_argument("csv_file", help="Path to the employee CSV file")
+    parser.add_argument(
+        "--template",
+        action="store_true",
+        help="Compile the template once and patch each employee's program "
+        "locally (the compiler is only needed while the template is uncached)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["docker", "algod"],
+        default="docker",
+        help="Compiler: goal in the LocalNet container (default) or algod's "
+        "/v2/teal/compile",
+    )
+    parser.add_argument("--container", default=DEFAULT_CONTAINER)
+    parser.add_argument(
+        "--network", default="localnet", help="algod network for --backend algod"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent algod compile requests"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Compiled results keyed by TEAL source hash",
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--chunksize", type=int, default=10_000, help="Employees read per chunk"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Worker processes generating TEAL (default: one per CPU)",
+    )
+    args = parser.parse_args()
 
-    # Save results to a new CSV
     out_csv = args.csv_file.replace(".csv", "_compiled.csv")
-    pd.DataFrame(results).to_csv(out_csv, index=False)
-    print(f"\nCompiled escrow addresses saved to {out_csv}")
+
+    if args.template:
+        teal_file = f"{CONTRACTS_DIR}/{TEMPLATE_FILE}"
+        with open(teal_file, "w") as f:
+            f.write(build_escrow_template())
+        print(f"Generated {teal_file}")
+    if args.backend == "algod":
+        backend = AlgodBackend(args.network, max_workers=args.workers)
+    else:
+        # The template is patched, so goal has to hand back its bytecode
+        backend = DockerBackend(args.container, programs=args.template)
+
+    written = generate_escrows(
+        args.csv_file,
+        out_csv,
+        backend,
+        cache=None if args.no_cache else CompileCache(args.cache_dir),
+        chunksize=args.chunksize,
+        processes=args.processes,
+        template=args.template,
+    )
+    print(f"\nCompiled {written} escrow addresses saved to {out_csv}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from algosdk import encoding, logic
+
+from contracts.compile_backends import CompileBackend, CompileCache, compile_teal
+
+TEMPLATE_VARIABLE = re.compile(r"\bTMPL_\w+")
+# Sizes of the two sets of stand-in ints: 10- and 6-byte varuints
+SENTINEL_BITS = (64, 41)
+
+
+def _varuint(value: int) -> bytes:
+    if not 0 <= value < 2**64:
+        raise ValueError(f"TEAL ints are unsigned 64-bit, got {value}")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+class TealTemplate:
+    """
+    A TEAL program compiled once, with ``TMPL_*`` constants patched in per
+    instance.
+
+    ``backend`` compiles the template with a distinctive stand-in for every
+    ``addr TMPL_X`` / ``int TMPL_Y``, and wherever a stand-in's bytes appear
+    in the output becomes a slot filled by ``program(TMPL_X=..., TMPL_Y=...)``.
+    Everything else is the compiler's own bytecode, so each instance costs
+    a byte join and its escrow address a SHA-512/256.
+
+    A second compile, with stand-ins of another size, must come out exactly
+    as patching the first predicts or ``ValueError`` is raised: programs
+    whose bytecode depends on the values in other ways have to be compiled
+    one by one. The backend must return bytecode; with a ``cache`` only the
+    first use of a template reaches it.
+    """
+
+    def __init__(
+        self,
+        teal: str,
+        backend: CompileBackend,
+        cache: Optional[CompileCache] = None,
+    ):
+        self.teal = teal
+        self.variables = _template_variables(teal)
+        first, second = (_sentinels(self.variables, bits) for bits in SENTINEL_BITS)
+        compiled = compile_teal(
+            [_substitute(teal, first), _substitute(teal, second)], backend, cache
+        )
+        if any(result.program is None for result in compiled):
+            raise ValueError(f"{type(backend).__name__} returned no bytecode to patch")
+        self._segments = self._split(compiled[0].program, first)
+        if self.program(**second) != compiled[1].program:
+            raise ValueError(
+                "The compiled template does not patch cleanly; "
+                "compile each program instead"
+            )
+
+    def program(self, **values: Union[str, int]) -> bytes:
+        """Program bytes with every template variable set."""
+        missing = set(self.variables) - set(values)
+        if missing:
+            raise ValueError(f"Missing template values: {', '.join(sorted(missing))}")
+        parts = []
+        for segment in self._segments:
+            if isinstance(segment, bytes):
+                parts.append(segment)
+            else:
+                parts.append(self._encode(segment, values[segment]))
+        return b"".join(parts)
+
+    def address(self, **values: Union[str, int]) -> str:
+        """Escrow (logic signature) address of ``program(**values)``."""
+        return logic.address(self.program(**values))
+
+    # ----------------------
+    # Slots
+    # ----------------------
+    def _encode(self, name: str, value: Union[str, int]) -> bytes:
+        if self.variables[name] == "addr":
+            return encoding.decode_address(value)
+        return _varuint(int(value))
+
+    def _split(
+        self, program: bytes, sentinels: Dict[str, Union[str, int]]
+    ) -> List[Union[bytes, str]]:
+        slots: List[Tuple[int, int, str]] = []
+        for name, value in sentinels.items():
+            needle = self._encode(name, value)
+            start = program.find(needle)
+            if start == -1:
+                raise ValueError(f"{name} does not appear in the compiled template")
+            while start != -1:
+                slots.append((start, len(needle), name))
+                start = program.find(needle, start + len(needle))
+
+        segments: List[Union[bytes, str]] = []
+        position = 0
+        for start, length, name in sorted(slots):
+            if start < position:
+                raise ValueError("Template constants overlap in the compiled program")
+            segments += [program[position:start], name]
+            position = start + length
+        segments.append(program[position:])
+        return segments
+
+
+def _template_variables(teal: str) -> Dict[str, str]:
+    # Only constants loaded with addr (32 raw bytes) or int (a varuint)
+    variables: Dict[str, str] = {}
+    for number, raw in enumerate(teal.splitlines(), 1):
+        line = raw.split("//", 1)[0].strip()
+        names = TEMPLATE_VARIABLE.findall(line)
+        if not names:
+            continue
+        op, *args = line.split()
+        if op not in ("addr", "int") or args != names[:1] or len(names) != 1:
+            raise ValueError(f"line {number}: cannot patch {line!r}")
+        if variables.setdefault(names[0], op) != op:
+            raise ValueError(f"line {number}: {names[0]} used as addr and int")
+    return variables
+
+
+def _sentinels(variables: Dict[str, str], bits: int) -> Dict[str, Union[str, int]]:
+    values: Dict[str, Union[str, int]] = {}
+    for name, kind in variables.items():
+        digest = hashlib.sha512(f"{name}/{bits}".encode()).digest()
+        if kind == "addr":
+            values[name] = encoding.encode_address(digest[:32])
+        else:
+            # Top bit set, so the varuint is always the same length
+            low = int.from_bytes(digest[:8], "big") % (1 << (bits - 1))
+            values[name] = (1 << (bits - 1)) | low
+    return values
+
+
+def _substitute(teal: str, values: Dict[str, Union[str, int]]) -> str:
+    return TEMPLATE_VARIABLE.sub(lambda match: str(values[match.group(0)]), teal)
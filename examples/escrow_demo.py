@@ -11,7 +11,6 @@ from __future__ import annotations
 
 import argparse
 import sys
-import subprocess
 from pathlib import Path
 from typing import List, Dict
 
@@ -23,6 +22,12 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 # Import from our contracts package
+from contracts.compile_backends import (  # noqa: E402
+    DEFAULT_CACHE_DIR,
+    CompileCache,
+    DockerBackend,
+    compile_teal,
+)
 from contracts.generate_escrow import build_escrow, CONTRACTS_DIR  # noqa: E402
 
 
@@ -78,31 +83,20 @@ def _write_teal(teal_code: str, out_dir: Path, employee_addr: str) -> Path:
     return teal_path
 
 
-def _compile_in_container(teal_path: Path, container: str) -> str:
+def _compile_in_container(
+    teal_sources: List[str], container: str, cache_dir: Path
+) -> List[str]:
     """
-    Copy TEAL into the Algokit LocalNet container and compile with `goal`.
-    Returns the escrow address string from `goal clerk compile`.
+    Compile every TEAL program with `goal` in the Algokit LocalNet container:
+    one `docker cp` and one `docker exec` for the whole batch, skipping any
+    program already in the on-disk cache. Returns escrow addresses in order.
     """
-    container_dest = f"/root/{teal_path.name}"
-
-    # docker cp
-    subprocess.run(
-        ["docker", "cp", str(teal_path), f"{container}:{container_dest}"],
-        check=True,
-    )
-
-    # docker exec goal clerk compile
-    result = subprocess.run(
-        ["docker", "exec", container, "goal", "clerk", "compile", container_dest],
-        capture_output=True,
-        text=True,
-        check=True,
+    results = compile_teal(
+        teal_sources, DockerBackend(container), CompileCache(str(cache_dir))
     )
-    # Output looks like: "/root/escrow_ABCDEF.teal: <ESCROW_ADDR>"
-    compiled_output = result.stdout.strip()
-    escrow_addr = compiled_output.split(":")[-1].strip()
-    print(f"  • Compiled → {escrow_addr}")
-    return escrow_addr
+    for result in results:
+        print(f"  • Compiled → {result.address}")
+    return [result.address for result in results]
 
 
 def main():
@@ -139,6 +133,7 @@ def main():
     out_dir = _ensure_contracts_dir()
 
     compiled_rows: List[Dict[str, str | int]] = []
+    teal_sources: List[str] = []
 
     print("\nGenerating TEAL...")
     for row in rows:
@@ -151,23 +146,28 @@ def main():
         )
 
         teal_path = _write_teal(teal_code, out_dir, employee)
-
-        escrow_addr = ""
-        if not args.no_compile:
-            try:
-                escrow_addr = _compile_in_container(teal_path, args.container)
-            except Exception as e:
-                print(f"  ! Compile skipped/failed: {e}")
+        teal_sources.append(teal_code)
 
         compiled_rows.append(
             {
                 "employee_address": employee,
                 "payout_microalgos": payout,
                 "teal_file": str(teal_path.relative_to(ROOT)),
-                "escrow_address": escrow_addr or "(not compiled)",
+                "escrow_address": "(not compiled)",
             }
         )
 
+    if not args.no_compile:
+        print("\nCompiling...")
+        try:
+            addresses = _compile_in_container(
+                teal_sources, args.container, ROOT / DEFAULT_CACHE_DIR
+            )
+            for compiled, escrow_addr in zip(compiled_rows, addresses):
+                compiled["escrow_address"] = escrow_addr
+        except Exception as e:
+            print(f"  ! Compile skipped/failed: {e}")
+
     # If we had an input CSV, drop a compiled CSV next to it; otherwise write to example dir
     if csv_path:
         out_csv = csv_path.with_name(csv_path.stem + "_compiled.csv")
@@ -0,0 +1,163 @@
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.archive import HistoryArchive, partition_dir, read_archive
+from algo_pay.audit import AUDIT_HEADER
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def row(ts, dept, payroll, employee, txid, job="Weekly", amount=1.5):
+    return [
+        ts,
+        dept,
+        job,
+        payroll,
+        "EMPLOYER",
+        employee.lower(),
+        employee,
+        amount,
+        txid,
+        100.0,
+        100.0 - amount,
+        "SUCCESS",
+    ]
+
+
+ROWS = [
+    row("2026-01-01T09:00:00", "Eng", "P1", "ALICE", "TX1"),
+    row("2026-01-01T09:00:01", "Ops/EU", "P2", "BOB", "TX2"),
+    row("2026-01-02T09:00:00", "Eng", "P3", "ALICE", "TX3"),
+    row("2026-02-01T09:00:00", "Eng", "P4", "CAROL", "TX4", job="Bonus"),
+]
+
+
+def parts(directory):
+    return sorted(
+        os.path.relpath(os.path.join(root, f), directory)
+        for root, _, files in os.walk(directory)
+        for f in files
+        if f.endswith(".parquet")
+    )
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = HistoryArchive(str(tmp_path / "archive"))
+    for r in ROWS:
+        archive.write_row(r)
+    archive.close()
+    return archive
+
+
+# ----------------------
+# Rotation and compaction
+# ----------------------
+def test_close_compacts_into_department_date_partitions(archive):
+    assert [os.path.dirname(p) for p in parts(archive.directory)] == [
+        os.path.join("department=Eng", "date=2026-01-01"),
+        os.path.join("department=Eng", "date=2026-01-02"),
+        os.path.join("department=Eng", "date=2026-02-01"),
+        os.path.join("department=Ops%2FEU", "date=2026-01-01"),
+    ]
+    assert os.listdir(os.path.join(archive.directory, "segments")) == []
+    table = pq.read_table(
+        os.path.join(partition_dir(archive.directory, "Eng", "2026-01-01"))
+    )
+    assert table.column_names == AUDIT_HEADER
+    assert table.column("txid").to_pylist() == ["TX1"]
+
+
+def test_rotates_by_size_without_splitting_runs(tmp_path):
+    archive = HistoryArchive(str(tmp_path / "archive"), max_bytes=1)
+    for run in range(3):
+        archive.write_row(row("2026-01-01T00:00:00", "Eng", f"P{run}", "A", "TX"))
+        archive.write_row(row("2026-01-01T00:00:01", "Eng", f"P{run}", "B", "TX"))
+        archive.end_run()
+
+    # Each flush after the first found the segment full and compacted it
+    assert len(parts(archive.directory)) == 2
+    assert len(os.listdir(os.path.join(archive.directory, "segments"))) == 1
+    for part in parts(archive.directory):
+        table = pq.read_table(os.path.join(archive.directory, part))
+        assert len(set(table.column("payroll_id").to_pylist())) == 1
+    archive.close()
+    assert len(read_archive(archive.directory)) == 6
+
+
+@patch("algo_pay.archive.datetime")
+def test_rotates_when_the_day_changes(mock_datetime, tmp_path):
+    mock_datetime.now.return_value = datetime(2026, 1, 1, 23, 59, tzinfo=timezone.utc)
+    archive = HistoryArchive(str(tmp_path / "archive"))
+    archive.write_row(ROWS[0])
+    archive.end_run()
+    assert parts(archive.directory) == []
+
+    mock_datetime.now.return_value = datetime(2026, 1, 2, 0, 1, tzinfo=timezone.utc)
+    archive.write_row(ROWS[2])
+    archive.end_run()
+    assert len(parts(archive.directory)) == 1
+    archive.close()
+
+
+def test_leftover_segment_is_compacted_on_open(tmp_path):
+    directory = str(tmp_path / "archive")
+    os.makedirs(os.path.join(directory, "segments"))
+    with open(os.path.join(directory, "segments", "20260101T000000.csv"), "w") as f:
+        f.write(",".join(AUDIT_HEADER) + "\r\n")
+        f.write(",".join(map(str, ROWS[0])) + "\r\n")
+        f.write("2026-01-01T09:00:05,Eng,Wee")  # torn by a crash
+
+    archive = HistoryArchive(directory)
+    assert archive.by_txid("TX1")["amount_ALGO"] == 1.5
+    assert len(read_archive(directory)) == 1
+    archive.close()
+
+
+# ----------------------
+# Reading
+# ----------------------
+def test_reader_opens_only_matching_partitions(archive):
+    with patch.object(pq, "read_table", wraps=pq.read_table) as read_table:
+        frame = read_archive(
+            archive.directory, department="Eng", start="2026-01-02", end="2026-02-01"
+        )
+    assert frame["txid"].tolist() == ["TX3"]
+    (path,), _ = read_table.call_args
+    assert read_table.call_count == 1
+    assert os.path.dirname(path) == partition_dir(
+        archive.directory, "Eng", "2026-01-02"
+    )
+
+
+def test_reader_filters_and_columns(archive):
+    frame = read_archive(archive.directory, job_id="Bonus", columns=["txid"])
+    assert frame.to_dict("records") == [{"txid": "TX4"}]
+    assert read_archive(archive.directory, department="Ops/EU")["txid"].tolist() == [
+        "TX2"
+    ]
+    assert read_archive(archive.directory, department="HR").empty
+    with pytest.raises(TypeError):
+        read_archive(archive.directory, salary="1")
+
+
+def test_queries_include_the_open_segment(tmp_path):
+    with HistoryArchive(str(tmp_path / "archive")) as archive:
+        for r in ROWS:
+            archive.write_row(r)
+        # Not flushed or compacted yet: read from the segment
+        assert [r["txid"] for r in archive.by_employee("ALICE")] == ["TX1", "TX3"]
+        assert [r["txid"] for r in archive.between("2026-01-01", "2026-01-02")] == [
+            "TX1",
+            "TX2",
+        ]
+        archive.rotate()
+        assert [r["txid"] for r in archive.query(limit=2)] == ["TX1", "TX2"]
+        assert archive.by_payroll_id("P4")[0]["job_id"] == "Bonus"
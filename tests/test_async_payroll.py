@@ -0,0 +1,118 @@
+import asyncio
+import csv
+import os
+import sys
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from algosdk import account, error, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.async_payroll import AsyncAlgodClient, AsyncPayroll
+from algo_pay.audit import AuditLogWriter
+from algo_pay.testing import FakeAlgod
+from algo_pay.testing.fake_algod import MIN_BALANCE
+
+WAIT_FOR_BLOCK = "GET /v2/status/wait-for-block-after/{}"
+
+
+# ----------------------
+# AsyncPayroll
+# ----------------------
+def test_async_run_payroll_against_fake_algod(tmp_path):
+    history = tmp_path / "history.csv"
+    employer_key, employer = account.generate_account()
+    employees = [account.generate_account()[1] for _ in range(20)]
+
+    with FakeAlgod(round_time=0.05) as algod:
+        algod.fund(employer, 100_000_000)
+        for addr in employees:
+            algod.fund(addr, MIN_BALANCE)
+        # Never funded: 0.01 ALGO cannot open it, so algod rejects the payment
+        unfunded = account.generate_account()[1]
+
+        async def scenario():
+            payroll = AsyncPayroll(
+                mnemonic.from_private_key(employer_key),
+                department="AsyncDept",
+                algod_address=algod.address,
+                algod_token=algod.token,
+                max_concurrency=2,
+                audit_writer=AuditLogWriter(str(history)),
+                quiet=True,
+            )
+            for addr in employees[:2]:
+                payroll.add_employee(addr, 1.0)
+            payroll.add_employee(unfunded, 0.01)
+            for addr in employees[2:]:
+                payroll.add_employee(addr, 1.0)
+            try:
+                return await payroll.run_payroll(1, job_id="AsyncJob")
+            finally:
+                await payroll.close()
+
+        txids = asyncio.run(scenario())
+        employer_balance = algod.balance(employer)
+        # Two capped requests, plus at most the one shared block long-poll
+        assert algod.max_in_flight <= 3
+        # Confirmed in bulk: one block wait per round, not one per payment
+        assert algod.requests[WAIT_FOR_BLOCK] <= 3
+
+    assert len(txids) == 20
+    with open(history, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["employee_address"] for r in rows] == (
+        employees[:2] + [unfunded] + employees[2:]
+    )
+    assert [r["status"] for r in rows].count("FAILED") == 1
+    assert rows[2]["status"] == "FAILED"
+    assert float(rows[-1]["employer_balance_after"]) == employer_balance / 1e6
+
+
+def test_async_send_payment_unconfirmed_in_time_is_pending():
+    employer_key, employer = account.generate_account()
+    employee = account.generate_account()[1]
+
+    with FakeAlgod() as algod:
+        algod.fund(employer, 10_000_000)
+        algod.fund(employee, MIN_BALANCE)
+        # The payment lands, but every confirmation lookup misses it
+        algod.fail_next(20, status=404, path="/v2/transactions/pending/")
+
+        async def scenario():
+            payroll = AsyncPayroll(
+                mnemonic.from_private_key(employer_key),
+                department="AsyncDept",
+                algod_address=algod.address,
+                algod_token=algod.token,
+            )
+            try:
+                return await payroll.send_payment(employee, 1.0)
+            finally:
+                await payroll.close()
+
+        txid, before, after, status = asyncio.run(scenario())
+        assert status == "PENDING"
+        assert txid in algod.confirmed
+        assert before == after == 10.0
+
+
+def test_async_client_raises_algod_errors_for_plain_text_bodies():
+    async def too_many(request):
+        return web.Response(status=429, text="Too Many Requests\n")
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/v2/status", too_many)
+        async with TestServer(app) as server:
+            async with AsyncAlgodClient("", str(server.make_url(""))) as client:
+                with pytest.raises(error.AlgodHTTPError) as raised:
+                    await client.status()
+        return raised.value
+
+    err = asyncio.run(scenario())
+    assert err.code == 429
+    assert str(err) == "Too Many Requests"
@@ -0,0 +1,92 @@
+import csv
+import os
+import sys
+import threading
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.audit import AUDIT_HEADER, AuditLogWriter, get_audit_writer
+from algo_pay.payroll import log_transaction
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+# ----------------------
+# Flush policies
+# ----------------------
+def test_run_policy_buffers_until_end_run(tmp_path):
+    path = tmp_path / "history.csv"
+    writer = AuditLogWriter(str(path), flush="run")
+
+    writer.write_row(["a"] * 12)
+    writer.write_row(["b"] * 12)
+    assert not path.exists()
+
+    writer.end_run()
+    rows = read_rows(path)
+    assert rows[0] == AUDIT_HEADER
+    assert len(rows) == 3
+    writer.close()
+
+
+def test_row_count_policy_and_single_header(tmp_path):
+    path = tmp_path / "history.csv"
+    writer = AuditLogWriter(str(path), flush=2)
+
+    for i in range(3):
+        writer.write_row([str(i)] * 12)
+    assert len(read_rows(path)) == 3  # header + 2 flushed rows
+    writer.close()
+
+    # Reopening an existing log appends without a second header
+    writer = AuditLogWriter(str(path), flush="row")
+    writer.write_row(["x"] * 12)
+    rows = read_rows(path)
+    assert rows.count(AUDIT_HEADER) == 1
+    assert len(rows) == 5
+    writer.close()
+
+
+def test_standalone_log_transaction_is_on_disk(tmp_path):
+    path = str(tmp_path / "history.csv")
+    log_transaction(
+        path, "Eng", "Job", "Payroll", "Emp", "ADDR", 1.0, "TX1",
+        "EMPLOYER", 10.0, 9.0, "SUCCESS",
+    )  # fmt: skip
+
+    # No end_run: the row must already be on disk
+    rows = read_rows(path)
+    assert rows[0] == AUDIT_HEADER
+    assert rows[1][8] == "TX1"
+    get_audit_writer(path).close()
+
+
+# ----------------------
+# Sharing
+# ----------------------
+def test_shared_writer_is_thread_safe(tmp_path):
+    path = str(tmp_path / "history.csv")
+    assert get_audit_writer(path) is get_audit_writer(path)
+
+    def department(name):
+        for i in range(200):
+            log_transaction(
+                path, name, "Job", "Payroll", "Emp", "ADDR", 1.0, f"TX{i}",
+                "EMPLOYER", 10.0, 9.0, "SUCCESS",
+            )  # fmt: skip
+
+    threads = [threading.Thread(target=department, args=(f"D{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    get_audit_writer(path).end_run()
+
+    rows = read_rows(path)
+    assert rows[0] == AUDIT_HEADER
+    assert len(rows) == 801
+    assert all(len(r) == len(AUDIT_HEADER) for r in rows)
@@ -0,0 +1,53 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.balance import BalanceTracker
+
+
+# ----------------------
+# ALGO balances
+# ----------------------
+def test_tracker_reads_chain_once_and_walks_forward():
+    client = MagicMock()
+    client.account_info.return_value = {"amount": 10_000_000}
+    tracker = BalanceTracker(client, "EMPLOYER")
+
+    assert tracker.balance == 10.0
+    assert tracker.debit(2_000_000, 1000) == 7.999
+    assert tracker.debit(1_000_000, 1000) == 6.998
+    assert client.account_info.call_count == 1
+
+
+def test_tracker_reconcile_reports_drift():
+    client = MagicMock()
+    client.account_info.return_value = {"amount": 10_000_000}
+    tracker = BalanceTracker(client, "EMPLOYER")
+    tracker.refresh()
+    tracker.debit(2_000_000, 1000)
+
+    # Someone topped up the employer account mid-run
+    client.account_info.return_value = {"amount": 12_999_000}
+    assert tracker.reconcile() == 5.0
+    assert tracker.balance == 12.999
+
+    assert tracker.reconcile() == 0
+
+
+# ----------------------
+# ASA balances
+# ----------------------
+def test_tracker_asset_balance_ignores_fees():
+    client = MagicMock()
+    client.account_info.return_value = {
+        "amount": 5_000_000,
+        "assets": [{"asset-id": 1234, "amount": 500}],
+    }
+    tracker = BalanceTracker(client, "EMPLOYER", asset_id=1234)
+
+    assert tracker.balance == 500
+    assert tracker.debit(120, fee=1000) == 380
+    assert tracker.reconcile() == 120
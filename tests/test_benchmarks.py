@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks import compare, run
+from benchmarks.cases import bench_run_payroll
+
+
+def results(**metrics):
+    return {"results": [{"name": "run_payroll[batch,n=10]", "metrics": metrics}]}
+
+
+# ----------------------
+# Regression detection
+# ----------------------
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = results(payments_per_sec=1000, latency_p99_ms=10.0, log_bytes=100)
+    current = results(payments_per_sec=850, latency_p99_ms=10.5, log_bytes=80)
+
+    regressions = compare.compare(baseline, current, threshold=0.10)
+
+    assert [(r.metric, round(r.change, 2)) for r in regressions] == [
+        ("payments_per_sec", -0.15)
+    ]
+
+
+def test_compare_cli_exit_code(tmp_path, capsys):
+    before, after = tmp_path / "before.json", tmp_path / "after.json"
+    before.write_text(json.dumps(results(latency_p50_ms=1.0)))
+    after.write_text(json.dumps(results(latency_p50_ms=2.0)))
+
+    assert compare.main([str(before), str(after)]) == 1
+    assert (
+        "REGRESSION run_payroll[batch,n=10] latency_p50_ms" in capsys.readouterr().out
+    )
+    assert compare.main([str(before), str(before)]) == 0
+
+
+# ----------------------
+# Cases
+# ----------------------
+def test_run_payroll_case_reports_metrics():
+    metrics = bench_run_payroll(roster_size=20, mode="pipeline")
+
+    assert metrics["payments"] == 20
+    assert metrics["payments_per_sec"] > 0
+    assert metrics["latency_p50_ms"] <= metrics["latency_p99_ms"]
+    # 20 payments in two groups: far fewer requests than payments
+    assert metrics["algod_requests_per_payment"] < 1
+    assert metrics["log_bytes"] > 0
+
+
+def test_runner_writes_json_and_checks_baseline(tmp_path):
+    output = tmp_path / "results.json"
+    argv = ["--only", "build_escrow", "--in-process", "--output", str(output)]
+
+    assert run.main(argv) == 0
+    report = json.loads(output.read_text())
+    assert report["profile"] == "quick"
+    assert report["results"][0]["metrics"]["escrows"] == 200
+    assert run.main(argv + ["--baseline", str(output), "--threshold", "10"]) == 0
@@ -0,0 +1,280 @@
+import base64
+import csv
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from algosdk import account, encoding, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay import bundle as bundle_module
+from algo_pay.audit import AuditLogWriter, get_audit_writer
+from algo_pay.bundle import (
+    MAX_VALIDITY_ROUNDS,
+    BundleNotValid,
+    read_bundle,
+    validity_window,
+)
+from algo_pay.journal import payment_lease
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.scheduler import PayrollScheduler
+from algo_pay.testing import FakeAlgod
+from algo_pay.testing.fake_algod import MIN_BALANCE
+
+
+def make_payroll(algod, tmp_path, employees=3):
+    private_key, address = account.generate_account()
+    algod.fund(address, 100_000_000)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department="Eng",
+        client=algod.client(),
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(str(tmp_path / "history.csv")),
+        quiet=True,
+    )
+    for _ in range(employees):
+        employee = account.generate_account()[1]
+        algod.fund(employee, MIN_BALANCE)
+        payroll.add_employee(employee, 1.0)
+    return payroll
+
+
+def ledger_rows(tmp_path):
+    with open(tmp_path / "history.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+# ----------------------
+# Validity window
+# ----------------------
+def test_window_covers_the_scheduled_round():
+    assert validity_window(500) == (500, 500 + MAX_VALIDITY_ROUNDS)
+    in_an_hour = datetime.now(timezone.utc) + timedelta(hours=1)
+    first, last = validity_window(500, in_an_hour, round_seconds=3.0)
+    # Predicted round 1700, with most of the slack for a slower chain
+    assert first < 1700 < last
+    assert 1700 - first < last - 1700
+    assert last - first == MAX_VALIDITY_ROUNDS
+
+
+# ----------------------
+# Prepare and broadcast
+# ----------------------
+def test_prepare_signs_without_sending(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=5)
+        prepared = payroll.prepare_payroll(1, path, job_id="Weekly", batch_size=2)
+        assert algod.confirmed == {}
+
+    bundle = read_bundle(path)
+    assert bundle == prepared
+    assert [len(unit.txids) for unit in bundle.units] == [2, 2, 1]
+    assert [row.txid for row in bundle.rows] == [
+        txid for unit in bundle.units for txid in unit.txids
+    ]
+    assert [row.employee_address for row in bundle.rows] == list(
+        payroll.employees.addresses
+    )
+    assert {row.amount for row in bundle.rows} == {1_000_000}
+    assert bundle.job_id == "Weekly"
+    assert not os.path.exists(tmp_path / "history.csv")
+
+
+def test_broadcast_pays_and_logs_without_signing(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=4)
+        bundle = payroll.prepare_payroll(1, path, job_id="Weekly", batch_size=2)
+
+        algod.requests.clear()
+        with patch("algo_pay.payroll.BatchSigner") as signer:
+            txids = payroll.broadcast_payroll(path, window=8)
+        signer.assert_not_called()
+        assert "GET /v2/transactions/params" not in algod.requests
+        assert all(
+            algod.balance(e) == MIN_BALANCE + 1_000_000
+            for e in payroll.employees.addresses
+        )
+
+    assert txids == [row.txid for row in bundle.rows]
+    rows = ledger_rows(tmp_path)
+    assert [r["txid"] for r in rows] == txids
+    assert {r["payroll_id"] for r in rows} == {bundle.payroll_id}
+    assert {r["job_id"] for r in rows} == {"Weekly"}
+    # Balances walk forward by amount plus fee
+    before, after = float(rows[0]["employer_balance_before"]), float(
+        rows[0]["employer_balance_after"]
+    )
+    assert round(before - after, 6) == 1.001
+
+
+def test_rebroadcast_does_not_pay_twice(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        payroll.prepare_payroll(1, path)
+        first = payroll.broadcast_payroll(path)
+        second = payroll.broadcast_payroll(path)
+        assert second == first
+        assert all(
+            algod.balance(e) == MIN_BALANCE + 1_000_000
+            for e in payroll.employees.addresses
+        )
+
+
+def test_payments_carry_their_lease(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=1)
+        bundle = payroll.prepare_payroll(1, path)
+    (row,) = bundle.rows
+    stxn = encoding.msgpack_decode(base64.b64encode(bundle.units[0].data).decode())
+    assert stxn.transaction.lease == payment_lease(
+        bundle.payroll_id, row.employee_address
+    )
+
+
+def test_bundle_outside_its_window_is_not_sent(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        later = datetime.now(timezone.utc) + timedelta(hours=2)
+        payroll.prepare_payroll(1, path, run_at=later)
+        with pytest.raises(BundleNotValid, match="valid for rounds"):
+            payroll.broadcast_payroll(path)
+
+        payroll.prepare_payroll(1, path)
+        algod.advance(MAX_VALIDITY_ROUNDS + 1)
+        with pytest.raises(BundleNotValid):
+            payroll.broadcast_payroll(path)
+        assert algod.confirmed == {}
+
+
+def test_bundle_from_another_employer_is_refused(tmp_path):
+    path = str(tmp_path / "run.stxn")
+    with FakeAlgod() as algod:
+        make_payroll(algod, tmp_path, employees=1).prepare_payroll(1, path)
+        with pytest.raises(ValueError, match="signed by"):
+            make_payroll(algod, tmp_path, employees=0).broadcast_payroll(path)
+
+
+# ----------------------
+# Isolated broadcaster
+# ----------------------
+def test_cli_broadcasts_without_the_key(tmp_path, capsys):
+    path = str(tmp_path / "run.stxn")
+    history = str(tmp_path / "broadcast.csv")
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=3)
+        bundle = payroll.prepare_payroll(1, path, job_id="Weekly")
+        code = bundle_module.main(
+            [
+                path,
+                "--algod-address",
+                algod.address,
+                "--algod-token",
+                algod.token,
+                "--history-file",
+                history,
+            ]
+        )
+        get_audit_writer(history).close()
+
+    assert code == 0
+    assert "3 paid, 0 failed" in capsys.readouterr().out
+    with open(history, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["txid"] for r in rows] == [row.txid for row in bundle.rows]
+    assert {r["status"] for r in rows} == {"SUCCESS"}
+
+
+# ----------------------
+# Scheduled jobs
+# ----------------------
+def test_scheduled_job_broadcasts_the_prepared_run(tmp_path):
+    prepare_dir = tmp_path / "prepared"
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        with (
+            patch.object(
+                Payroll,
+                "broadcast_payroll",
+                autospec=True,
+                side_effect=Payroll.broadcast_payroll,
+            ) as broadcast,
+            PayrollScheduler() as scheduler,
+        ):
+            payroll.start_payroll_job(
+                0.2, 1, "Tick", scheduler=scheduler, prepare_dir=str(prepare_dir)
+            )
+            wait_for(lambda: broadcast.call_count >= 1)
+            payroll.stop_payroll_job()
+
+        # The first tick paid directly and prepared the second
+        assert os.listdir(prepare_dir) == []
+        assert all(
+            algod.balance(e) >= MIN_BALANCE + 2_000_000
+            for e in payroll.employees.addresses
+        )
+    assert len({r["payroll_id"] for r in ledger_rows(tmp_path)}) >= 2
+
+
+def test_stopping_while_a_run_prepares_leaves_no_bundle(tmp_path):
+    prepare_dir = tmp_path / "prepared"
+    preparing, release = threading.Event(), threading.Event()
+    prepare = Payroll.prepare_payroll
+
+    def slow_prepare(payroll, *args, **kwargs):
+        prepare(payroll, *args, **kwargs)
+        preparing.set()
+        release.wait(10)
+
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        with (
+            patch.object(
+                Payroll, "prepare_payroll", autospec=True, side_effect=slow_prepare
+            ),
+            PayrollScheduler() as scheduler,
+        ):
+            payroll.start_payroll_job(
+                60, 1, "Tick", scheduler=scheduler, prepare_dir=str(prepare_dir)
+            )
+            assert preparing.wait(10)
+            # Stop gives up waiting for the run, which then finishes preparing
+            payroll.stop_payroll_job()
+            assert os.listdir(prepare_dir)
+            release.set()
+            wait_for(lambda: not os.listdir(prepare_dir))
+
+
+def test_failed_broadcast_moves_the_bundle_aside(tmp_path, capsys):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        path = tmp_path / "prepared" / "next.stxn"
+        path.parent.mkdir()
+        payroll.prepare_payroll(1, str(path))
+        algod.fail_next(status=500, path="/v2/status")
+
+        with pytest.raises(Exception):
+            payroll._run_prepared(str(path), 1, "Tick", "Weekly")
+
+    assert os.listdir(path.parent) == ["failed"]
+    assert os.listdir(path.parent / "failed") == ["next.stxn"]
+    assert "bundle moved to" in capsys.readouterr().out
@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from algosdk import error
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay import clients, transactions
+from algo_pay.clients import PooledAlgodClient, get_algod_client
+from algo_pay.payroll import Payroll
+
+
+class FakeAlgodHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.path == "/v2/status":
+            self.reply(200, {"last-round": 7})
+        elif self.path.startswith("/v2/accounts/"):
+            self.reply(404, {"message": "account not found"})
+        else:
+            self.reply(500, None, raw=b"boom")
+
+    def reply(self, code, payload, raw=None):
+        body = raw if raw is not None else json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop_after_reply:
+            # Close without announcing it, like an idle keep-alive timeout
+            self.close_connection = True
+
+
+@pytest.fixture
+def algod_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAlgodHandler)
+    server.connections = 0
+    server.paths = []
+    server.drop_after_reply = False
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    clients.close_algod_clients()
+    yield
+    clients.close_algod_clients()
+
+
+# ----------------------
+# Keep-alive pool
+# ----------------------
+def test_requests_reuse_one_connection(algod_server):
+    server, address = algod_server
+    client = PooledAlgodClient("token", address)
+
+    for _ in range(20):
+        assert client.status() == {"last-round": 7}
+
+    assert server.connections == 1
+    assert client.pool.connections_opened == 1
+
+
+def test_concurrent_requests_are_bounded_by_pool_size(algod_server):
+    server, address = algod_server
+    client = PooledAlgodClient("token", address, pool_size=3)
+
+    threads = [
+        threading.Thread(target=lambda: [client.status() for _ in range(10)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(server.paths) == 80
+    assert client.pool.connections_opened <= 3
+
+
+def test_stale_connection_is_retried(algod_server):
+    server, address = algod_server
+    server.drop_after_reply = True
+    client = PooledAlgodClient("token", address)
+
+    assert client.status() == {"last-round": 7}
+    assert client.status() == {"last-round": 7}
+    assert client.pool.connections_opened == 2
+
+
+def test_http_errors_match_sdk_client(algod_server):
+    server, address = algod_server
+    client = PooledAlgodClient("token", address)
+
+    with pytest.raises(error.AlgodHTTPError) as excinfo:
+        client.account_info("NOPE")
+    assert excinfo.value.code == 404
+    assert str(excinfo.value) == "account not found"
+
+    with pytest.raises(error.AlgodHTTPError) as excinfo:
+        client.algod_request("GET", "/ledger/supply")
+    assert excinfo.value.code == 500
+    # The connection is still usable after error responses
+    assert client.status() == {"last-round": 7}
+    assert client.pool.connections_opened == 1
+
+
+# ----------------------
+# Registry
+# ----------------------
+def test_registry_shares_clients_per_endpoint_and_token(algod_server):
+    _, address = algod_server
+    a = get_algod_client(address, "t1", pool_size=2)
+    assert get_algod_client(address + "/", "t1") is a
+    assert get_algod_client(address, "t2") is not a
+    assert a.pool.pool_size == 2
+
+
+@patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
+@patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
+def test_payrolls_share_the_network_client(mock_to_private, mock_addr_from_pk):
+    a = Payroll("dummy", department="A", network="testnet")
+    b = Payroll("dummy", department="B", network="testnet")
+    assert a.client is b.client
+    assert isinstance(a.client, PooledAlgodClient)
+
+    own = PooledAlgodClient("", "http://127.0.0.1:1")
+    assert Payroll("dummy", department="C", client=own).client is own
+
+
+def test_transaction_helpers_accept_network_names(algod_server):
+    _, address = algod_server
+    with patch.dict(clients.NETWORKS, {"fake": (address, "token")}):
+        with patch.object(PooledAlgodClient, "send_transaction", return_value="TX1"):
+            assert transactions.broadcast_transaction("fake", object()) == "TX1"
+        assert clients.client_for_network("fake") is get_algod_client(address, "token")
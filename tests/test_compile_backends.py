@@ -0,0 +1,163 @@
+import base64
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from algosdk import logic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from contracts.compile_backends import (
+    AlgodBackend,
+    CompileBackend,
+    CompileCache,
+    CompileResult,
+    DockerBackend,
+    compile_teal,
+    source_hash,
+)
+from contracts.generate_escrow import build_escrow
+
+ADDR = "66MDNQQLL2A3LXHSEZWJ7PZGIWRP3NBNBPO62K3BCSP2VMFNQABCJFQQHQ"
+
+
+class CountingBackend(CompileBackend):
+    def __init__(self):
+        self.calls = []
+
+    def compile_many(self, sources):
+        self.calls.append(list(sources))
+        return [CompileResult(f"ADDR{len(s)}", s.encode()) for s in sources]
+
+
+# ----------------------
+# Cache
+# ----------------------
+def test_cache_skips_unchanged_sources(tmp_path):
+    backend = CountingBackend()
+    cache = CompileCache(str(tmp_path))
+    first = [build_escrow(ADDR, 1000), build_escrow(ADDR, 2000)]
+
+    compile_teal(first, backend, cache)
+    results = compile_teal(first + [build_escrow(ADDR, 3000)], backend, cache)
+
+    assert backend.calls == [first, [build_escrow(ADDR, 3000)]]
+    assert results[0] == CompileResult(f"ADDR{len(first[0])}", first[0].encode())
+    digest = source_hash(first[0])
+    assert os.path.exists(tmp_path / digest[:2] / f"{digest}.json")
+
+
+def test_duplicate_sources_compile_once_and_keep_order():
+    backend = CountingBackend()
+    teal = build_escrow(ADDR, 1000)
+
+    results = compile_teal([teal, "other", teal], backend)
+
+    assert backend.calls == [[teal, "other"]]
+    assert results[0] == results[2]
+    assert results[1].address == "ADDR5"
+
+
+def test_cache_entries_without_bytecode(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    cache.put("src", CompileResult("ADDR"))
+    assert cache.get("src") == CompileResult("ADDR", None)
+    assert cache.get("unknown") is None
+
+
+def test_corrupt_cache_entry_is_a_miss(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    cache.put("src", CompileResult("ADDR"))
+    digest = source_hash("src")
+    (tmp_path / digest[:2] / f"{digest}.json").write_text("{trunc")
+    assert cache.get("src") is None
+
+
+# ----------------------
+# Backends
+# ----------------------
+@patch("contracts.compile_backends.subprocess.run")
+def test_docker_backend_copies_once_and_compiles_in_one_exec(mock_run):
+    def fake_run(cmd, **kwargs):
+        result = MagicMock()
+        if "compile" in cmd:
+            files = cmd[cmd.index("compile") + 1 :]
+            result.stdout = "".join(f"{f}: ESCROW_{f[-10:-5]}\n" for f in files)
+        return result
+
+    mock_run.side_effect = fake_run
+    sources = [build_escrow(ADDR, payout) for payout in (1, 2, 3)]
+
+    results = DockerBackend("sandbox", workdir="/root/x").compile_many(sources)
+
+    cp, exec_ = [c.args[0] for c in mock_run.call_args_list]
+    assert cp[:2] == ["docker", "cp"] and cp[-1] == "sandbox:/root/x"
+    assert exec_[:6] == ["docker", "exec", "sandbox", "goal", "clerk", "compile"]
+    assert len(exec_) == 6 + 3
+    assert [r.address for r in results] == [
+        f"ESCROW_{source_hash(s)[-5:]}" for s in sources
+    ]
+
+
+@patch("contracts.compile_backends.subprocess.run")
+def test_docker_backend_can_return_bytecode(mock_run):
+    def fake_run(cmd, **kwargs):
+        result = MagicMock()
+        if "exec" in cmd:
+            files = cmd[cmd.index("sh", 4) + 1 :]
+            result.stdout = "".join(
+                f"{f}: {base64.b64encode(f.encode()).decode()}\n" for f in files
+            )
+        return result
+
+    mock_run.side_effect = fake_run
+    sources = [build_escrow(ADDR, payout) for payout in (1, 2)]
+
+    results = DockerBackend("sandbox", workdir="/root/x", programs=True).compile_many(
+        sources
+    )
+
+    exec_ = mock_run.call_args_list[1].args[0]
+    assert exec_[:5] == ["docker", "exec", "sandbox", "sh", "-c"]
+    assert "goal clerk compile -o" in exec_[5]
+    program = f"/root/x/{source_hash(sources[1])}.teal".encode()
+    assert results[1] == CompileResult(logic.address(program), program)
+
+
+@patch("contracts.compile_backends.subprocess.run")
+def test_docker_backend_reports_files_goal_skipped(mock_run):
+    mock_run.return_value = MagicMock(stdout="")
+    with pytest.raises(RuntimeError, match="no address"):
+        DockerBackend().compile_many([build_escrow(ADDR, 1)])
+
+
+def test_algod_backend_bounds_concurrency():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def compile_(teal):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return {
+            "hash": f"ADDR{teal.split()[-1]}",
+            "result": base64.b64encode(teal.encode()).decode(),
+        }
+
+    client = MagicMock()
+    client.compile.side_effect = compile_
+
+    results = AlgodBackend(client, max_workers=3).compile_many(
+        [f"payout {i}" for i in range(12)]
+    )
+
+    assert peak == 3
+    assert results[5] == CompileResult("ADDR5", b"payout 5")
@@ -1,12 +1,32 @@
+import base64
 import os
 import pandas as pd
+import pytest
+from algosdk import encoding
+from algosdk.transaction import LogicSigAccount
 from unittest.mock import patch, MagicMock
 import sys
 
 # Ensure project root is in sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from contracts.generate_escrow import build_escrow, main
+from contracts.generate_escrow import (
+    TEMPLATE_FILE,
+    build_escrow,
+    build_escrow_template,
+    escrow_address,
+    escrow_program,
+    generate_escrows,
+    main,
+)
+from contracts.compile_backends import (
+    AlgodBackend,
+    CompileBackend,
+    CompileCache,
+    CompileResult,
+)
+from contracts.teal_template import TealTemplate
+from algo_pay.testing import FakeAlgod, random_addresses
 
 # Use a known valid fake Algorand address (58 chars, already in your env)
 VALID_ADDR = "66MDNQQLL2A3LXHSEZWJ7PZGIWRP3NBNBPO62K3BCSP2VMFNQABCJFQQHQ"
@@ -27,7 +47,7 @@ def test_build_escrow_generates_valid_teal():
 # ----------------------
 # main() integration test
 # ----------------------
-@patch("contracts.generate_escrow.subprocess.run")
+@patch("contracts.compile_backends.subprocess.run")
 def test_main_generates_teal_and_compiles(mock_run, tmp_path, monkeypatch):
     """Simulate CSV input, Docker calls, and ensure compiled CSV is created."""
 
@@ -35,7 +55,8 @@ def test_main_generates_teal_and_compiles(mock_run, tmp_path, monkeypatch):
     def fake_subprocess_run(cmd, **kwargs):
         if "compile" in cmd:
             mock = MagicMock()
-            mock.stdout = f"{cmd[-1]}: FAKEESCROWADDRESS"
+            files = cmd[cmd.index("compile") + 1 :]
+            mock.stdout = "".join(f"{f}: FAKEESCROWADDRESS\n" for f in files)
             return mock
         return MagicMock()
 
@@ -51,7 +72,15 @@ def test_main_generates_teal_and_compiles(mock_run, tmp_path, monkeypatch):
     ).to_csv(test_csv, index=False)
 
     # Patch sys.argv so main() thinks it’s being run with the test CSV
-    monkeypatch.setattr("sys.argv", ["generate_escrow.py", str(test_csv)])
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "generate_escrow.py",
+            str(test_csv),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+        ],
+    )
 
     main()
 
@@ -64,3 +93,231 @@ def test_main_generates_teal_and_compiles(mock_run, tmp_path, monkeypatch):
     assert "escrow_address" in df_out.columns
     assert len(df_out) == 2
     assert df_out["escrow_address"].iloc[0] == "FAKEESCROWADDRESS"
+
+
+# ----------------------
+# Template mode
+# ----------------------
+@pytest.fixture(scope="module")
+def compiler():
+    # algod's /v2/teal/compile, served by the fake node
+    with FakeAlgod() as algod:
+        yield AlgodBackend(algod.client())
+
+
+@pytest.fixture(scope="module")
+def template(compiler):
+    return TealTemplate(build_escrow_template(), compiler)
+
+
+class CountingBackend(CompileBackend):
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = []
+
+    def compile_many(self, sources):
+        self.calls.append(list(sources))
+        return self.inner.compile_many(sources)
+
+
+class ChecksumBackend(CountingBackend):
+    """Appends a byte that depends on the whole program."""
+
+    def compile_many(self, sources):
+        return [
+            CompileResult(r.address, r.program + bytes([sum(r.program) % 256]))
+            for r in super().compile_many(sources)
+        ]
+
+
+class AddressOnlyBackend(CountingBackend):
+    def compile_many(self, sources):
+        return [CompileResult(r.address) for r in super().compile_many(sources)]
+
+
+def test_escrow_program_patches_receiver_and_payout(template):
+    program = escrow_program(VALID_ADDR, 1000, template)
+
+    expected = (
+        bytes([0x06, 0x31, 0x07, 0x80, 0x20])
+        + encoding.decode_address(VALID_ADDR)
+        + bytes([0x12, 0x31, 0x08, 0x81, 0xE8, 0x07, 0x12, 0x10, 0x43])
+    )
+    assert program == expected
+
+
+@pytest.mark.parametrize("payout", [0, 127, 128, 5000, 2**40, 2**64 - 1])
+def test_template_matches_per_employee_compile(compiler, template, payout):
+    for employee in [VALID_ADDR] + random_addresses(3, seed=payout % 97):
+        (compiled,) = compiler.compile_many([build_escrow(employee, payout)])
+        assert escrow_program(employee, payout, template) == compiled.program
+        assert escrow_address(employee, payout, template) == compiled.address
+
+
+def test_escrow_address_is_the_program_hash(template):
+    program = escrow_program(VALID_ADDR, 5000, template)
+    address = escrow_address(VALID_ADDR, 5000, template)
+
+    assert address == LogicSigAccount(program).address()
+    assert address != escrow_address(VALID_ADDR, 5001, template)
+
+
+def test_template_is_compiled_once_and_cached(compiler, tmp_path):
+    backend = CountingBackend(compiler)
+    cache = CompileCache(str(tmp_path))
+
+    first = TealTemplate(build_escrow_template(), backend, cache)
+    again = TealTemplate(build_escrow_template(), backend, cache)
+
+    # Two stand-in compiles, the second checking the first patches cleanly
+    assert [len(call) for call in backend.calls] == [2]
+    assert "TMPL_" not in backend.calls[0][0]
+    assert again.program(TMPL_RECEIVER=VALID_ADDR, TMPL_PAYOUT=7) == first.program(
+        TMPL_RECEIVER=VALID_ADDR, TMPL_PAYOUT=7
+    )
+
+
+@pytest.mark.parametrize(
+    "teal, backend, message",
+    [
+        ("#pragma version 6\nbyte TMPL_X\nreturn", None, "cannot patch"),
+        ("#pragma version 6\nint TMPL_X\naddr TMPL_X\n==", None, "addr and int"),
+        (None, AddressOnlyBackend, "no bytecode"),
+        (None, ChecksumBackend, "does not patch cleanly"),
+    ],
+)
+def test_teal_template_rejects_what_it_cannot_patch(compiler, teal, backend, message):
+    backend = (backend or CountingBackend)(compiler)
+    with pytest.raises(ValueError, match=message):
+        TealTemplate(teal or build_escrow_template(), backend)
+
+
+def test_teal_template_requires_every_value(template):
+    with pytest.raises(ValueError, match="TMPL_PAYOUT"):
+        template.program(TMPL_RECEIVER=VALID_ADDR)
+
+
+@patch("contracts.compile_backends.subprocess.run")
+def test_main_template_mode_uses_the_cached_template(
+    mock_run, compiler, tmp_path, monkeypatch
+):
+    test_csv = tmp_path / "employees.csv"
+    pd.DataFrame(
+        [
+            {"employee_address": VALID_ADDR, "fixed_payout_microalgos": 5000},
+            {"employee_address": VALID_ADDR, "fixed_payout_microalgos": 10000},
+        ]
+    ).to_csv(test_csv, index=False)
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("contracts")
+    # An earlier run compiled the template into the cache
+    template = TealTemplate(build_escrow_template(), compiler, CompileCache("cache"))
+    monkeypatch.setattr(
+        "sys.argv",
+        ["generate_escrow.py", str(test_csv), "--template", "--cache-dir", "cache"],
+    )
+
+    main()
+
+    mock_run.assert_not_called()
+    assert "TMPL_RECEIVER" in (tmp_path / "contracts" / TEMPLATE_FILE).read_text()
+    df_out = pd.read_csv(str(test_csv).replace(".csv", "_compiled.csv"))
+    assert list(df_out["escrow_address"]) == [
+        escrow_address(VALID_ADDR, 5000, template),
+        escrow_address(VALID_ADDR, 10000, template),
+    ]
+    assert base64.b64decode(df_out["escrow_program_b64"][1]) == escrow_program(
+        VALID_ADDR, 10000, template
+    )
+
+
+# ----------------------
+# Streaming
+# ----------------------
+def write_employees(path, count):
+    rows = [
+        {"employee_address": addr, "fixed_payout_microalgos": 1000 + i}
+        for i, addr in enumerate(random_addresses(count))
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return rows
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("contracts")
+    return tmp_path
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_generate_escrows_streams_in_chunks(compiler, template, workdir, processes):
+    rows = write_employees(workdir / "in.csv", 7)
+    backend = CountingBackend(compiler)
+
+    written = generate_escrows(
+        "in.csv", "out.csv", backend, chunksize=3, processes=processes
+    )
+
+    assert written == 7
+    # One backend call per chunk, never the whole file at once
+    assert [len(call) for call in backend.calls] == [3, 3, 1]
+    out = pd.read_csv("out.csv")
+    assert list(out["employee_address"]) == [r["employee_address"] for r in rows]
+    assert list(out["escrow_address"]) == [
+        escrow_address(r["employee_address"], r["fixed_payout_microalgos"], template)
+        for r in rows
+    ]
+    assert len(os.listdir("contracts")) == 7
+
+
+def test_generate_escrows_resumes_after_a_crash(compiler, workdir):
+    rows = write_employees(workdir / "in.csv", 6)
+    backend = CountingBackend(compiler)
+    generate_escrows("in.csv", "out.csv", backend, chunksize=2, processes=1)
+    # Simulate a crash: lose the last two rows and tear the one before
+    lines = (workdir / "out.csv").read_text().splitlines(keepends=True)
+    (workdir / "out.csv").write_text("".join(lines[:-3]) + lines[-3][:20])
+
+    backend = CountingBackend(compiler)
+    written = generate_escrows("in.csv", "out.csv", backend, chunksize=2, processes=1)
+
+    assert written == 3
+    assert [len(call) for call in backend.calls] == [1, 2]
+    out = pd.read_csv("out.csv")
+    assert list(out["employee_address"]) == [r["employee_address"] for r in rows]
+    assert generate_escrows("in.csv", "out.csv", backend, processes=1) == 0
+
+
+def test_generate_escrows_template_mode_streams(compiler, template, workdir):
+    rows = write_employees(workdir / "in.csv", 5)
+    backend = CountingBackend(compiler)
+
+    for expected in (5, 0):
+        assert (
+            generate_escrows("in.csv", "out.csv", backend, chunksize=2, template=True)
+            == expected
+        )
+
+    # Only the template reached the compiler
+    assert [len(call) for call in backend.calls] == [2]
+    out = pd.read_csv("out.csv")
+    assert list(out.columns)[-1] == "escrow_program_b64"
+    assert list(out["escrow_address"]) == [
+        escrow_address(r["employee_address"], r["fixed_payout_microalgos"], template)
+        for r in rows
+    ]
+    # No TEAL files, only the template's compile cache
+    assert os.listdir("contracts") == [".compile_cache"]
+
+
+@pytest.mark.parametrize("first, second", [(False, True), (True, False)])
+def test_generate_escrows_refuses_to_mix_modes(compiler, workdir, first, second):
+    write_employees(workdir / "in.csv", 4)
+    backend = CountingBackend(compiler)
+    generate_escrows("in.csv", "out.csv", backend, processes=1, template=first)
+    before = (workdir / "out.csv").read_text()
+
+    with pytest.raises(ValueError, match="same --template setting"):
+        generate_escrows("in.csv", "out.csv", backend, processes=1, template=second)
+    assert (workdir / "out.csv").read_text() == before
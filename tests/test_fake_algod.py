@@ -0,0 +1,216 @@
+import base64
+import os
+import sys
+import time
+
+import pytest
+from algosdk import account, error, logic, mnemonic, transaction
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay import transactions
+from algo_pay.audit import AuditLogWriter
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.testing import FakeAlgod
+
+
+def new_account():
+    private_key, address = account.generate_account()
+    return private_key, address
+
+
+def make_payroll(algod, tmp_path, balance=100_000_000):
+    private_key, address = new_account()
+    algod.fund(address, balance)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department="Fake",
+        client=algod.client(),
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(str(tmp_path / "history.csv")),
+        quiet=True,
+    )
+    employees = [new_account()[1] for _ in range(5)]
+    for i, emp in enumerate(employees):
+        payroll.add_employee(emp, 1.0 + i)
+    return payroll, employees
+
+
+@pytest.fixture
+def algod():
+    with FakeAlgod() as server:
+        yield server
+
+
+# ----------------------
+# Ledger
+# ----------------------
+@pytest.mark.parametrize(
+    "mode", [{}, {"batch_size": 2}, {"pipeline_window": 3}], ids=str
+)
+def test_run_payroll_moves_real_balances(algod, tmp_path, mode):
+    payroll, employees = make_payroll(algod, tmp_path)
+
+    txids = payroll.run_payroll(1, **mode)
+
+    assert len(txids) == 5
+    assert [algod.balance(e) for e in employees] == [
+        1_000_000,
+        2_000_000,
+        3_000_000,
+        4_000_000,
+        5_000_000,
+    ]
+    assert algod.balance(payroll.employer_address) == 100_000_000 - 15_000_000 - 5_000
+    assert all(txid in algod.confirmed for txid in txids)
+    # Locally tracked balance matches the ledger
+    assert payroll.balance_tracker.reconcile() == 0
+
+
+def test_overspend_and_min_balance_are_rejected(algod, tmp_path):
+    payroll, employees = make_payroll(algod, tmp_path, balance=2_200_000)
+
+    # 1 + 2 ALGO would overdraw the account; the first payment still lands
+    txids = payroll.run_payroll(1, pipeline_window=1)
+    assert len(txids) == 1
+    assert algod.balance(employees[0]) == 1_000_000
+    assert algod.balance(employees[1]) == 0
+
+    # Leaving less than the minimum balance behind is rejected too
+    sender = payroll.employer_address
+    txid, *_ = payroll.send_payment(employees[0], 1.15)
+    assert txid == "FAILED"
+    assert algod.balance(sender) == 2_200_000 - 1_001_000
+
+
+def test_groups_are_all_or_nothing(algod, tmp_path):
+    payroll, employees = make_payroll(algod, tmp_path, balance=5_000_000)
+
+    results = payroll.send_payment_group([(e, 1.0, "") for e in employees])
+
+    assert all(r[3] == "FAILED" for r in results)
+    assert all(algod.balance(e) == 0 for e in employees)
+    assert algod.balance(payroll.employer_address) == 5_000_000
+
+
+def test_rejects_bad_signatures_and_duplicates(algod):
+    client = algod.client()
+    sender_key, sender = new_account()
+    _, receiver = new_account()
+    algod.fund(sender, 10_000_000)
+    txn = transactions.build_payment_txn(client, sender, receiver, 1.0)
+
+    forged = txn.sign(new_account()[0])
+    with pytest.raises(error.AlgodHTTPError, match="invalid signature"):
+        client.send_transaction(forged)
+
+    signed = txn.sign(sender_key)
+    client.send_transaction(signed)
+    with pytest.raises(error.AlgodHTTPError, match="already in ledger"):
+        client.send_transaction(signed)
+
+
+def test_account_info_and_asset_holdings(algod, tmp_path):
+    payroll, employees = make_payroll(algod, tmp_path)
+    algod.opt_in(employees[0], 42, amount=7)
+
+    assert payroll.get_balance() == 100.0
+    assert payroll.get_asset_balance(employees[0], 42) == 7
+    assert payroll.get_asset_balance(employees[1], 42) == 0
+
+
+def test_compile_matches_goal_output(algod):
+    response = algod.client().compile("#pragma version 6\nint 1\nreturn\n")
+
+    # goal clerk compile of "int 1; return" at v6 is BoEBQw==
+    assert response["result"] == "BoEBQw=="
+    assert response["hash"] == logic.address(base64.b64decode("BoEBQw=="))
+
+
+@pytest.mark.parametrize(
+    "teal, message",
+    [
+        ("int 1\nreturn", "pragma"),
+        ("#pragma version 3\nint 1\nreturn", "version"),
+        ("#pragma version 6\nint 1\nint 1\n==\nreturn", "repeats"),
+        ("#pragma version 6\nbyte 0x00\nreturn", "unsupported"),
+    ],
+)
+def test_compile_rejects_what_it_cannot_assemble(algod, teal, message):
+    with pytest.raises(error.AlgodHTTPError, match=message):
+        algod.client().compile(teal)
+
+
+# ----------------------
+# Block timing and load shaping
+# ----------------------
+def test_timed_rounds_confirm_in_the_next_block(tmp_path):
+    with FakeAlgod(round_time=0.05) as algod:
+        client = algod.client()
+        key, sender = new_account()
+        algod.fund(sender, 10_000_000)
+        start = client.status()["last-round"]
+
+        signed = transactions.build_payment_txn(
+            client, sender, new_account()[1], 1.0
+        ).sign(key)
+        txid = client.send_transaction(signed)
+        assert client.pending_transaction_info(txid)["confirmed-round"] == 0
+
+        info = transaction.wait_for_confirmation(client, txid, 4)
+        assert start < info["confirmed-round"] <= start + 2
+
+        t0 = time.monotonic()
+        client.status_after_block(client.status()["last-round"])
+        assert time.monotonic() - t0 < 0.2
+
+
+def test_latency_and_injected_errors():
+    with FakeAlgod(latency=0.02) as algod:
+        client = algod.client()
+        t0 = time.monotonic()
+        client.status()
+        assert time.monotonic() - t0 >= 0.02
+
+        algod.fail_next(2, status=503, path="/v2/status")
+        for _ in range(2):
+            with pytest.raises(error.AlgodHTTPError) as excinfo:
+                client.status()
+            assert excinfo.value.code == 503
+        client.status()
+        assert algod.requests["GET /v2/status"] == 4
+
+
+def test_error_rate_is_reproducible():
+    def failures(seed):
+        with FakeAlgod(error_rate=0.3, seed=seed) as algod:
+            client = algod.client()
+            outcome = []
+            for _ in range(40):
+                try:
+                    client.status()
+                    outcome.append(True)
+                except error.AlgodHTTPError:
+                    outcome.append(False)
+            return outcome
+
+    assert failures(7) == failures(7)
+    assert 0 < failures(7).count(False) < 40
+
+
+def test_rate_limit_answers_429():
+    with FakeAlgod(rate_limit=5) as algod:
+        client = algod.client()
+        codes = []
+        for _ in range(10):
+            try:
+                client.status()
+                codes.append(200)
+            except error.AlgodHTTPError as e:
+                codes.append(e.code)
+
+    assert codes[:5] == [200] * 5
+    assert 429 in codes[5:]
+    assert algod.rate_limited == codes.count(429)
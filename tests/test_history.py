@@ -0,0 +1,187 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from algosdk import account, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.audit import AuditLogWriter
+from algo_pay.history import HistoryIndex, PayrollHistory
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.testing import FakeAlgod
+
+
+# ----------------------
+# Helpers
+# ----------------------
+def row(ts, job, payroll, employee, txid, dept="Eng", name=None, amount=1.5):
+    return [
+        ts,
+        dept,
+        job,
+        payroll,
+        "EMPLOYER",
+        name or employee.lower(),
+        employee,
+        amount,
+        txid,
+        100.0,
+        100.0 - amount,
+        "SUCCESS" if txid != "FAILED" else "FAILED",
+    ]
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    path = str(tmp_path / "history.csv")
+    writer = AuditLogWriter(path)
+    for r in [
+        row("2026-01-01T00:00:00", "Weekly", "P1", "ALICE", "TX1"),
+        row("2026-01-01T00:00:01", "Weekly", "P1", "BOB", "TX2"),
+        row("2026-01-08T00:00:00", "Weekly", "P2", "ALICE", "TX3"),
+        row("2026-02-01T00:00:00", "Bonus", "P3", "BOB", "FAILED", dept="Ops"),
+    ]:
+        writer.write_row(r)
+    writer.close()
+    return path
+
+
+# ----------------------
+# Queries
+# ----------------------
+def test_queries_by_each_key(ledger):
+    with PayrollHistory(ledger) as history:
+        assert [r["txid"] for r in history.by_payroll_id("P1")] == ["TX1", "TX2"]
+        assert [r["payroll_id"] for r in history.by_job_id("Weekly")] == [
+            "P1",
+            "P1",
+            "P2",
+        ]
+        assert [r["txid"] for r in history.by_employee("ALICE")] == ["TX1", "TX3"]
+        assert history.by_txid("TX3")["employee_address"] == "ALICE"
+        assert history.by_txid("NOPE") is None
+        assert history.query(department="Ops", job_id="Bonus")[0]["status"] == "FAILED"
+
+
+def test_rows_are_typed(ledger):
+    with PayrollHistory(ledger) as history:
+        first = history.by_txid("TX1")
+    assert first["amount_ALGO"] == 1.5
+    assert first["employer_balance_after"] == 98.5
+    assert first["timestamp"] == "2026-01-01T00:00:00"
+
+
+def test_time_range_is_half_open(ledger):
+    with PayrollHistory(ledger) as history:
+        january = history.between("2026-01-01", datetime(2026, 1, 8))
+        assert [r["txid"] for r in january] == ["TX1", "TX2"]
+        assert [r["txid"] for r in history.between(start="2026-01-08")] == [
+            "TX3",
+            "FAILED",
+        ]
+
+
+def test_quoted_fields_spanning_lines(tmp_path):
+    path = str(tmp_path / "history.csv")
+    writer = AuditLogWriter(path)
+    writer.write_row(row("t1", "J", "P1", "A", "TX1", name='Ann "A"\nSmith, Jr'))
+    writer.write_row(row("t2", "J", "P1", "B", "TX2"))
+    writer.close()
+
+    with PayrollHistory(path) as history:
+        rows = history.by_payroll_id("P1")
+    assert rows[0]["employee_name"] == 'Ann "A"\nSmith, Jr'
+    assert rows[1]["txid"] == "TX2"
+
+
+# ----------------------
+# Incremental maintenance
+# ----------------------
+def test_catch_up_only_reads_new_rows(ledger):
+    index = HistoryIndex(ledger)
+    assert index.catch_up() == 4
+    assert index.catch_up() == 0
+    assert index.indexed_bytes == os.path.getsize(ledger)
+
+    writer = AuditLogWriter(ledger)
+    writer.write_row(row("2026-03-01T00:00:00", "Weekly", "P4", "CAROL", "TX4"))
+    writer.close()
+
+    assert index.catch_up() == 1
+    assert index.offsets(payroll_id="P4") != []
+    index.close()
+
+
+def test_partial_trailing_row_waits_for_its_newline(ledger):
+    with open(ledger, "a") as f:
+        f.write("2026-03-01T00:00:00,Eng,Weekly,P9,EMPLOYER,x,X")
+    with PayrollHistory(ledger) as history:
+        assert history.by_payroll_id("P9") == []
+        with open(ledger, "a") as f:
+            f.write(",1.0,TX9,100.0,99.0,SUCCESS\r\n")
+        assert history.by_txid("TX9")["employee_address"] == "X"
+
+
+def test_replaced_ledger_is_reindexed(ledger, tmp_path):
+    with PayrollHistory(ledger) as history:
+        assert len(history.by_job_id("Weekly")) == 3
+        os.remove(ledger)
+        writer = AuditLogWriter(ledger)
+        writer.write_row(row("2026-05-01T00:00:00", "Weekly", "P7", "DAN", "TX7"))
+        writer.close()
+        assert [r["txid"] for r in history.by_job_id("Weekly")] == ["TX7"]
+
+
+def test_index_survives_reopen(ledger):
+    with PayrollHistory(ledger) as history:
+        history.by_txid("TX1")
+    index = HistoryIndex(ledger)
+    assert index.indexed_bytes == os.path.getsize(ledger)
+    assert index.catch_up() == 0
+    index.close()
+
+
+def test_indexing_writer_keeps_index_current(tmp_path):
+    path = str(tmp_path / "history.csv")
+    writer = AuditLogWriter(path, flush=2, index=True)
+    for i in range(5):
+        writer.write_row(row(f"t{i}", "J", "P1", "A", f"TX{i}"))
+    # Two flushes of two rows each have been indexed as they happened
+    index = HistoryIndex(path)
+    assert len(index.offsets(payroll_id="P1")) == 4
+    writer.close()
+    assert index.catch_up() == 0
+    assert len(index.offsets(payroll_id="P1")) == 5
+    index.close()
+
+
+# ----------------------
+# Payroll integration
+# ----------------------
+def test_payroll_history_sees_a_run(tmp_path):
+    with FakeAlgod() as algod:
+        private_key, address = account.generate_account()
+        algod.fund(address, 100_000_000)
+        payroll = Payroll(
+            mnemonic.from_private_key(private_key),
+            department="Eng",
+            client=algod.client(),
+            params_cache=SuggestedParamsCache(),
+            audit_writer=AuditLogWriter(str(tmp_path / "history.csv")),
+            quiet=True,
+        )
+        employees = [account.generate_account()[1] for _ in range(3)]
+        for employee in employees:
+            payroll.add_employee(employee, 1.0)
+
+        txids = payroll.run_payroll(1, job_id="Weekly")
+
+        history = payroll.history()
+        rows = history.by_job_id("Weekly")
+        assert [r["txid"] for r in rows] == txids
+        assert history.by_employee(employees[1])[0]["txid"] == txids[1]
+        assert len(history.by_payroll_id(rows[0]["payroll_id"])) == 3
@@ -0,0 +1,302 @@
+import base64
+import csv
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from algosdk import account, encoding, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.audit import AuditLogWriter
+from algo_pay.journal import (
+    CONFIRMED,
+    INTENT,
+    SIGNED,
+    PayrollJournal,
+    incomplete_payrolls,
+    payment_lease,
+)
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.pipeline import PaymentPipeline
+from algo_pay.testing import FakeAlgod
+from algo_pay.testing.fake_algod import MIN_BALANCE
+
+
+class Crash(BaseException):
+    """Stands in for the process dying: nothing catches it."""
+
+
+def make_payroll(algod, tmp_path, employees=6):
+    private_key, address = account.generate_account()
+    algod.fund(address, 100_000_000)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department="Eng",
+        client=algod.client(),
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(str(tmp_path / "history.csv")),
+        journal_dir=str(tmp_path / "journal"),
+        quiet=True,
+    )
+    for _ in range(employees):
+        employee = account.generate_account()[1]
+        algod.fund(employee, MIN_BALANCE)
+        payroll.add_employee(employee, 1.0)
+    return payroll
+
+
+def crash_after_confirms(count):
+    # Let ``count`` confirm rounds through, then die mid-run
+    real_confirm = PaymentPipeline._confirm
+    calls = []
+
+    def confirm(self, *args):
+        calls.append(1)
+        if len(calls) > count:
+            raise Crash()
+        return real_confirm(self, *args)
+
+    return patch.object(PaymentPipeline, "_confirm", confirm)
+
+
+def only_payroll_id(tmp_path):
+    (payroll_id,) = incomplete_payrolls(str(tmp_path / "journal"))
+    return payroll_id
+
+
+def ledger_rows(tmp_path):
+    with open(tmp_path / "history.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+# ----------------------
+# Journaled runs
+# ----------------------
+def test_journaled_run_records_every_payment(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=4)
+        txids = payroll.run_payroll(1, job_id="Weekly", batch_size=2)
+
+    (name,) = os.listdir(tmp_path / "journal")
+    with PayrollJournal(str(tmp_path / "journal" / name)) as journal:
+        assert journal.completed
+        entries = journal.entries()
+        payroll_id = journal.payroll_id
+    assert [e.txid for e in entries] == txids
+    assert {e.state for e in entries} == {CONFIRMED}
+    # Two atomic groups of two
+    assert [e.unit for e in entries] == [0, 0, 1, 1]
+    for entry in entries:
+        assert entry.lease == payment_lease(payroll_id, entry.employee_address)
+        stxn = encoding.msgpack_decode(base64.b64encode(entry.signed).decode())
+        assert stxn.get_txid() == entry.txid
+        assert stxn.transaction.lease == entry.lease
+    assert [r["txid"] for r in ledger_rows(tmp_path)] == txids
+
+
+def test_signatures_are_journaled_before_sending(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=3)
+        with crash_after_confirms(0), pytest.raises(Crash):
+            payroll.run_payroll(1, pipeline_window=8)
+        with PayrollJournal.open(
+            payroll.journal_dir, only_payroll_id(tmp_path)
+        ) as journal:
+            entries = journal.entries()
+            assert journal.sent_mark > max(e.unit for e in entries)
+        assert {e.state for e in entries} == {SIGNED}
+        # Everything was sent before the crash, and nothing was logged
+        assert all(txid in algod.confirmed for txid in (e.txid for e in entries))
+    assert not os.path.exists(tmp_path / "history.csv")
+
+
+def test_journal_is_closed_when_the_run_dies(tmp_path):
+    closed = []
+    real_close = PayrollJournal.close
+
+    def close(journal):
+        closed.append(journal.path)
+        real_close(journal)
+
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        with (
+            patch.object(PayrollJournal, "close", close),
+            crash_after_confirms(0),
+            pytest.raises(Crash),
+        ):
+            payroll.run_payroll(1, pipeline_window=4)
+    assert len(closed) == 1
+
+
+def test_unconfirmed_payments_keep_the_journal_open(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        # The run never sees its payments confirm, but they land
+        with patch.object(
+            payroll.client, "pending_transaction_info", side_effect=Exception("timeout")
+        ):
+            assert payroll.run_payroll(1, job_id="Weekly", pipeline_window=4) == []
+        payroll_id = only_payroll_id(tmp_path)
+        rows = ledger_rows(tmp_path)
+        assert [r["status"] for r in rows] == ["PENDING", "PENDING"]
+        assert all(r["txid"] in algod.confirmed for r in rows)
+
+        txids = payroll.resume_payroll(payroll_id)
+
+    assert txids == [r["txid"] for r in rows]
+    assert incomplete_payrolls(payroll.journal_dir) == []
+    # Only the payments logged as PENDING are logged again
+    assert [(r["txid"], r["status"]) for r in ledger_rows(tmp_path)[2:]] == [
+        (txid, "SUCCESS") for txid in txids
+    ]
+
+
+# ----------------------
+# Resume
+# ----------------------
+def test_resume_pays_everyone_exactly_once(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=6)
+        employees = list(payroll.employees.addresses)
+        with crash_after_confirms(1), pytest.raises(Crash):
+            payroll.run_payroll(1, job_id="Weekly", pipeline_window=2)
+        payroll_id = only_payroll_id(tmp_path)
+        paid_before = sum(algod.balance(e) > MIN_BALANCE for e in employees)
+        assert 0 < paid_before < 6
+
+        txids = payroll.resume_payroll(payroll_id)
+
+        assert [algod.balance(e) for e in employees] == [MIN_BALANCE + 1_000_000] * 6
+        assert incomplete_payrolls(payroll.journal_dir) == []
+        assert payroll.resume_payroll(payroll_id) == txids
+    rows = ledger_rows(tmp_path)
+    assert [r["txid"] for r in rows] == txids
+    assert {r["payroll_id"] for r in rows} == {payroll_id}
+    assert {r["job_id"] for r in rows} == {"Weekly"}
+
+
+def test_resume_checks_only_unsettled_units(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=6)
+        with crash_after_confirms(1), pytest.raises(Crash):
+            payroll.run_payroll(1, pipeline_window=2)
+        payroll_id = only_payroll_id(tmp_path)
+        with PayrollJournal.open(payroll.journal_dir, payroll_id) as journal:
+            confirmed = len(journal.entries([CONFIRMED]))
+
+        algod.requests.clear()
+        payroll.resume_payroll(payroll_id)
+        assert algod.requests["GET /v2/transactions/pending/{}"] >= 6 - confirmed
+        # Settled entries were not looked up again, nor was anything re-signed
+        assert algod.requests["GET /v2/transactions/pending/{}"] < 6 + (6 - confirmed)
+
+
+def test_never_signed_entries_are_signed_on_resume(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=3)
+        with (
+            patch.object(PayrollJournal, "record_signed", side_effect=Crash),
+            pytest.raises(Crash),
+        ):
+            payroll.run_payroll(1)
+        payroll_id = only_payroll_id(tmp_path)
+        with PayrollJournal.open(payroll.journal_dir, payroll_id) as journal:
+            assert {e.state for e in journal.entries()} == {INTENT}
+
+        txids = payroll.resume_payroll(payroll_id)
+        assert len(txids) == 3
+        assert all(txid in algod.confirmed for txid in txids)
+
+
+def test_lease_blocks_a_second_payment(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=1)
+        (employee,) = payroll.employees.addresses
+        payroll.run_payroll(1, job_id="Weekly")
+        (name,) = os.listdir(tmp_path / "journal")
+        with PayrollJournal(str(tmp_path / "journal" / name)) as journal:
+            (entry,) = journal.entries()
+
+        # A fresh transaction for the same payment, as a resume would sign
+        params = payroll.params_cache.get(payroll.client)
+        (txn,) = payroll._build_payments(
+            [(employee, entry.amount, "again", entry.lease)], params, microalgos=True
+        )
+        with pytest.raises(Exception, match="overlapping lease"):
+            payroll.client.send_transaction(txn.sign(payroll.employer_private_key))
+        assert algod.balance(employee) == MIN_BALANCE + 1_000_000
+
+
+def test_expired_unknown_units_need_an_indexer(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        with crash_after_confirms(0), pytest.raises(Crash):
+            payroll.run_payroll(1, pipeline_window=4)
+        payroll_id = only_payroll_id(tmp_path)
+        with PayrollJournal.open(payroll.journal_dir, payroll_id) as journal:
+            entries = journal.entries()
+        # Past every validity window, and the node has forgotten the txids
+        algod.advance(1001)
+        algod.confirmed.clear()
+
+        assert payroll.resume_payroll(payroll_id) == []
+        assert incomplete_payrolls(payroll.journal_dir) == [payroll_id]
+
+        indexer = MagicMock()
+        indexer.search_transactions_by_address.return_value = {
+            "transactions": [{"id": entries[0].txid, "confirmed-round": 1001}]
+        }
+        txids = payroll.resume_payroll(payroll_id, indexer_client=indexer)
+
+    # The first payment had landed; only the second was signed again
+    assert txids[0] == entries[0].txid
+    assert txids[1] != entries[1].txid
+    assert incomplete_payrolls(payroll.journal_dir) == []
+    kwargs = indexer.search_transactions_by_address.call_args.kwargs
+    assert kwargs["min_round"] == entries[0].first_valid
+    assert kwargs["max_round"] == entries[0].last_valid
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_resume_settles_payments_algod_has_forgotten(tmp_path, indexed):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=2)
+        employees = list(payroll.employees.addresses)
+        with crash_after_confirms(0), pytest.raises(Crash):
+            payroll.run_payroll(1, pipeline_window=4)
+        payroll_id = only_payroll_id(tmp_path)
+        # Both landed, and the node no longer lists them
+        landed = dict(algod.confirmed)
+        algod.forget_confirmed()
+        indexer = None
+        if indexed:
+            indexer = MagicMock()
+            indexer.search_transactions_by_address.return_value = {
+                "transactions": [
+                    {"id": txid, "confirmed-round": rnd} for txid, rnd in landed.items()
+                ]
+            }
+        algod.requests.clear()
+
+        txids = payroll.resume_payroll(payroll_id, indexer_client=indexer)
+
+        # The indexer settles them; without one, algod refuses the
+        # rebroadcast as already in ledger, and that counts as paid
+        assert algod.requests["POST /v2/transactions"] == (0 if indexed else 2)
+        assert [algod.balance(e) for e in employees] == [MIN_BALANCE + 1_000_000] * 2
+    assert sorted(txids) == sorted(landed)
+    assert [r["status"] for r in ledger_rows(tmp_path)] == ["SUCCESS", "SUCCESS"]
+    assert incomplete_payrolls(payroll.journal_dir) == []
+
+
+def test_resume_requires_a_journal_dir(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=0)
+        payroll.journal_dir = None
+        with pytest.raises(ValueError, match="journal_dir"):
+            payroll.resume_payroll("Payroll_x")
@@ -0,0 +1,207 @@
+import os
+import sys
+
+import pytest
+from algosdk import account, error, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay import metrics
+from algo_pay.audit import AuditLogWriter
+from algo_pay.metrics import MetricsRegistry, default_metrics
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.testing import FakeAlgod
+
+
+def make_payroll(algod, tmp_path, registry, department="Eng", employees=4):
+    private_key, address = account.generate_account()
+    algod.fund(address, 100_000_000)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department=department,
+        client=algod.client(),
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(str(tmp_path / f"{department}.csv")),
+        quiet=True,
+        metrics=registry,
+    )
+    for i in range(employees):
+        payroll.add_employee(account.generate_account()[1], 1.0 + i)
+    return payroll
+
+
+@pytest.fixture
+def algod():
+    with FakeAlgod() as server:
+        yield server
+
+
+# ----------------------
+# Payroll runs
+# ----------------------
+@pytest.mark.parametrize(
+    "mode", [{}, {"batch_size": 2}, {"pipeline_window": 3}], ids=str
+)
+def test_run_payroll_records_every_stage(algod, tmp_path, mode):
+    registry = MetricsRegistry(enabled=True)
+    payroll = make_payroll(algod, tmp_path, registry)
+
+    payroll.run_payroll(1, job_id="Weekly", **mode)
+
+    labels = {"department": "Eng", "job_id": "Weekly"}
+    for stage in ("suggested_params", "send", "confirm", "balance", "log", "run"):
+        assert registry.stage_totals(stage, **labels)["count"] >= 1, stage
+    assert registry.stage_totals("sign", **labels)["items"] == 4
+    assert registry.stage_totals("send", **labels)["items"] == 4
+    assert registry.stage_totals("log", **labels)["items"] == 4
+    assert registry.stage_totals("run", **labels)["count"] == 1
+    assert registry.counter("payments_total", status="SUCCESS", **labels) == 4
+    # Nothing leaks out unattributed
+    assert registry.stage_totals("send", department="")["count"] == 0
+
+
+def test_departments_and_jobs_are_kept_apart(algod, tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    eng = make_payroll(algod, tmp_path, registry, "Eng", employees=2)
+    ops = make_payroll(algod, tmp_path, registry, "Ops", employees=3)
+
+    eng.run_payroll(1, job_id="A")
+    eng.run_payroll(1, job_id="B")
+    ops.run_payroll(1, job_id="A")
+
+    assert registry.stage_totals("send", department="Eng", job_id="A")["items"] == 2
+    assert registry.stage_totals("send", department="Eng", job_id="B")["items"] == 2
+    assert registry.stage_totals("send", department="Ops", job_id="A")["items"] == 3
+    assert registry.stage_totals("run", job_id="A")["count"] == 2
+
+
+def test_direct_payment_is_attributed_to_department(algod, tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    payroll = make_payroll(algod, tmp_path, registry, employees=1)
+
+    payroll.send_payment(payroll.employees.addresses[0], 1.0)
+
+    assert registry.stage_totals("send", department="Eng", job_id="")["count"] == 1
+    assert registry.stage_totals("confirm", department="Eng")["count"] == 1
+
+
+def test_algod_errors_are_counted_per_stage(algod, tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    payroll = make_payroll(algod, tmp_path, registry, employees=1)
+    # Warm the params cache so the failure lands on the submission itself
+    payroll.params_cache.get(payroll.client)
+    algod.fail_next(1, status=503, path="/v2/transactions")
+
+    payroll.run_payroll(1, job_id="Weekly")
+
+    assert (
+        registry.counter(
+            "algod_errors_total",
+            stage="send",
+            department="Eng",
+            job_id="Weekly",
+            error="503",
+        )
+        == 1
+    )
+    assert registry.counter("payments_total", status="FAILED") == 1
+
+
+def test_disabled_registry_records_nothing(algod, tmp_path):
+    registry = MetricsRegistry()
+    payroll = make_payroll(algod, tmp_path, registry)
+
+    payroll.run_payroll(1)
+
+    assert registry.snapshot() == {"stages": [], "counters": []}
+    assert registry.prometheus_text() == ""
+
+
+def test_payroll_defaults_to_shared_disabled_registry(algod, tmp_path):
+    payroll = make_payroll(algod, tmp_path, None)
+    assert payroll.metrics is default_metrics
+    assert not default_metrics.enabled
+
+
+# ----------------------
+# Registry
+# ----------------------
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(enabled=True, buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.5):
+        registry.observe("send", seconds, "Eng", "Job")
+
+    (record,) = registry.snapshot()["stages"]
+    assert record["buckets"] == {"0.01": 1, "0.1": 2, "+Inf": 3}
+    assert record["count"] == 3
+    assert record["sum_seconds"] == pytest.approx(0.555)
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(enabled=True, buckets=(0.1,))
+    registry.observe("send", 0.05, "Eng", "Job", items=16)
+    registry.increment("algod_retries_total", department='R&"D', reason="pending")
+
+    text = registry.prometheus_text()
+
+    assert "# TYPE algopay_stage_seconds histogram" in text
+    assert (
+        'algopay_stage_seconds_bucket{stage="send",department="Eng",'
+        'job_id="Job",le="0.1"} 1' in text
+    )
+    assert (
+        'algopay_stage_seconds_bucket{stage="send",department="Eng",'
+        'job_id="Job",le="+Inf"} 1' in text
+    )
+    assert (
+        'algopay_stage_seconds_count{stage="send",department="Eng",job_id="Job"} 1'
+        in text
+    )
+    assert (
+        'algopay_stage_transactions_total{stage="send",department="Eng",'
+        'job_id="Job"} 16' in text
+    )
+    assert "# TYPE algopay_algod_retries_total counter" in text
+    assert 'algopay_algod_retries_total{department="R&\\"D",reason="pending"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_stage_errors_outside_algod_are_not_counted():
+    registry = MetricsRegistry(enabled=True)
+    with registry.bind("Eng"):
+        with pytest.raises(ValueError):
+            with metrics.stage("sign"):
+                raise ValueError("bad key")
+        with pytest.raises(error.AlgodHTTPError):
+            with metrics.stage("send"):
+                raise error.AlgodHTTPError("overspend", 400)
+
+    assert registry.counter("algod_errors_total", stage="sign") == 0
+    assert registry.counter("algod_errors_total", stage="send", error="400") == 1
+    assert registry.stage_totals("sign")["count"] == 1
+
+
+def test_bind_keeps_enclosing_job_id():
+    registry = MetricsRegistry(enabled=True)
+    with registry.bind("Eng", "Weekly"):
+        with registry.bind("Eng"):
+            with metrics.stage("send"):
+                pass
+        with registry.bind("Ops"):
+            with metrics.stage("send"):
+                pass
+
+    assert (
+        registry.stage_totals("send", department="Eng", job_id="Weekly")["count"] == 1
+    )
+    assert registry.stage_totals("send", department="Ops", job_id="")["count"] == 1
+
+
+def test_reset_clears_everything():
+    registry = MetricsRegistry(enabled=True)
+    registry.observe("send", 0.01)
+    registry.increment("payments_total", status="SUCCESS")
+    registry.reset()
+    assert registry.snapshot() == {"stages": [], "counters": []}
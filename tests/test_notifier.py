@@ -0,0 +1,230 @@
+import os
+import smtplib
+import sys
+import threading
+import time
+from email import message_from_string
+from unittest.mock import patch
+
+import pytest
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.notifier import EmailNotifier
+
+
+class FakeSMTP:
+    """Stand-in SMTP server recording sessions and delivered messages."""
+
+    sessions = []
+    delivered = []
+    delay = 0.0
+    drop_next = False
+
+    def __init__(self, host, port, timeout=None):
+        self.host, self.port = host, port
+        self.calls = ["connect"]
+        FakeSMTP.sessions.append(self)
+
+    def starttls(self):
+        self.calls.append("starttls")
+
+    def login(self, user, password):
+        self.calls.append("login")
+
+    def sendmail(self, sender, recipient, message):
+        if FakeSMTP.drop_next:
+            FakeSMTP.drop_next = False
+            raise smtplib.SMTPServerDisconnected("idle timeout")
+        time.sleep(FakeSMTP.delay)
+        FakeSMTP.delivered.append((recipient, message_from_string(message)))
+
+    def quit(self):
+        self.calls.append("quit")
+
+    def close(self):
+        self.calls.append("close")
+
+
+@pytest.fixture(autouse=True)
+def fake_smtp():
+    FakeSMTP.sessions, FakeSMTP.delivered = [], []
+    FakeSMTP.delay, FakeSMTP.drop_next = 0.0, False
+    with patch("algo_pay.notifier.smtplib.SMTP", FakeSMTP):
+        yield FakeSMTP
+
+
+def make_notifier(**kwargs):
+    return EmailNotifier(
+        "smtp.example.com",
+        587,
+        "payroll@example.com",
+        "secret",
+        "ops@example.com",
+        **kwargs,
+    )
+
+
+def payload(job_id, department="Eng"):
+    return {
+        "job_id": job_id,
+        "department": department,
+        "txids": [],
+        "status": "SUCCESS",
+    }
+
+
+# ----------------------
+# Queueing
+# ----------------------
+def test_notify_does_not_block_on_delivery(fake_smtp):
+    fake_smtp.delay = 0.3
+    notifier = make_notifier()
+
+    start = time.monotonic()
+    notifier.notify(payload("J1"))
+    assert time.monotonic() - start < 0.1
+
+    assert notifier.flush(timeout=2)
+    notifier.close()
+    assert len(fake_smtp.delivered) == 1
+    recipient, message = fake_smtp.delivered[0]
+    assert recipient == "ops@example.com"
+    assert message["Subject"] == "Payroll Job Completed: J1"
+
+
+def test_one_session_is_reused_for_many_emails(fake_smtp):
+    notifier = make_notifier()
+    for i in range(5):
+        notifier.notify(payload(f"J{i}"))
+    notifier.close(timeout=2)
+
+    assert len(fake_smtp.delivered) == 5
+    assert len(fake_smtp.sessions) == 1
+    assert fake_smtp.sessions[0].calls == ["connect", "starttls", "login", "quit"]
+
+
+def test_reconnects_when_session_is_dropped(fake_smtp):
+    notifier = make_notifier()
+    notifier.notify(payload("J1"))
+    notifier.flush(timeout=2)
+    fake_smtp.drop_next = True
+    notifier.notify(payload("J2"))
+    notifier.close(timeout=2)
+
+    assert [m["Subject"] for _, m in fake_smtp.delivered] == [
+        "Payroll Job Completed: J1",
+        "Payroll Job Completed: J2",
+    ]
+    assert len(fake_smtp.sessions) == 2
+    assert notifier.failed == 0
+
+
+# ----------------------
+# Digests
+# ----------------------
+def test_digest_coalesces_per_recipient(fake_smtp):
+    notifier = make_notifier(digest_window=0.2)
+
+    def department(name):
+        for i in range(3):
+            notifier.notify(payload(f"{name}{i}", department=name))
+
+    threads = [threading.Thread(target=department, args=(d,)) for d in ("A", "B")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    notifier.notify(payload("X"), recipient_override="cfo@example.com")
+    notifier.close(timeout=2)
+
+    assert sorted(r for r, _ in fake_smtp.delivered) == [
+        "cfo@example.com",
+        "ops@example.com",
+    ]
+    digest = dict(fake_smtp.delivered)["ops@example.com"]
+    assert digest["Subject"] == "Payroll Digest: 6 jobs completed"
+    body = digest.get_payload()[0].get_payload()
+    assert body.count("Payroll Job ID:") == 6
+    assert "Department: B" in body
+
+
+def test_close_delivers_pending_and_drops_new_mail(fake_smtp):
+    notifier = make_notifier(digest_window=5)
+    notifier.notify(payload("J1"))
+    notifier.close(timeout=2)
+
+    assert len(fake_smtp.delivered) == 1
+    # Logged and dropped, never raised into a payroll that already paid
+    notifier.notify(payload("J2"))
+    assert notifier.failed == 1
+    assert len(fake_smtp.delivered) == 1
+
+
+def test_close_racing_notify_still_delivers(fake_smtp):
+    notifier = make_notifier()
+    notifier.notify(payload("J0"))
+    assert notifier.flush(timeout=2)
+    closer = threading.Thread(target=notifier.close, kwargs={"timeout": 2})
+    real_put = notifier._queue.put
+
+    def put(item, *args, **kwargs):
+        # close() runs while this notification is on its way into the queue
+        if closer.ident is None:
+            closer.start()
+            time.sleep(0.1)
+        real_put(item, *args, **kwargs)
+
+    with patch.object(notifier._queue, "put", put):
+        notifier.notify(payload("J1"))
+        closer.join(timeout=5)
+
+    assert notifier.flush(timeout=1)
+    assert [m["Subject"] for _, m in fake_smtp.delivered][-1].endswith("J1")
+
+
+def test_a_message_that_fails_to_build_does_not_stop_the_worker(fake_smtp):
+    notifier = make_notifier()
+    real_build = EmailNotifier._build_message
+    calls = []
+
+    def build(self, recipient, payloads):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("unencodable payload")
+        return real_build(self, recipient, payloads)
+
+    with patch.object(EmailNotifier, "_build_message", build):
+        notifier.notify(payload("J1"))
+        notifier.notify(payload("J2"))
+        assert notifier.flush(timeout=2)
+    notifier.close()
+
+    assert notifier.failed == 1
+    assert [m["Subject"] for _, m in fake_smtp.delivered] == [
+        "Payroll Job Completed: J2"
+    ]
+
+
+@pytest.mark.parametrize("step", ["starttls", "login"])
+def test_failed_handshake_closes_the_connection(fake_smtp, step):
+    def refuse(*args):
+        raise smtplib.SMTPException(f"{step} refused")
+
+    with patch.object(FakeSMTP, step, refuse):
+        notifier = make_notifier()
+        notifier.notify(payload("J1"))
+        notifier.close(timeout=2)
+
+    assert notifier.failed == 1
+    # Both attempts' connections were closed, none left open
+    assert all(session.calls[-1] == "close" for session in fake_smtp.sessions)
+
+
+def test_port_465_uses_implicit_tls(fake_smtp):
+    with patch("algo_pay.notifier.smtplib.SMTP_SSL", FakeSMTP):
+        notifier = EmailNotifier("smtp.example.com", 465, "a@b.c", "pw", "ops@b.c")
+        notifier.notify(payload("J1"))
+        notifier.close(timeout=2)
+    assert fake_smtp.sessions[0].calls == ["connect", "login", "quit"]
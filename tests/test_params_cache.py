@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.params_cache import SuggestedParamsCache
+
+
+# ----------------------
+# Helpers
+# ----------------------
+def make_client(address="http://algod:4001", first=100):
+    client = MagicMock()
+    client.algod_address = address
+    params = MagicMock()
+    params.first = first
+    client.suggested_params.return_value = params
+    return client
+
+
+# ----------------------
+# Caching
+# ----------------------
+def test_params_fetched_once_per_endpoint():
+    cache = SuggestedParamsCache()
+    client = make_client()
+    other_instance_same_endpoint = make_client()
+
+    for _ in range(5):
+        cache.get(client)
+    cache.get(other_instance_same_endpoint)
+
+    assert client.suggested_params.call_count == 1
+    assert other_instance_same_endpoint.suggested_params.call_count == 0
+
+
+def test_params_refresh_after_round_margin():
+    cache = SuggestedParamsCache(round_margin=10)
+    client = make_client(first=100)
+
+    cache.get(client)
+    cache.observe_round(client, 110)
+    cache.get(client)
+    assert client.suggested_params.call_count == 1
+
+    cache.observe_round(client, 111)
+    cache.get(client)
+    assert client.suggested_params.call_count == 2
+
+
+@patch("algo_pay.params_cache.time.monotonic")
+def test_params_refresh_after_ttl(mock_monotonic):
+    cache = SuggestedParamsCache(ttl=30)
+    client = make_client()
+
+    mock_monotonic.return_value = 1000.0
+    cache.get(client)
+    mock_monotonic.return_value = 1029.0
+    cache.get(client)
+    assert client.suggested_params.call_count == 1
+
+    mock_monotonic.return_value = 1031.0
+    cache.get(client)
+    assert client.suggested_params.call_count == 2
+
+
+def test_params_returned_as_copies():
+    cache = SuggestedParamsCache()
+    client = make_client()
+
+    first = cache.get(client)
+    first.fee = 5000
+    assert cache.get(client).fee != 5000
+
+
+def test_slow_endpoint_does_not_block_others():
+    cache = SuggestedParamsCache()
+    slow, fast = make_client("http://slow:4001"), make_client("http://fast:4001")
+    release = threading.Event()
+    slow_params = slow.suggested_params.return_value
+    slow.suggested_params.side_effect = lambda: release.wait(5) and slow_params
+
+    waiters = [threading.Thread(target=cache.get, args=(slow,)) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    try:
+        # Answered while the slow endpoint's fetch is still outstanding
+        other = threading.Thread(target=cache.get, args=(fast,))
+        other.start()
+        other.join(timeout=2)
+        assert not other.is_alive()
+        assert fast.suggested_params.call_count == 1
+    finally:
+        release.set()
+        for t in waiters:
+            t.join()
+    # The three concurrent callers of the slow endpoint shared one fetch
+    assert slow.suggested_params.call_count == 1
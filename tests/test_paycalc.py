@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.paycalc import (
+    algos_to_microalgos,
+    compute_pay_microalgos,
+    total_microalgos,
+)
+
+
+# ----------------------
+# Scalar conversion
+# ----------------------
+def test_algos_to_microalgos_does_not_truncate():
+    assert int(0.001009 * 1e6) == 1008  # the float bug this avoids
+    assert algos_to_microalgos(0.001009) == 1009
+    assert algos_to_microalgos(0.29) == 290_000
+    assert algos_to_microalgos(123456) == 123_456_000_000
+
+
+def test_algos_to_microalgos_rounding_policies():
+    assert algos_to_microalgos(0.0000025, "half_even") == 2
+    assert algos_to_microalgos(0.0000025, "half_up") == 3
+    assert algos_to_microalgos(0.0000029, "floor") == 2
+    assert algos_to_microalgos(0.0000021, "ceil") == 3
+    with pytest.raises(ValueError):
+        algos_to_microalgos(1, "bankers")
+
+
+# ----------------------
+# Vectorized pay
+# ----------------------
+def test_compute_pay_is_exact_and_integer():
+    # int(0.29 * 3 * 1e6) truncates to 869999
+    amounts = compute_pay_microalgos([0.29, 2.0, 1.1], 3.0)
+    assert amounts.dtype == np.int64
+    assert amounts.tolist() == [870_000, 6_000_000, 3_300_000]
+
+    # Per-employee hours and fractional microAlgos
+    amounts = compute_pay_microalgos([0.000001, 0.000003], [2.5, 0.5], "half_up")
+    assert amounts.tolist() == [3, 2]
+    amounts = compute_pay_microalgos([0.000001, 0.000003], [2.5, 0.5], "floor")
+    assert amounts.tolist() == [2, 1]
+
+
+def test_compute_pay_floor_ignores_float_noise():
+    # 0.29 * 3 is 0.8699999999999999 in binary floating point
+    assert compute_pay_microalgos([0.29], 3, "floor").tolist() == [870_000]
+
+
+@pytest.mark.parametrize(
+    "rounding, expected",
+    [
+        ("half_even", [1, 2, 1975308624, 1981481463, 300_000_000_000]),
+        ("half_up", [1, 3, 1975308624, 1981481463, 300_000_000_000]),
+        ("floor", [0, 2, 1975308624, 1981481463, 300_000_000_000]),
+        ("ceil", [1, 3, 1975308624, 1981481464, 300_000_000_001]),
+    ],
+)
+def test_compute_pay_rounds_once(rounding, expected):
+    # Sub-microAlgo rates are not settled before multiplying by hours, and
+    # 0.1 + 0.2 (0.30000000000000004) is too fine for the scaled integers
+    rates = [0.0000009, 0.0000025, 12.3456789, 12.3456789, 0.1 + 0.2]
+    hours = [1, 1, 160, 160.5, 1_000_000]
+    amounts = compute_pay_microalgos(rates, hours, rounding)
+    assert amounts.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "rates, hours",
+    [
+        ([1.0, float("nan")], 8),
+        ([1.0, float("inf")], 8),
+        ([1.0], float("nan")),
+        ([1.0], -1),
+    ],
+)
+def test_compute_pay_rejects_non_finite_and_negative(rates, hours):
+    with pytest.raises(ValueError, match="finite and non-negative"):
+        compute_pay_microalgos(rates, hours)
+
+
+def test_compute_pay_large_roster_fast():
+    rates = np.random.default_rng(0).uniform(1, 500, size=100_000).round(6)
+    start = time.perf_counter()
+    amounts = compute_pay_microalgos(rates, 37.5)
+    assert time.perf_counter() - start < 0.5
+    assert total_microalgos(amounts) == sum(int(a) for a in amounts)
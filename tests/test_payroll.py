@@ -1,17 +1,20 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import sys
 import os
 
 # Ensure project root is in sys.path so algo_pay is importable
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import pytest
+from algosdk import account, mnemonic, transaction
+
 from algo_pay.payroll import Payroll
 
 
 # ----------------------
 # Employee management
 # ----------------------
-@patch("algosdk.v2client.algod.AlgodClient")
+@patch("algo_pay.payroll.get_algod_client")
 @patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
 @patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
 def test_add_and_remove_employee(mock_to_private, mock_addr_from_pk, mock_client):
@@ -27,7 +30,7 @@ def test_add_and_remove_employee(mock_to_private, mock_addr_from_pk, mock_client
 # ----------------------
 # Asset balance tests
 # ----------------------
-@patch("algosdk.v2client.algod.AlgodClient")
+@patch("algo_pay.payroll.get_algod_client")
 @patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
 @patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
 def test_get_asset_balance_found(mock_to_private, mock_addr_from_pk, mock_client):
@@ -41,7 +44,7 @@ def test_get_asset_balance_found(mock_to_private, mock_addr_from_pk, mock_client
     assert balance == 42
 
 
-@patch("algosdk.v2client.algod.AlgodClient")
+@patch("algo_pay.payroll.get_algod_client")
 @patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
 @patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
 def test_get_asset_balance_not_found(mock_to_private, mock_addr_from_pk, mock_client):
@@ -58,7 +61,7 @@ def test_get_asset_balance_not_found(mock_to_private, mock_addr_from_pk, mock_cl
 # ----------------------
 @patch("algo_pay.payroll.log_transaction")
 @patch("algo_pay.payroll.Payroll.send_payment")
-@patch("algosdk.v2client.algod.AlgodClient")
+@patch("algo_pay.payroll.get_algod_client")
 @patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
 @patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
 def test_run_payroll_logs_transactions(
@@ -87,3 +90,251 @@ def test_run_payroll_logs_transactions(
     # Verify department is passed correctly (first arg after file)
     first_call_args = mock_log_transaction.call_args_list[0][0]
     assert first_call_args[1] == "TestDept"
+
+
+# ----------------------
+# Atomic-group batch mode
+# ----------------------
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+
+def make_params():
+    return transaction.SuggestedParams(
+        fee=1000, first=1, last=1000, gh=GENESIS_HASH, flat_fee=True
+    )
+
+
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.transactions.transaction.wait_for_confirmation")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_batch_mode_groups_payments(
+    mock_client, mock_wait, mock_log_transaction
+):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+    )
+    employees = [account.generate_account()[1] for _ in range(3)]
+    for i, addr in enumerate(employees):
+        payroll.add_employee(addr, 1.0 + i, name=f"Emp{i}")
+
+    txids = payroll.run_payroll(1, job_id="Job1", batch_size=2)
+
+    # 3 employees in groups of 2 -> two send_transactions calls
+    assert client_instance.send_transactions.call_count == 2
+    first_group = client_instance.send_transactions.call_args_list[0][0][0]
+    assert len(first_group) == 2
+    assert first_group[0].transaction.group == first_group[1].transaction.group
+    assert mock_wait.call_count == 2
+    assert len(txids) == 3
+
+    # Balances are walked forward row by row (amount + 0.001 ALGO fee)
+    rows = [c[0] for c in mock_log_transaction.call_args_list]
+    assert [r[5] for r in rows] == employees
+    assert rows[0][9] == 100.0
+    assert rows[0][10] == rows[1][9] == 100.0 - 1.001
+    assert all(r[11] == "SUCCESS" for r in rows)
+
+
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.transactions.transaction.wait_for_confirmation")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_batch_mode_group_fails_as_unit(
+    mock_client, mock_wait, mock_log_transaction
+):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+    client_instance.send_transactions.side_effect = Exception("overspend")
+
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+    )
+    payroll.add_employee(account.generate_account()[1], 1.0, name="A")
+    payroll.add_employee(account.generate_account()[1], 2.0, name="B")
+
+    txids = payroll.run_payroll(1, job_id="Job1", batch_size=16)
+
+    assert txids == []
+    statuses = [c[0][11] for c in mock_log_transaction.call_args_list]
+    assert statuses == ["FAILED", "FAILED"]
+
+
+# ----------------------
+# Pipelined mode
+# ----------------------
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_pipelined_logs_in_roster_order(mock_client, mock_log_transaction):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+    client_instance.status.return_value = {"last-round": 10}
+    client_instance.status_after_block.return_value = {"last-round": 11}
+    client_instance.pending_transaction_info.return_value = {"confirmed-round": 11}
+
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+    )
+    employees = [account.generate_account()[1] for _ in range(5)]
+    for addr in employees:
+        payroll.add_employee(addr, 1.0)
+
+    txids = payroll.run_payroll(1, job_id="Job1", pipeline_window=8)
+
+    assert len(txids) == 5
+    # All five were in flight together: one block wait, no per-payment blocking
+    assert client_instance.status_after_block.call_count == 1
+    rows = [c[0] for c in mock_log_transaction.call_args_list]
+    assert [r[5] for r in rows] == employees
+    assert [r[7] for r in rows] == txids
+
+
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_survives_a_failing_notifier(mock_client, mock_log_transaction):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+    client_instance.status.return_value = {"last-round": 10}
+    client_instance.status_after_block.return_value = {"last-round": 11}
+    client_instance.pending_transaction_info.return_value = {"confirmed-round": 11}
+
+    notifier = MagicMock()
+    notifier.notify.side_effect = RuntimeError("notifier is closed")
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+        notifier=notifier,
+    )
+    payroll.add_employee(account.generate_account()[1], 1.0)
+
+    # Paid and logged; the notification failure is only reported
+    assert len(payroll.run_payroll(1, pipeline_window=8)) == 1
+    notifier.notify.assert_called_once()
+
+
+@patch("algo_pay.pipeline.time.sleep")
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_pipelined_logs_sent_payments_when_status_fails(
+    mock_client, mock_log_transaction, mock_sleep
+):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+    client_instance.status.return_value = {"last-round": 10}
+    client_instance.status_after_block.side_effect = Exception("connection reset")
+
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+    )
+    for _ in range(3):
+        payroll.add_employee(account.generate_account()[1], 1.0)
+
+    txids = payroll.run_payroll(1, job_id="Job1", pipeline_window=8)
+
+    # Nothing confirmed, but every sent payment is logged with its txid
+    assert txids == []
+    rows = [c[0] for c in mock_log_transaction.call_args_list]
+    assert [r[11] for r in rows] == ["PENDING"] * 3
+    assert all(len(r[7]) == 52 for r in rows)
+
+
+@patch("algo_pay.payroll.log_transaction")
+@patch("algo_pay.transactions.transaction.wait_for_confirmation")
+@patch("algo_pay.payroll.get_algod_client")
+def test_run_payroll_reads_employer_balance_once_per_run(
+    mock_client, mock_wait, mock_log_transaction
+):
+    client_instance = mock_client.return_value
+    client_instance.suggested_params.return_value = make_params()
+    client_instance.account_info.return_value = {"amount": 100_000_000}
+
+    employer_key, _ = account.generate_account()
+    payroll = Payroll(
+        mnemonic.from_private_key(employer_key),
+        department="TestDept",
+        network="testnet",
+    )
+    for _ in range(4):
+        payroll.add_employee(account.generate_account()[1], 1.0)
+
+    payroll.run_payroll(1, job_id="Job1")
+
+    # One read at the start of the run, one reconciliation at the end
+    assert client_instance.account_info.call_count == 2
+    rows = [c[0] for c in mock_log_transaction.call_args_list]
+    assert rows[-1][10] == 100.0 - 4 * 1.001
+
+
+@patch("algo_pay.payroll.Payroll.send_payment")
+@patch("algo_pay.payroll.get_algod_client")
+@patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
+@patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
+def test_run_payroll_budget_check_sends_nothing(
+    mock_to_private, mock_addr_from_pk, mock_client, mock_send_payment
+):
+    payroll = Payroll("dummy", department="TestDept", network="testnet")
+    payroll.add_employee("EMP1", 0.29, name="Alice")
+    payroll.add_employee("EMP2", 1.0, name="Bob")
+
+    assert payroll.compute_pay(1).tolist() == [290_000, 1_000_000]
+
+    with pytest.raises(ValueError):
+        payroll.run_payroll(1, budget_microalgos=1_289_999)
+    mock_send_payment.assert_not_called()
+
+
+@patch("algo_pay.payroll.get_algod_client")
+@patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
+@patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
+def test_bulk_roster_quiet_mode(
+    mock_to_private, mock_addr_from_pk, mock_client, capsys
+):
+    payroll = Payroll("dummy", department="TestDept", network="testnet", quiet=True)
+    capsys.readouterr()
+
+    payroll.add_employees([f"EMP{i}" for i in range(100)], [1.0] * 100)
+    payroll.add_employee("EMP100", 2.0, name="Zed")
+    payroll.remove_employees(["EMP0", "EMP1"])
+
+    assert capsys.readouterr().out == ""
+    assert len(payroll.employees) == 99
+    assert payroll.compute_pay(2)[-1] == 4_000_000
+
+
+@patch("algo_pay.payroll.get_algod_client")
+@patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
+@patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
+def test_load_roster_from_csv(
+    mock_to_private, mock_addr_from_pk, mock_client, tmp_path
+):
+    good = account.generate_account()[1]
+    path = tmp_path / "roster.csv"
+    path.write_text(
+        f"employee_address,hourly_rate\n{good},2.0\nNOT_AN_ADDRESS,1.0\n{good},3.0\n"
+    )
+    payroll = Payroll("dummy", department="TestDept", network="testnet")
+
+    report = payroll.load_roster(str(path))
+
+    assert (report.added, report.duplicates, report.rejected) == (1, 1, 1)
+    assert payroll.employees[good]["rate"] == 2.0
@@ -0,0 +1,135 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.pipeline import PaymentPipeline
+
+
+# ----------------------
+# Helpers
+# ----------------------
+def make_unit(txid, last_valid=1100):
+    stxn = MagicMock()
+    stxn.get_txid.return_value = txid
+    stxn.transaction.last_valid_round = last_valid
+    return [stxn]
+
+
+class FakeChain:
+    """Confirms each submitted txid a fixed number of rounds after it is sent."""
+
+    def __init__(self, confirm_after=1, rejected=(), never=()):
+        self.round = 100
+        self.confirm_after = confirm_after
+        self.rejected = set(rejected)
+        self.never = set(never)
+        self.sent = {}
+        self.max_in_flight = 0
+
+    def client(self):
+        client = MagicMock()
+        client.status.side_effect = lambda: {"last-round": self.round}
+        client.status_after_block.side_effect = self.after_block
+        client.send_transactions.side_effect = self.send
+        client.pending_transaction_info.side_effect = self.info
+        return client
+
+    def send(self, unit):
+        self.sent[unit[0].get_txid()] = self.round
+        pending = [
+            t
+            for t, r in self.sent.items()
+            if r + self.confirm_after > self.round or t in self.never
+        ]
+        self.max_in_flight = max(self.max_in_flight, len(pending))
+
+    def after_block(self, rnd):
+        self.round = rnd + 1
+        return {"last-round": self.round}
+
+    def info(self, txid):
+        if txid in self.rejected:
+            return {"pool-error": "overspend"}
+        if txid in self.never:
+            return {"confirmed-round": 0}
+        if self.round >= self.sent[txid] + self.confirm_after:
+            return {"confirmed-round": self.sent[txid] + self.confirm_after}
+        return {"confirmed-round": 0}
+
+
+# ----------------------
+# Pipelined submission
+# ----------------------
+def test_pipeline_returns_results_in_order():
+    chain = FakeChain()
+    units = [make_unit(f"TX{i}") for i in range(10)]
+
+    results = PaymentPipeline(chain.client(), window=4).run(units)
+
+    assert [r.txids[0] for r in results] == [f"TX{i}" for i in range(10)]
+    assert all(r.ok for r in results)
+    # 10 payments in windows of 4 need 3 rounds, not 10
+    assert chain.round == 103
+
+
+def test_pipeline_bounds_in_flight_window():
+    chain = FakeChain(confirm_after=2)
+    units = [make_unit(f"TX{i}") for i in range(20)]
+
+    PaymentPipeline(chain.client(), window=5).run(units)
+
+    assert chain.max_in_flight <= 5
+
+
+def test_pipeline_reports_rejections_and_timeouts():
+    chain = FakeChain(rejected={"TX1"}, never={"TX2"})
+    client = chain.client()
+    original_send = client.send_transactions.side_effect
+
+    def send(unit):
+        if unit[0].get_txid() == "TX3":
+            raise Exception("bad signature")
+        original_send(unit)
+
+    client.send_transactions.side_effect = send
+    units = [make_unit(f"TX{i}") for i in range(4)]
+
+    results = PaymentPipeline(client, window=8, wait_rounds=3).run(units)
+
+    assert results[0].ok and results[0].confirmed_round == 101
+    assert "overspend" in results[1].error
+    # Still valid, so it may yet land: pending, not failed
+    assert "3 rounds" in results[2].error and results[2].pending
+    assert results[3].error == "bad signature" and not results[3].pending
+
+
+def test_pipeline_expires_units_past_last_valid():
+    chain = FakeChain(never={"TX0"})
+    units = [make_unit("TX0", last_valid=102)]
+
+    (result,) = PaymentPipeline(chain.client(), wait_rounds=3).run(units)
+
+    assert not result.ok and not result.pending
+    assert "Expired after round 102" in result.error
+
+
+def test_pipeline_reports_every_unit_when_status_fails():
+    chain = FakeChain()
+    client = chain.client()
+    client.status_after_block.side_effect = Exception("connection reset")
+    units = [make_unit(f"TX{i}") for i in range(5)]
+    settled = []
+
+    results = PaymentPipeline(client, window=2, retry_delay=0).run(
+        units, on_results=settled.extend
+    )
+
+    # Three retries, then the two sent units are unknown and the rest unsent
+    assert client.status_after_block.call_count == 4
+    assert [r.pending for r in results] == [True, True, False, False, False]
+    assert all("connection reset" in r.error for r in results)
+    assert sorted(i for i, _ in settled) == [0, 1, 2, 3, 4]
+    assert set(chain.sent) == {"TX0", "TX1"}
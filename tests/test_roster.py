@@ -0,0 +1,83 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.roster import Roster
+
+
+# ----------------------
+# Mapping compatibility
+# ----------------------
+def test_roster_behaves_like_employee_dict():
+    roster = Roster()
+    roster.add("EMP1", 2.5, name="Alice")
+    roster.add("EMP2", 3.0)
+
+    assert roster == {
+        "EMP1": {"rate": 2.5, "name": "Alice"},
+        "EMP2": {"rate": 3.0, "name": "EMP2"},
+    }
+    assert list(roster) == ["EMP1", "EMP2"]
+    assert "EMP1" in roster and "EMP3" not in roster
+
+    # Re-adding updates in place and keeps roster order
+    roster.add("EMP1", 4.0)
+    assert roster["EMP1"] == {"rate": 4.0, "name": "Alice"}
+    assert list(roster) == ["EMP1", "EMP2"]
+
+
+# ----------------------
+# Bulk operations
+# ----------------------
+def test_bulk_add_remove_update():
+    roster = Roster(capacity=2)
+    addresses = [f"EMP{i}" for i in range(1000)]
+    assert roster.add_many(addresses, np.arange(1000) / 10) == 1000
+    assert len(roster) == 1000
+
+    assert roster.remove_many(addresses[::2] + ["MISSING"]) == 500
+    assert roster.addresses == tuple(addresses[1::2])
+    assert roster["EMP999"]["rate"] == 99.9
+
+    roster.update_rates(["EMP1", "EMP3"], [7.0, 8.0])
+    assert roster.rates[:2].tolist() == [7.0, 8.0]
+    with pytest.raises(KeyError):
+        roster.update_rates(["EMP0"], [1.0])
+
+    assert roster.remove("EMP1") == "EMP1"
+    assert roster.remove("EMP1") is None
+    assert len(roster) == 499
+
+
+def test_snapshot_is_isolated_and_names_interned():
+    roster = Roster()
+    roster.add_many(["A", "B"], [1.0, 2.0], names=["Dept" + "Lead", "DeptLead"])
+    snap = roster.snapshot()
+
+    roster.add("C", 3.0)
+    roster.update_rates(["A"], [9.0])
+
+    assert snap.addresses == ("A", "B")
+    assert snap.rates.tolist() == [1.0, 2.0]
+    assert snap.names[0] is snap.names[1]
+    with pytest.raises(ValueError):
+        roster.rates[0] = 5.0
+
+
+@pytest.mark.parametrize("bad", [float("nan"), float("inf"), -1.0])
+def test_roster_rejects_non_finite_and_negative_rates(bad):
+    roster = Roster()
+    roster.add("EMP1", 2.0)
+    with pytest.raises(ValueError, match="finite and non-negative"):
+        roster.add("EMP2", bad)
+    with pytest.raises(ValueError, match="finite and non-negative"):
+        roster.add_many(["EMP3", "EMP4"], [1.0, bad])
+    with pytest.raises(ValueError, match="finite and non-negative"):
+        roster.update_rates(["EMP1"], [bad])
+    # Nothing was stored
+    assert dict(roster) == {"EMP1": {"rate": 2.0, "name": "EMP1"}}
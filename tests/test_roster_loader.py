@@ -0,0 +1,136 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from algosdk import account
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.roster import Roster
+from algo_pay.roster_loader import load_roster, validate_addresses
+
+EXAMPLE_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "example_employee_data", "3_example_employees.csv"
+)
+
+
+def new_address():
+    return account.generate_account()[1]
+
+
+def bad_checksum(address):
+    # Change one character of the public key so the shape is valid but the
+    # checksum is not (the last character also carries padding bits)
+    return address[:10] + ("A" if address[10] != "A" else "B") + address[11:]
+
+
+# ----------------------
+# Validation
+# ----------------------
+def test_validate_addresses_checks_shape_and_checksum():
+    good = new_address()
+    mask = validate_addresses(
+        pd.Series([good, bad_checksum(good), "not-an-address", None, good.lower()])
+    )
+    assert mask.tolist() == [True, False, False, False, False]
+
+
+# ----------------------
+# CSV loading
+# ----------------------
+def test_load_roster_rejects_and_dedupes(tmp_path):
+    a, b, c = new_address(), new_address(), new_address()
+    path = tmp_path / "roster.csv"
+    pd.DataFrame(
+        {
+            "employee_address": [a, bad_checksum(b), c, a, b, c],
+            "hourly_rate": ["2.0", "3.0", "abc", "9.0", "-1", "4.5"],
+        }
+    ).to_csv(path, index=False)
+
+    roster = Roster()
+    report = load_roster(roster, path, chunksize=2)
+
+    assert report.added == 2
+    assert report.duplicates == 1
+    assert report.rejected == 3
+    assert not report.ok
+    assert [(row, reason) for row, _, reason in report.rejects] == [
+        (3, "invalid address"),
+        (4, "invalid rate"),
+        (6, "invalid rate"),
+    ]
+    # First valid occurrence wins, even when an earlier row for it was bad
+    assert dict(roster) == {
+        a: {"rate": 2.0, "name": a},
+        c: {"rate": 4.5, "name": c},
+    }
+
+
+def test_load_roster_updates_existing_employees(tmp_path):
+    a = new_address()
+    roster = Roster()
+    roster.add(a, 1.0, name="Alice")
+    path = tmp_path / "roster.csv"
+    path.write_text(f"employee_address,hourly_rate\n{a},5.0\n")
+
+    report = load_roster(roster, path)
+
+    assert (report.added, report.updated) == (0, 1)
+    assert roster[a] == {"rate": 5.0, "name": "Alice"}
+
+
+def test_load_roster_reads_example_data_ignoring_extra_columns():
+    roster = Roster()
+    report = load_roster(roster, EXAMPLE_CSV)
+    assert report.ok
+    assert report.added == len(roster) == 3
+
+
+def test_load_roster_requires_schema(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text("address,rate\nX,1\n")
+    with pytest.raises(ValueError, match="hourly_rate"):
+        load_roster(Roster(), path)
+
+
+# ----------------------
+# Parquet loading
+# ----------------------
+def test_load_roster_streams_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    addresses = [new_address() for _ in range(5)]
+    path = tmp_path / "roster.parquet"
+    pd.DataFrame(
+        {
+            "employee_address": addresses,
+            "hourly_rate": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "employee_name": ["A", "B", None, "D", "E"],
+        }
+    ).to_parquet(path)
+
+    roster = Roster()
+    report = load_roster(roster, path, chunksize=2)
+
+    assert report.added == 5
+    assert roster.addresses == tuple(addresses)
+    assert roster.names[:3] == ("A", "B", addresses[2])
+
+
+def test_parquet_rejects_are_numbered_by_record(tmp_path):
+    pytest.importorskip("pyarrow")
+    a, b = new_address(), new_address()
+    path = tmp_path / "roster.parquet"
+    pd.DataFrame(
+        {"employee_address": [a, bad_checksum(b), b], "hourly_rate": [1.0, 2.0, -1.0]}
+    ).to_parquet(path)
+
+    report = load_roster(Roster(), path, chunksize=2)
+
+    # No header line: the second and third records are rows 2 and 3
+    assert [(row, reason) for row, _, reason in report.rejects] == [
+        (2, "invalid address"),
+        (3, "invalid rate"),
+    ]
@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.payroll import Payroll
+from algo_pay.scheduler import PayrollScheduler
+
+
+def recorder(duration=0.0):
+    starts = []
+
+    def job():
+        starts.append(time.monotonic())
+        time.sleep(duration)
+
+    return job, starts
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+# ----------------------
+# Timing
+# ----------------------
+def test_runs_do_not_drift_by_their_duration():
+    job, starts = recorder(duration=0.03)
+    with PayrollScheduler(max_workers=2) as scheduler:
+        scheduler.schedule(job, 0.1, job_id="drift")
+        wait_for(lambda: len(starts) >= 5)
+
+    offsets = [s - starts[0] for s in starts[:5]]
+    for k, offset in enumerate(offsets):
+        # A sleep-after-run loop would be ~0.03s later on every run
+        assert offset == pytest.approx(k * 0.1, abs=0.025)
+
+
+def test_many_jobs_share_one_timer_thread():
+    before = threading.active_count()
+    counters = [[] for _ in range(50)]
+    with PayrollScheduler(max_workers=4) as scheduler:
+        for i, runs in enumerate(counters):
+            scheduler.schedule(lambda runs=runs: runs.append(1), 0.05, job_id=str(i))
+        wait_for(lambda: all(len(r) >= 2 for r in counters))
+        assert threading.active_count() - before <= 1 + 4
+        assert len(scheduler.jobs) == 50
+
+
+def test_job_errors_do_not_stop_the_schedule(capsys):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    with PayrollScheduler() as scheduler:
+        scheduler.schedule(flaky, 0.02, job_id="flaky")
+        wait_for(lambda: len(calls) >= 3)
+    assert "Job flaky failed: boom" in capsys.readouterr().out
+
+
+# ----------------------
+# Overrun policies
+# ----------------------
+@pytest.mark.parametrize(
+    "overrun,expected_gap",
+    [
+        ("skip", 0.3),  # next slot after the run finishes at 0.25
+        ("coalesce", 0.25),  # missed tick runs as soon as the run finishes
+        ("queue", 0.25),
+    ],
+)
+def test_overrun_policies(overrun, expected_gap):
+    job, starts = recorder(duration=0.25)
+    with PayrollScheduler() as scheduler:
+        handle = scheduler.schedule(job, 0.1, job_id=overrun, overrun=overrun)
+        wait_for(lambda: len(starts) >= 2)
+        scheduler.cancel(handle, timeout=1)
+
+    assert starts[1] - starts[0] == pytest.approx(expected_gap, abs=0.04)
+    if overrun == "skip":
+        assert handle.skipped >= 2
+    if overrun == "coalesce":
+        assert handle.skipped >= 1
+
+
+def test_queue_policy_keeps_every_missed_tick():
+    job, starts = recorder(duration=0.1)
+    with PayrollScheduler() as scheduler:
+        handle = scheduler.schedule(job, 0.025, job_id="q", overrun="queue")
+        time.sleep(0.2)
+        assert handle.pending >= 3
+        scheduler.cancel(handle, timeout=1)
+    assert handle.pending == 0
+
+
+def test_schedule_validates_arguments():
+    with PayrollScheduler() as scheduler:
+        with pytest.raises(ValueError):
+            scheduler.schedule(lambda: None, 0)
+        with pytest.raises(ValueError):
+            scheduler.schedule(lambda: None, 1, overrun="later")
+        scheduler.schedule(lambda: None, 1, job_id="dup", start_delay=10)
+        with pytest.raises(ValueError):
+            scheduler.schedule(lambda: None, 1, job_id="dup")
+        assert scheduler.cancel("dup")
+        assert not scheduler.cancel("dup")
+
+
+# ----------------------
+# Payroll integration
+# ----------------------
+@patch("algo_pay.payroll.get_algod_client")
+@patch("algosdk.account.address_from_private_key", return_value="TEST_ADDRESS")
+@patch("algosdk.mnemonic.to_private_key", return_value="TEST_PRIVATE_KEY")
+def test_payroll_job_runs_on_scheduler(
+    mock_to_private, mock_addr_from_pk, mock_client, capsys
+):
+    payroll = Payroll("dummy", department="TestDept", network="testnet")
+    runs = []
+    with patch.object(
+        payroll, "run_payroll", side_effect=lambda *a, **k: runs.append(k)
+    ):
+        with PayrollScheduler() as scheduler:
+            payroll.start_payroll_job(0.05, 1, "Tick", job_id="J1", scheduler=scheduler)
+            payroll.start_payroll_job(0.05, 1, "Tick", scheduler=scheduler)
+            wait_for(lambda: len(runs) >= 2)
+            payroll.stop_payroll_job()
+            count = len(runs)
+            time.sleep(0.15)
+            assert len(runs) == count
+            assert scheduler.jobs == []
+            payroll.stop_payroll_job()
+
+    out = capsys.readouterr().out
+    assert "A payroll job is already running." in out
+    assert "Stopped payroll job." in out
+    assert "No payroll job running." in out
+    assert runs[0] == {"note": "Tick", "job_id": "J1"}
@@ -0,0 +1,153 @@
+import base64
+import os
+import sys
+from unittest.mock import patch
+
+from algosdk import account, encoding, transaction
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay import signing, transactions
+from algo_pay.signing import BatchSigner, sign_batch
+from algo_pay.testing import FakeAlgod
+
+
+# ----------------------
+# Helpers
+# ----------------------
+def make_params():
+    return transaction.SuggestedParams(
+        fee=1000, first=1, last=1000, gh=base64.b64encode(b"\x00" * 32).decode()
+    )
+
+
+def make_txns(sender, count, params=None):
+    receiver = account.generate_account()[1]
+    return [
+        transaction.PaymentTxn(sender, params or make_params(), receiver, 1000 + i)
+        for i in range(count)
+    ]
+
+
+def sdk_bytes(txn, key):
+    return base64.b64decode(encoding.msgpack_encode(txn.sign(key)))
+
+
+class InlineExecutor:
+    """Stands in for ProcessPoolExecutor, recording what each worker receives."""
+
+    instances = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        self.initargs = initargs
+        self.chunks = []
+        initializer(*initargs)
+        InlineExecutor.instances.append(self)
+
+    def map(self, func, chunks):
+        chunks = list(chunks)
+        self.chunks.extend(chunks)
+        return map(func, chunks)
+
+    def shutdown(self):
+        pass
+
+
+# ----------------------
+# Signing
+# ----------------------
+def test_serial_batch_matches_sdk_signing():
+    key, address = account.generate_account()
+    txns = make_txns(address, 5)
+
+    assert sign_batch(txns, key) == [sdk_bytes(txn, key) for txn in txns]
+
+
+def test_rekeyed_sender_records_signer():
+    key, _ = account.generate_account()
+    _, rekeyed_sender = account.generate_account()
+    (txn,) = make_txns(rekeyed_sender, 1)
+
+    (blob,) = sign_batch([txn], key)
+
+    assert blob == sdk_bytes(txn, key)
+
+
+def test_txids_match_sdk():
+    key, address = account.generate_account()
+    txns = make_txns(address, 3)
+
+    pairs = BatchSigner(key).sign_with_txids(txns)
+
+    assert [txid for txid, _ in pairs] == [txn.get_txid() for txn in txns]
+
+
+def test_small_batches_never_start_a_pool():
+    key, address = account.generate_account()
+    with patch("algo_pay.signing.ProcessPoolExecutor") as pool:
+        sign_batch(make_txns(address, 10), key, processes=4, serial_threshold=100)
+    pool.assert_not_called()
+
+
+def test_no_pool_unless_processes_are_asked_for():
+    key, address = account.generate_account()
+    txns = make_txns(address, 10)
+    with (
+        patch("os.cpu_count", return_value=8),
+        patch("algo_pay.signing.ProcessPoolExecutor", InlineExecutor),
+    ):
+        InlineExecutor.instances.clear()
+        blobs = sign_batch(txns, key, serial_threshold=0)
+    assert InlineExecutor.instances == []
+    assert blobs == [sdk_bytes(txn, key) for txn in txns]
+
+
+def test_large_batches_are_chunked_in_order_and_key_sent_once():
+    key, address = account.generate_account()
+    txns = make_txns(address, 10)
+    InlineExecutor.instances.clear()
+
+    with patch("algo_pay.signing.ProcessPoolExecutor", InlineExecutor):
+        with BatchSigner(key, processes=2, chunk_size=3, serial_threshold=0) as signer:
+            first = signer.sign(txns)
+            second = signer.sign(txns[:4])
+
+    assert first == [sdk_bytes(txn, key) for txn in txns]
+    assert second == first[:4]
+    # One pool for both batches; the key only travels through the initializer
+    (executor,) = InlineExecutor.instances
+    assert executor.initargs == (key,)
+    assert [len(c) for c in executor.chunks] == [3, 3, 3, 1, 3, 1]
+    signing._worker_signer = None
+
+
+def test_process_pool_signs_like_serial():
+    key, address = account.generate_account()
+    txns = make_txns(address, 25)
+
+    parallel = sign_batch(txns, key, processes=2, chunk_size=4, serial_threshold=0)
+
+    assert parallel == sign_batch(txns, key)
+
+
+# ----------------------
+# Broadcasting
+# ----------------------
+def test_broadcast_raw_sends_a_signed_group():
+    key, address = account.generate_account()
+    with FakeAlgod() as algod:
+        algod.fund(address, 10_000_000)
+        client = algod.client()
+        receivers = [account.generate_account()[1] for _ in range(3)]
+        params = client.suggested_params()
+        txns = [
+            transaction.PaymentTxn(address, params, r, 1_000_000) for r in receivers
+        ]
+        transaction.assign_group_id(txns)
+
+        txid = transactions.broadcast_raw(client, sign_batch(txns, key))
+        transactions.wait_for_confirmation(client, txid)
+
+        assert txid == txns[0].get_txid()
+        assert [algod.balance(r) for r in receivers] == [1_000_000] * 3
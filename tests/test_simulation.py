@@ -0,0 +1,106 @@
+import csv
+import os
+import sys
+
+import pytest
+from algosdk import account, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.audit import AuditLogWriter
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.simulation import simulate_payments
+from algo_pay.testing import FakeAlgod
+from algo_pay.testing.fake_algod import MIN_BALANCE, MIN_FEE
+
+SIMULATE = "POST /v2/transactions/simulate"
+
+
+def make_payroll(algod, tmp_path, funding=100_000_000, employees=6):
+    private_key, address = account.generate_account()
+    algod.fund(address, funding)
+    payroll = Payroll(
+        mnemonic.from_private_key(private_key),
+        department="Eng",
+        client=algod.client(),
+        params_cache=SuggestedParamsCache(),
+        audit_writer=AuditLogWriter(str(tmp_path / "history.csv")),
+        quiet=True,
+    )
+    for _ in range(employees):
+        employee = account.generate_account()[1]
+        algod.fund(employee, MIN_BALANCE)
+        payroll.add_employee(employee, 1.0)
+    return payroll
+
+
+def test_clean_run_reports_cost_and_balance_without_sending(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=20)
+        report = payroll.simulate_payroll(1)
+
+        assert report.ok
+        assert report.payments == 20
+        assert report.amount == 20 * 1_000_000
+        assert report.fees == 20 * MIN_FEE
+        assert report.balance_before == 100_000_000
+        assert report.balance_after == 100_000_000 - report.total_cost
+        # Two chunks of up to 16, one request each; nothing was sent
+        assert algod.requests[SIMULATE] == 2
+        assert algod.confirmed == {}
+        assert algod.balance(payroll.employer_address) == 100_000_000
+    assert not os.path.exists(tmp_path / "history.csv")
+
+
+def test_reports_each_failing_employee(tmp_path):
+    with FakeAlgod() as algod:
+        payroll = make_payroll(algod, tmp_path, employees=4)
+        good = list(payroll.employees.addresses)
+        # Change a public-key character: the last one also carries padding
+        bad_checksum = (
+            good[0][:10] + ("A" if good[0][10] != "A" else "B") + good[0][11:]
+        )
+        unfunded = account.generate_account()[1]
+        payroll.add_employee(bad_checksum, 1.0, name="Typo")
+        # 0.01 ALGO cannot open an account (minimum balance 0.1 ALGO)
+        payroll.add_employee(unfunded, 0.01, name="New")
+        payroll.add_employee(account.generate_account()[1], 1.0, name="Fresh")
+
+        report = payroll.simulate_payroll(1)
+
+        assert [(f.position, f.employee_name) for f in report.failures] == [
+            (4, "Typo"),
+            (5, "New"),
+        ]
+        assert "checksum" in report.failures[0].reason
+        assert "below min" in report.failures[1].reason
+        assert report.amount == 5 * 1_000_000
+        assert algod.confirmed == {}
+
+        # The real run fails exactly where the simulation said it would
+        payroll.run_payroll(1)
+    with open(tmp_path / "history.csv", newline="") as f:
+        failed = [
+            r["employee_name"] for r in csv.DictReader(f) if r["status"] == "FAILED"
+        ]
+    assert failed == ["Typo", "New"]
+
+
+@pytest.mark.parametrize("group_size", [1, 16])
+def test_employer_running_out_is_caught_across_chunks(tmp_path, group_size):
+    with FakeAlgod() as algod:
+        # Enough for three payments and their fees on top of the minimum
+        funding = MIN_BALANCE + 3 * (1_000_000 + MIN_FEE) + 500_000
+        payroll = make_payroll(algod, tmp_path, funding=funding, employees=6)
+        report = payroll.simulate_payroll(1, group_size=group_size)
+
+    assert [f.position for f in report.failures] == [3, 4, 5]
+    assert report.amount == 3 * 1_000_000
+    assert report.balance_after == MIN_BALANCE + 500_000
+
+
+def test_group_size_is_bounded():
+    with pytest.raises(ValueError, match="group_size"):
+        simulate_payments(None, [], group_size=17)
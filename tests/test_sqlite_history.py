@@ -0,0 +1,186 @@
+import csv
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+from algosdk import account, mnemonic
+
+# Ensure project root in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from algo_pay.audit import AUDIT_HEADER, AuditLogWriter, get_audit_writer
+from algo_pay.params_cache import SuggestedParamsCache
+from algo_pay.payroll import Payroll
+from algo_pay.sqlite_history import SQLiteHistory
+from algo_pay.testing import FakeAlgod
+
+
+def row(ts, job, payroll, employee, txid, dept="Eng", amount=1.5):
+    return [
+        ts,
+        dept,
+        job,
+        payroll,
+        "EMPLOYER",
+        employee.lower(),
+        employee,
+        amount,
+        txid,
+        100.0,
+        100.0 - amount,
+        "SUCCESS",
+    ]
+
+
+ROWS = [
+    row("2026-01-01T00:00:00", "Weekly", "P1", "ALICE", "TX1"),
+    row("2026-01-01T00:00:01", "Weekly", "P1", "BOB", "TX2"),
+    row("2026-01-08T00:00:00", "Weekly", "P2", "ALICE", "TX3"),
+    row("2026-02-01T00:00:00", "Bonus", "P3", "BOB", "TX4", dept="Ops"),
+]
+
+
+def count_rows(path):
+    # Separate connection: sees only committed transactions
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM payroll_history").fetchone()[0]
+
+
+def write_department(path, department, runs, per_run):
+    history = SQLiteHistory(path)
+    for run in range(runs):
+        for i in range(per_run):
+            history.write_row(
+                row("t", "J", f"{department}-{run}", f"E{i}", f"{department}{run}-{i}")
+            )
+        history.end_run()
+    history.close()
+
+
+# ----------------------
+# Writes
+# ----------------------
+def test_run_is_committed_as_one_transaction(tmp_path):
+    path = str(tmp_path / "history.db")
+    history = SQLiteHistory(path)
+    for r in ROWS[:3]:
+        history.write_row(r)
+    assert count_rows(path) == 0
+
+    history.end_run()
+    assert count_rows(path) == 3
+    with sqlite3.connect(path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    history.close()
+
+
+def test_concurrent_threads_share_one_backend(tmp_path):
+    history = SQLiteHistory(str(tmp_path / "history.db"))
+
+    def department(name):
+        for run in range(5):
+            for i in range(20):
+                history.write_row(row("t", "J", f"{name}-{run}", f"E{i}", "TX"))
+            history.end_run()
+
+    threads = [threading.Thread(target=department, args=(d,)) for d in "ABCD"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(history.query()) == 4 * 5 * 20
+    assert len(history.by_payroll_id("C-3")) == 20
+    history.close()
+
+
+def test_concurrent_processes_write_one_database(tmp_path):
+    path = str(tmp_path / "history.db")
+    SQLiteHistory(path).close()
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=write_department, args=(path, d, 3, 50)) for d in "AB"]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    assert count_rows(path) == 2 * 3 * 50
+
+
+# ----------------------
+# Queries and export
+# ----------------------
+def test_queries(tmp_path):
+    with SQLiteHistory(str(tmp_path / "history.db")) as history:
+        for r in ROWS:
+            history.write_row(r)
+        # Buffered rows are flushed before querying
+        assert [r["txid"] for r in history.by_payroll_id("P1")] == ["TX1", "TX2"]
+        assert [r["txid"] for r in history.by_employee("ALICE")] == ["TX1", "TX3"]
+        assert len(history.by_job_id("Weekly")) == 3
+        assert history.by_txid("TX4")["department"] == "Ops"
+        assert history.by_txid("TX4")["amount_ALGO"] == 1.5
+        assert history.by_txid("nope") is None
+        assert [r["txid"] for r in history.between("2026-01-02", "2026-02-01")] == [
+            "TX3"
+        ]
+        with pytest.raises(TypeError):
+            history.export_csv(str(tmp_path / "x.csv"), status="SUCCESS")
+
+
+def test_export_matches_csv_ledger(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    writer = AuditLogWriter(csv_path)
+    with SQLiteHistory(str(tmp_path / "history.db")) as history:
+        for r in ROWS:
+            writer.write_row(r)
+            history.write_row(r)
+        writer.close()
+
+        exported = str(tmp_path / "export.csv")
+        assert history.export_csv(exported) == 4
+        with open(exported, "rb") as a, open(csv_path, "rb") as b:
+            assert a.read() == b.read()
+
+        history.export_csv(exported, job_id="Bonus")
+        with open(exported, newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == AUDIT_HEADER
+        assert [r[8] for r in rows[1:]] == ["TX4"]
+
+
+# ----------------------
+# Payroll integration
+# ----------------------
+def test_db_history_file_selects_sqlite(tmp_path):
+    writer = get_audit_writer(str(tmp_path / "history.db"))
+    assert isinstance(writer, SQLiteHistory)
+    assert isinstance(get_audit_writer(str(tmp_path / "history.csv")), AuditLogWriter)
+
+
+def test_payroll_logs_to_sqlite(tmp_path):
+    history = SQLiteHistory(str(tmp_path / "history.db"))
+    with FakeAlgod() as algod:
+        private_key, address = account.generate_account()
+        algod.fund(address, 100_000_000)
+        payroll = Payroll(
+            mnemonic.from_private_key(private_key),
+            department="Eng",
+            client=algod.client(),
+            params_cache=SuggestedParamsCache(),
+            history_file=history,
+            quiet=True,
+        )
+        for _ in range(3):
+            payroll.add_employee(account.generate_account()[1], 1.0)
+
+        txids = payroll.run_payroll(1, job_id="Weekly")
+
+    assert payroll.history() is history
+    assert [r["txid"] for r in history.by_job_id("Weekly")] == txids
+    assert count_rows(history.filename) == 3
+    history.close()